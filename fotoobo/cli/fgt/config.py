@@ -17,7 +17,7 @@ log = logging.getLogger("fotoobo")
 
 
 @app.command(no_args_is_help=True)
-def check(
+def check(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     configuration: Annotated[
         Path,
         typer.Argument(
@@ -43,12 +43,38 @@ def check(
             show_default=False,
         ),
     ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            help="The number of processes to parse the configuration files in parallel.",
+            metavar="[jobs]",
+            min=1,
+        ),
+    ] = 1,
+    cache_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--cache-dir",
+            help="The directory to cache the parsed configuration files in.",
+            metavar="[dir]",
+            show_default=False,
+        ),
+    ] = None,
+    lazy: Annotated[
+        bool,
+        typer.Option(
+            "--lazy",
+            help="Only parse the sections of the configuration files which are needed.",
+        ),
+    ] = False,
 ) -> None:
     """
     Check one or more FortiGate configuration files.
     """
     inventory = Inventory(config.inventory_file)
-    result = fgt.config.check(configuration, bundles)
+    result = fgt.config.check(configuration, bundles, jobs=jobs, cache_dir=cache_dir, lazy=lazy)
 
     if smtp_server:
         if smtp_server in inventory.assets:
@@ -65,7 +91,65 @@ def check(
 
 
 @app.command(no_args_is_help=True)
-def get(
+def diff(
+    old: Annotated[
+        Path,
+        typer.Argument(
+            help="The old FortiGate configuration file or directory.",
+            metavar="[old]",
+            show_default=False,
+        ),
+    ],
+    new: Annotated[
+        Path,
+        typer.Argument(
+            help="The new FortiGate configuration file or directory.",
+            metavar="[new]",
+            show_default=False,
+        ),
+    ],
+    output_file: Annotated[
+        Path | None,
+        typer.Option(
+            "--output",
+            "-o",
+            help="The JSON Lines file to write the differences to.",
+            metavar="[output]",
+            show_default=False,
+        ),
+    ] = None,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            help="The number of processes to compare the configuration files in parallel.",
+            metavar="[jobs]",
+            min=1,
+        ),
+    ] = 1,
+    cache_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--cache-dir",
+            help="The directory to cache the parsed configuration files in.",
+            metavar="[dir]",
+            show_default=False,
+        ),
+    ] = None,
+) -> None:
+    """
+    Show the differences between two FortiGate configurations or directories of configurations.
+    """
+    result = fgt.config.diff(old, new, output_file=output_file, jobs=jobs, cache_dir=cache_dir)
+    if not output_file:
+        result.print_raw()
+
+    result.print_messages()
+
+
+@app.command(no_args_is_help=True)
+def get(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     configuration: Annotated[
         Path,
         typer.Argument(
@@ -79,9 +163,35 @@ def get(
         typer.Argument(help="Scope of the configuration ('global' or 'vdom')", metavar="[scope]"),
     ],
     path: Annotated[str, typer.Argument(help="Configuration path", metavar="[path]")] = "/",
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            help="The number of processes to parse the configuration files in parallel.",
+            metavar="[jobs]",
+            min=1,
+        ),
+    ] = 1,
+    cache_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--cache-dir",
+            help="The directory to cache the parsed configuration files in.",
+            metavar="[dir]",
+            show_default=False,
+        ),
+    ] = None,
+    lazy: Annotated[
+        bool,
+        typer.Option(
+            "--lazy",
+            help="Only parse the sections of the configuration files which are needed.",
+        ),
+    ] = False,
 ) -> None:
     """Get configuration or parts of it from one or more FortiGate configuration files."""
-    result = fgt.config.get(configuration, scope, path)
+    result = fgt.config.get(configuration, scope, path, jobs=jobs, cache_dir=cache_dir, lazy=lazy)
     result.print_raw()
 
 
@@ -99,11 +209,37 @@ def info(
         bool,
         typer.Option("--list", "-l", help="Print the result as a list instead of separate blocks."),
     ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            help="The number of processes to parse the configuration files in parallel.",
+            metavar="[jobs]",
+            min=1,
+        ),
+    ] = 1,
+    cache_dir: Annotated[
+        Path | None,
+        typer.Option(
+            "--cache-dir",
+            help="The directory to cache the parsed configuration files in.",
+            metavar="[dir]",
+            show_default=False,
+        ),
+    ] = None,
+    lazy: Annotated[
+        bool,
+        typer.Option(
+            "--lazy",
+            help="Only parse the sections of the configuration files which are needed.",
+        ),
+    ] = False,
 ) -> None:
     """
     Get the information from one or more FortiGate configuration files.
     """
-    result = fgt.config.info(configuration)
+    result = fgt.config.info(configuration, jobs=jobs, cache_dir=cache_dir, lazy=lazy)
 
     if as_list:
         info_dicts = []
@@ -3,18 +3,15 @@ The FortiGate commands
 """
 
 import logging
-import os
-from datetime import datetime
 from pathlib import Path
 from typing import Annotated
 
 import typer
 
 from fotoobo import tools
-from fotoobo.exceptions import GeneralWarning
 from fotoobo.helpers import cli_path
 from fotoobo.helpers.config import config as fotoobo_config
-from fotoobo.helpers.files import create_dir, file_to_ftp, file_to_zip
+from fotoobo.helpers.files import create_dir
 from fotoobo.inventory import Inventory
 
 from . import config, monitor
@@ -42,7 +39,7 @@ def callback(context: typer.Context) -> None:
 
 
 @app.command()
-def backup(
+def backup(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     host: Annotated[
         str,
         typer.Argument(
@@ -89,6 +86,34 @@ def backup(
             metavar="server",
         ),
     ] = None,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            "-i",
+            help="Only backup the FortiGates whose configuration changed since the last backup.",
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            "-r",
+            help="Resume the last backup run and skip the FortiGates already done in it.",
+        ),
+    ] = False,
+    journal_file: Annotated[
+        Path | None,
+        typer.Option(
+            "--journal",
+            "-j",
+            help="The journal file to record the backup run in, so it can be resumed with "
+            "--resume. Default with --resume is the journal in the backup directory, which is "
+            "only written by resumed runs. Resuming fails if the journal does not exist.",
+            show_default=False,
+            metavar="file",
+        ),
+    ] = None,
 ) -> None:
     """
     Backup one or more FortiGate(s).
@@ -99,33 +124,15 @@ def backup(
         backup_dir = Path.cwd()
 
     create_dir(backup_dir)
-    result = tools.fgt.backup(host, timeout=timeout)
-
-    for name, data in result.all_results().items():
-        config_file = backup_dir / Path(name).with_suffix(".conf")
-
-        if config_file.is_file():
-            os.remove(config_file)
-
-        config_file.write_text(data, encoding="UTF-8")
-
-        if not config_file.is_file():
-            result.push_message(name, f"backup file for '{name}' does not exist")
-            continue
-
-        if ftp_server:
-            if ftp_server in inventory.assets:
-                server = inventory.assets[ftp_server]
-                log.debug("Compressing configuration '%s'", name)
-                time: str = datetime.now().strftime("%Y%m%d-%H%M")
-                zip_file = backup_dir / Path(name + "-" + time + ".conf.zip")
-                file_to_zip(config_file, zip_file)
-                file_to_ftp(zip_file, server)
-                os.remove(zip_file)
-                result.push_message(name, f"Uploaded config file for '{name}' to '{ftp_server}'")
-
-            else:
-                raise GeneralWarning(f"FTP server '{ftp_server}' not found in inventory")
+    result = tools.fgt.backup_to_dir(
+        backup_dir,
+        host,
+        timeout=timeout,
+        incremental=incremental,
+        ftp_server=ftp_server,
+        resume=resume,
+        journal_file=journal_file,
+    )
 
     if smtp_server and smtp_server in inventory.assets:
         result.send_messages_as_mail(inventory.assets[smtp_server], "error")
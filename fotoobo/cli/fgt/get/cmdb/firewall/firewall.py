@@ -3,12 +3,13 @@ The FortiGate commands
 """
 
 import logging
-from typing import Annotated
+from typing import Annotated, Any
 
 import typer
 
 from fotoobo.exceptions import GeneralError
 from fotoobo.helpers import cli_path
+from fotoobo.helpers.result import Result
 from fotoobo.tools.fgt.cmdb.firewall import *  # pylint: disable=wildcard-import
 
 app = typer.Typer(no_args_is_help=True, rich_markup_mode="rich")
@@ -32,7 +33,8 @@ def address(
     host: Annotated[
         str,
         typer.Argument(
-            help="The FortiGate hostname to access (must be defined in the inventory).",
+            help="The FortiGate hostname to access (must be defined in the inventory). "
+            "Wildcard * is supported to access several FortiGates.",
             metavar="[host]",
         ),
     ],
@@ -61,14 +63,24 @@ def address(
             show_default=False,
         ),
     ] = None,
+    fields: Annotated[
+        str | None,
+        typer.Option(
+            "--fields",
+            "-f",
+            help="The fields to request ('field1,field2' or '*' for all fields). "
+            "Defaults to the fields shown in the table.",
+            metavar="[fields]",
+            show_default=False,
+        ),
+    ] = None,
 ) -> None:
     """Get FortiGate cmdb firewall address."""
     if name and ("*" in vdom or "," in vdom):
         raise GeneralError("With name argument you have to specify one single VDOM (with --vdom)")
 
-    result = get_cmdb_firewall_address(host, name, vdom, output_file)
-    if not output_file:
-        result.print_table_raw(result.results[host], auto_header=True, title=host)
+    result = get_cmdb_firewall_address(host, name, vdom, output_file, _get_fields(fields))
+    _print_result(result, output_file)
 
 
 @app.command()
@@ -76,7 +88,8 @@ def addrgrp(
     host: Annotated[
         str,
         typer.Argument(
-            help="The FortiGate hostname to access (must be defined in the inventory).",
+            help="The FortiGate hostname to access (must be defined in the inventory). "
+            "Wildcard * is supported to access several FortiGates.",
             metavar="[host]",
         ),
     ],
@@ -105,14 +118,24 @@ def addrgrp(
             show_default=False,
         ),
     ] = None,
+    fields: Annotated[
+        str | None,
+        typer.Option(
+            "--fields",
+            "-f",
+            help="The fields to request ('field1,field2' or '*' for all fields). "
+            "Defaults to the fields shown in the table.",
+            metavar="[fields]",
+            show_default=False,
+        ),
+    ] = None,
 ) -> None:
     """Get FortiGate cmdb firewall address group."""
     if name and ("*" in vdom or "," in vdom):
         raise GeneralError("With name argument you have to specify one single VDOM (with --vdom)")
 
-    result = get_cmdb_firewall_addrgrp(host, name, vdom, output_file)
-    if not output_file:
-        result.print_table_raw(result.results[host], auto_header=True, title=host)
+    result = get_cmdb_firewall_addrgrp(host, name, vdom, output_file, _get_fields(fields))
+    _print_result(result, output_file)
 
 
 @app.command()
@@ -120,7 +143,8 @@ def service_custom(
     host: Annotated[
         str,
         typer.Argument(
-            help="The FortiGate hostname to access (must be defined in the inventory).",
+            help="The FortiGate hostname to access (must be defined in the inventory). "
+            "Wildcard * is supported to access several FortiGates.",
             metavar="[host]",
         ),
     ],
@@ -149,14 +173,24 @@ def service_custom(
             show_default=False,
         ),
     ] = None,
+    fields: Annotated[
+        str | None,
+        typer.Option(
+            "--fields",
+            "-f",
+            help="The fields to request ('field1,field2' or '*' for all fields). "
+            "Defaults to the fields shown in the table.",
+            metavar="[fields]",
+            show_default=False,
+        ),
+    ] = None,
 ) -> None:
     """Get FortiGate cmdb firewall service custom."""
     if name and ("*" in vdom or "," in vdom):
         raise GeneralError("With name argument you have to specify one single VDOM (with --vdom)")
 
-    result = get_cmdb_firewall_service_custom(host, name, vdom, output_file)
-    if not output_file:
-        result.print_table_raw(result.results[host], auto_header=True, title=host)
+    result = get_cmdb_firewall_service_custom(host, name, vdom, output_file, _get_fields(fields))
+    _print_result(result, output_file)
 
 
 @app.command()
@@ -164,7 +198,8 @@ def service_group(
     host: Annotated[
         str,
         typer.Argument(
-            help="The FortiGate hostname to access (must be defined in the inventory).",
+            help="The FortiGate hostname to access (must be defined in the inventory). "
+            "Wildcard * is supported to access several FortiGates.",
             metavar="[host]",
         ),
     ],
@@ -193,11 +228,66 @@ def service_group(
             show_default=False,
         ),
     ] = None,
+    fields: Annotated[
+        str | None,
+        typer.Option(
+            "--fields",
+            "-f",
+            help="The fields to request ('field1,field2' or '*' for all fields). "
+            "Defaults to the fields shown in the table.",
+            metavar="[fields]",
+            show_default=False,
+        ),
+    ] = None,
 ) -> None:
     """Get FortiGate cmdb firewall service group."""
     if name and ("*" in vdom or "," in vdom):
         raise GeneralError("With name argument you have to specify one single VDOM (with --vdom)")
 
-    result = get_cmdb_firewall_service_group(host, name, vdom, output_file)
+    result = get_cmdb_firewall_service_group(host, name, vdom, output_file, _get_fields(fields))
+    _print_result(result, output_file)
+
+
+def _get_fields(fields: str | None) -> list[str] | None:
+    """
+    Get the fields to request from the --fields option.
+
+    Args:
+        fields: The value of the --fields option
+
+    Returns:
+        The fields to request (None for the default fields, an empty list for all fields)
+    """
+    if fields is None:
+        return None
+
+    if fields.strip() == "*":
+        return []
+
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def _print_result(result: Result[list[Any]], output_file: str | None) -> None:
+    """
+    Print the result of every FortiGate as a table and the error messages.
+
+    Args:
+        result:      The Result object of the cmdb get
+        output_file: The output file given (nothing but the messages is printed if given)
+
+    Raises:
+        GeneralError: If any FortiGate failed (so the command does not exit successfully)
+    """
     if not output_file:
-        result.print_table_raw(result.results[host], auto_header=True, title=host)
+        for host, entries in result.all_results().items():
+            if entries:
+                result.print_table_raw(entries, auto_header=True, title=host)
+
+    result.print_messages()
+    failed = [
+        host
+        for host, messages in result.messages.items()
+        if any(message["level"] == "error" for message in messages)
+    ]
+    if failed:
+        raise GeneralError(f"Failed to get the table from {', '.join(sorted(failed))}")
@@ -75,6 +75,16 @@ def callback(  # pylint: disable=too-many-arguments, too-many-positional-argumen
     log_quiet: Annotated[
         bool, typer.Option("--quiet", "-q", help="Disable console logging.", show_default=False)
     ] = False,
+    workers: Annotated[
+        int | None,
+        typer.Option(
+            "--workers",
+            help="Set the number of devices processed at the same time by the fleet tools.",
+            metavar="[number]",
+            show_default=False,
+            min=1,
+        ),
+    ] = None,
     version: Annotated[  # pylint: disable=unused-argument
         bool | None,
         typer.Option(
@@ -94,6 +104,8 @@ def callback(  # pylint: disable=too-many-arguments, too-many-positional-argumen
     """
     config.load_configuration(config_file)
     config.no_logo = True if nologo else config.no_logo
+    if workers:
+        config.fleet["workers"] = workers
 
     if log_level:
         log_level = log_level.upper()
@@ -112,7 +124,7 @@ def callback(  # pylint: disable=too-many-arguments, too-many-positional-argumen
         if attr.startswith("_") or attr in ["config", "load_configuration"]:
             continue
 
-        if attr in ["audit_logging", "logging", "vault"] and getattr(config, attr):
+        if attr in ["audit_logging", "fleet", "logging", "vault"] and getattr(config, attr):
             for sub_attr, value in getattr(config, attr).items():
                 if attr == "vault" and sub_attr in ["role_id", "secret_id"]:
                     value = f"{value[:4]}...{value[-4:]}"
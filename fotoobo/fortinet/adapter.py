@@ -0,0 +1,321 @@
+"""
+The FortinetAdapter class
+"""
+
+import logging
+import os
+import socket
+import ssl
+import threading
+import weakref
+from typing import Any
+
+from requests import PreparedRequest
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+from urllib3 import BaseHTTPResponse
+
+from .response import FortinetResponse
+
+log = logging.getLogger("fotoobo")
+
+_ssl_contexts: dict[bool | str, "ResumingSSLContext"] = {}
+_ssl_contexts_lock = threading.Lock()
+
+
+class _ResumingSSLSocket(ssl.SSLSocket):  # pylint: disable=abstract-method
+    """
+    An SSLSocket which hands over its TLS session to its SSLContext before it is closed.
+    """
+
+    def _real_close(self) -> None:
+        """
+        Save the TLS session and close the socket.
+        """
+        if isinstance(self.context, ResumingSSLContext) and self.server_hostname:
+            self.context.save_session(self.server_hostname, self.session)
+
+        super()._real_close()  # type: ignore[misc]
+
+
+class ResumingSSLContext(ssl.SSLContext):  # pylint: disable=too-many-instance-attributes
+    """
+    An SSLContext which resumes the TLS sessions of earlier connections to the same server.
+
+    The session (or session ticket) of the last connection to a server is handed over to the next
+    connection to the same server. So only the very first connection to a device needs a full TLS
+    handshake as long as the device accepts the resumption.
+    """
+
+    def __init__(self, protocol: int) -> None:
+        """
+        Create the SSLContext.
+
+        Args:
+            protocol: The SSL protocol to use (it is already handled by ssl.SSLContext.__new__())
+        """
+        super().__init__()
+        self.protocol_version = protocol
+        self.sslsocket_class = _ResumingSSLSocket
+        self._tls_lock = threading.Lock()
+        self._tls_sessions: dict[str, ssl.SSLSession] = {}
+        self._tls_sockets: dict[str, weakref.ref[ssl.SSLSocket]] = {}
+
+    def wrap_socket(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        sock: socket.socket,
+        server_side: bool = False,
+        do_handshake_on_connect: bool = True,
+        suppress_ragged_eofs: bool = True,
+        server_hostname: str | bytes | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> ssl.SSLSocket:
+        """
+        Wrap a socket and resume the last TLS session to the same server (if there is one).
+
+        See ssl.SSLContext.wrap_socket() for the arguments.
+        """
+        key = server_hostname.decode() if isinstance(server_hostname, bytes) else server_hostname
+        if key and not server_side and session is None:
+            session = self.get_session(key)
+
+        ssl_sock = super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session,
+        )
+
+        if key and not server_side:
+            if ssl_sock.session_reused:
+                log.debug("TLS session resumed for '%s'", key)
+
+            with self._tls_lock:
+                self._tls_sockets[key] = weakref.ref(ssl_sock)
+
+        return ssl_sock
+
+    def save_session(self, server_hostname: str, session: ssl.SSLSession | None) -> None:
+        """
+        Save the TLS session of a connection to a server.
+
+        Args:
+            server_hostname: The hostname of the server
+            session:         The TLS session of the connection
+        """
+        if session is not None:
+            with self._tls_lock:
+                self._tls_sessions[server_hostname] = session
+
+    def get_session(self, server_hostname: str) -> ssl.SSLSession | None:
+        """
+        Get the latest TLS session to a server.
+
+        With TLS 1.3 the session tickets are sent after the handshake, so the session is taken from
+        the last socket to the server as long as it is still alive.
+
+        Args:
+            server_hostname: The hostname of the server
+
+        Returns:
+            The latest TLS session or None if there was no connection to the server yet
+        """
+        with self._tls_lock:
+            ref = self._tls_sockets.get(server_hostname)
+            ssl_sock = ref() if ref else None
+            if ssl_sock is not None and ssl_sock.session is not None:
+                self._tls_sessions[server_hostname] = ssl_sock.session
+
+            return self._tls_sessions.get(server_hostname)
+
+
+def get_ssl_context(ssl_verify: bool | str) -> ResumingSSLContext:
+    """
+    Get the shared SSLContext for an ssl_verify value.
+
+    There is only one SSLContext per distinct ssl_verify value in the whole process. So the CA
+    bundle is only loaded once and the TLS sessions can be resumed across all the devices.
+
+    Args:
+        ssl_verify: True to verify the certificates with the default CA bundle, the path to a CA
+                    bundle (file or directory) or False to not verify the certificates at all
+
+    Returns:
+        The shared SSLContext
+
+    Raises:
+        OSError: If the CA bundle does not exist
+    """
+    with _ssl_contexts_lock:
+        if ssl_verify not in _ssl_contexts:
+            context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.minimum_version = ssl.TLSVersion.TLSv1_2
+            if ssl_verify is False:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+
+            else:
+                cert_loc = ssl_verify if isinstance(ssl_verify, str) else DEFAULT_CA_BUNDLE_PATH
+                log.debug("Loading CA bundle '%s'", cert_loc)
+                if os.path.isdir(cert_loc):
+                    context.load_verify_locations(capath=cert_loc)
+
+                else:
+                    context.load_verify_locations(cafile=cert_loc)
+
+            _ssl_contexts[ssl_verify] = context
+
+        return _ssl_contexts[ssl_verify]
+
+
+class FortinetAdapter(HTTPAdapter):
+    """
+    The transport adapter used by the requests sessions of all Fortinet devices.
+
+    It is a requests HTTPAdapter with a configurable connection pool. Adapters may also be shared
+    between sessions by using get() which returns the same adapter for every host and port in the
+    whole process. This way several Fortinet objects connecting to the same device (e.g. the same
+    FortiManager or a HA cluster IP) reuse the warm keep-alive connections instead of doing a new
+    TLS handshake for every object.
+
+    For https the adapter uses the shared SSLContext of the ssl_verify value (see
+    get_ssl_context()) instead of letting every new connection load the CA bundle again. Its
+    responses are FortinetResponse objects which decode their JSON body only once.
+    """
+
+    _adapters: dict[str, "FortinetAdapter"] = {}
+    _adapters_lock = threading.Lock()
+
+    def __init__(
+        self,
+        connections: int = DEFAULT_POOLSIZE,
+        maxsize: int = DEFAULT_POOLSIZE,
+        block: bool = DEFAULT_POOLBLOCK,
+    ) -> None:
+        """
+        Create a transport adapter.
+
+        Args:
+            connections: The number of connection pools to cache (one pool per host)
+            maxsize:     The maximum number of connections to keep in a pool. Set it to at least
+                         the number of threads using the adapter at the same time.
+            block:       Wait for a free connection if the pool is exhausted instead of opening an
+                         additional one which is discarded after the request
+        """
+        super().__init__(pool_connections=connections, pool_maxsize=maxsize, pool_block=block)
+
+    def build_connection_pool_key_attributes(
+        self,
+        request: PreparedRequest,
+        verify: bool | str,
+        cert: str | tuple[str, str] | None = None,
+    ) -> tuple[Any, Any]:
+        """
+        Build the attributes of the connection pool for a request.
+
+        It hands over the shared SSLContext to urllib3 instead of the path to the CA bundle.
+
+        Args:
+            request: The request to send
+            verify:  The ssl_verify value
+            cert:    The client certificate (if any)
+
+        Returns:
+            The host parameters and the connection pool arguments
+        """
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(
+            request, verify, cert
+        )
+        if host_params["scheme"] == "https":
+            pool_kwargs.pop("ca_certs", None)
+            pool_kwargs.pop("ca_cert_dir", None)
+            pool_kwargs["ssl_context"] = get_ssl_context(verify)
+
+        return host_params, pool_kwargs
+
+    def build_response(self, req: PreparedRequest, resp: BaseHTTPResponse) -> FortinetResponse:
+        """
+        Build the response for a request.
+
+        Args:
+            req:  The request which was sent
+            resp: The urllib3 response
+
+        Returns:
+            The response which decodes its JSON body only once
+        """
+        return FortinetResponse.from_response(super().build_response(req, resp))
+
+    def cert_verify(self, conn: Any, url: str, verify: bool | str, cert: Any) -> None:
+        """
+        Set the certificate verification for a connection pool.
+
+        The CA bundle is already loaded into the shared SSLContext of the connection pool so it is
+        removed from the connection pool to not load it again for every new connection.
+
+        Args:
+            conn:   The connection pool
+            url:    The URL of the request
+            verify: The ssl_verify value
+            cert:   The client certificate (if any)
+        """
+        super().cert_verify(conn, url, verify, cert)  # type: ignore[no-untyped-call]
+        if isinstance(getattr(conn, "conn_kw", {}).get("ssl_context"), ResumingSSLContext):
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+    @classmethod
+    def from_config(cls, hostname: str, https_port: int, pool: dict[str, Any]) -> "FortinetAdapter":
+        """
+        Get a transport adapter for the given pool configuration.
+
+        Args:
+            hostname:   The hostname of the Fortinet device
+            https_port: The tcp port of the https api of the Fortinet device
+            pool:       The pool configuration (see __init__() for available options). Use the
+                        additional option 'shared' to get the process-wide adapter of this host.
+
+        Returns:
+            A new or the shared transport adapter
+        """
+        pool = dict(pool)
+        if pool.pop("shared", False):
+            return cls.get(hostname, https_port, **pool)
+
+        return cls(**pool)
+
+    @classmethod
+    def get(cls, hostname: str, https_port: int, **kwargs: Any) -> "FortinetAdapter":
+        """
+        Get the shared transport adapter for a host and port.
+
+        The adapter is created with the given arguments if it does not exist yet.
+
+        Args:
+            hostname:   The hostname of the Fortinet device
+            https_port: The tcp port of the https api of the Fortinet device
+            **kwargs:   See __init__() for available arguments
+
+        Returns:
+            The shared transport adapter for the host and port
+        """
+        key = f"{hostname}:{https_port}"
+        with cls._adapters_lock:
+            if key not in cls._adapters:
+                log.debug("Creating shared adapter for '%s'", key)
+                cls._adapters[key] = FortinetAdapter(**kwargs)
+
+            return cls._adapters[key]
+
+    @classmethod
+    def reset_all(cls) -> None:
+        """
+        Close and forget all the shared transport adapters in this process.
+        """
+        with cls._adapters_lock:
+            for adapter in cls._adapters.values():
+                adapter.close()
+
+            cls._adapters = {}
@@ -0,0 +1,172 @@
+"""
+The CircuitBreaker class
+"""
+
+import logging
+import threading
+from pathlib import Path
+from time import time
+from typing import Any
+
+from fotoobo.exceptions import GeneralError
+from fotoobo.helpers import json_codec
+
+log = logging.getLogger("fotoobo")
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """
+    A circuit breaker for a single host.
+
+    After a given number of consecutive connection failures the circuit opens and every request to
+    the host immediately fails for the cool-down period. After the cool-down period one single
+    request (the half-open probe) is let through. If it succeeds the circuit closes again, if it
+    fails the circuit stays open for another cool-down period.
+
+    There is only one circuit breaker per hostname in the whole process (see get()) so every
+    Fortinet object and every tool connecting to the same host shares its state. The state may
+    optionally be persisted to a file so it also survives the process.
+    """
+
+    _breakers: dict[str, "CircuitBreaker"] = {}
+    _breakers_lock = threading.Lock()
+
+    def __init__(
+        self, hostname: str, threshold: int = 0, cooldown: float = 300, state_path: str = ""
+    ) -> None:
+        """
+        Create a circuit breaker.
+
+        Args:
+            hostname:   The hostname the circuit breaker is for
+            threshold:  The number of consecutive connection failures which open the circuit
+                        (0 disables the circuit breaker)
+            cooldown:   The time in seconds the circuit stays open
+            state_path: The directory to persist the state in (no persistence if empty)
+        """
+        self.hostname = hostname
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state_file: Path | None = None
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self._probe_started: float = 0.0
+        self._lock = threading.Lock()
+
+        if state_path:
+            self.state_file = Path(state_path).expanduser() / f"{hostname}.circuit"
+            self._load_state()
+
+    @classmethod
+    def get(cls, hostname: str, **kwargs: Any) -> "CircuitBreaker":
+        """
+        Get the circuit breaker for a hostname.
+
+        The circuit breaker is created with the given arguments if it does not exist yet.
+
+        Args:
+            hostname: The hostname to get the circuit breaker for
+            **kwargs: See __init__() for available arguments
+
+        Returns:
+            The circuit breaker for the hostname
+        """
+        with cls._breakers_lock:
+            if hostname not in cls._breakers:
+                cls._breakers[hostname] = CircuitBreaker(hostname, **kwargs)
+
+            return cls._breakers[hostname]
+
+    @classmethod
+    def reset_all(cls) -> None:
+        """
+        Forget the state of all the circuit breakers in this process.
+        """
+        with cls._breakers_lock:
+            cls._breakers = {}
+
+    def before_request(self) -> None:
+        """
+        Check if a request to the host may be done.
+
+        Raises:
+            GeneralError: If the circuit is open
+        """
+        if not self.threshold:
+            return
+
+        with self._lock:
+            if self.failures < self.threshold:
+                return
+
+            now = time()
+            remaining = self.opened_at + self.cooldown - now
+            if remaining <= 0 and now - self._probe_started > self.cooldown:
+                log.debug("Circuit half-open, probing '%s'", self.hostname)
+                self._probe_started = now
+                return
+
+        raise GeneralError(f"Circuit open for {max(remaining, 0):.0f}s ({self.hostname})")
+
+    def record_failure(self) -> None:
+        """
+        Record a connection failure.
+        """
+        if not self.threshold:
+            return
+
+        with self._lock:
+            self.failures += 1
+            self._probe_started = 0.0
+            if self.failures >= self.threshold:
+                if self.failures == self.threshold:
+                    log.warning("Circuit opened for '%s'", self.hostname)
+
+                self.opened_at = time()
+
+            self._save_state()
+
+    def record_success(self) -> None:
+        """
+        Record a successful connection.
+        """
+        if not self.threshold or not self.failures:
+            return
+
+        with self._lock:
+            if self.failures >= self.threshold:
+                log.info("Circuit closed for '%s'", self.hostname)
+
+            self.failures = 0
+            self.opened_at = 0.0
+            self._probe_started = 0.0
+            self._save_state()
+
+    def _load_state(self) -> None:
+        """
+        Load the state from the state file (if there is one).
+        """
+        if self.state_file and self.state_file.is_file():
+            log.debug("Loading circuit state from file '%s'", self.state_file)
+            try:
+                state = json_codec.loads(self.state_file.read_text(encoding="UTF-8"))
+                self.failures = int(state["failures"])
+                self.opened_at = float(state["opened_at"])
+
+            except (ValueError, KeyError, TypeError):
+                log.debug("Circuit state file '%s' is invalid", self.state_file)
+
+    def _save_state(self) -> None:
+        """
+        Save the state to the state file (if persistence is enabled).
+        """
+        if self.state_file:
+            try:
+                self.state_file.write_text(
+                    json_codec.dumps({"failures": self.failures, "opened_at": self.opened_at}),
+                    encoding="UTF-8",
+                )
+
+            except OSError as err:
+                log.debug(err)
+                log.warning("Unable to save circuit state file '%s'", self.state_file)
@@ -57,6 +57,7 @@ class FortiClientEMS(Fortinet):
         params: dict[str, str] | None = None,
         payload: dict[str, Any] | None = None,
         timeout: float | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         API request to a FortiClientEMS device.
@@ -68,6 +69,7 @@ class FortiClientEMS(Fortinet):
             params:  Dictionary with parameters (if needed)
             payload: JSON body for post requests (if needed)
             timeout: The requests read timeout
+            stream:  Do not download the body immediately (see Fortinet.api())
 
         Returns:
             Response from the request
@@ -76,7 +78,13 @@ class FortiClientEMS(Fortinet):
             headers = self.session.headers  # type: ignore
 
         return super().api(
-            method, url, payload=payload, params=params, timeout=timeout, headers=headers
+            method,
+            url,
+            payload=payload,
+            params=params,
+            timeout=timeout,
+            headers=headers,
+            stream=stream,
         )
 
     def get_version(self) -> str:
@@ -131,10 +139,8 @@ class FortiClientEMS(Fortinet):
 
                 try:
                     response = self.api("get", "/system/serial_number")
-                    if (
-                        "retval" in response.json()["result"]
-                        and int(response.json()["result"]["retval"]) == 1
-                    ):
+                    result = response.json()["result"]
+                    if "retval" in result and int(result["retval"]) == 1:
                         log.debug(
                             "Session with given cookie is valid (status: '%s')",
                             response.status_code,
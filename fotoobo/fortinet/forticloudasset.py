@@ -54,6 +54,7 @@ class FortiCloudAsset(Fortinet):
         params: dict[str, str] | None = None,
         payload: dict[str, Any] | None = None,
         timeout: float | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         API request to a FortiManager device.
@@ -68,6 +69,7 @@ class FortiCloudAsset(Fortinet):
             params:  Dictionary with parameters (if needed)
             payload: JSON body for post requests (if needed)
             timeout: The requests read timeout in seconds
+            stream:  Do not download the body immediately (see Fortinet.api())
 
         Returns:
             Response: Response object from the request
@@ -81,7 +83,13 @@ class FortiCloudAsset(Fortinet):
             "Authorization": f"Bearer {self.access_token}",
         }
         return super().api(
-            method, url, headers=headers, payload=payload, params=params, timeout=timeout
+            method,
+            url,
+            headers=headers,
+            payload=payload,
+            params=params,
+            timeout=timeout,
+            stream=stream,
         )
 
     def get_version(self) -> str:
@@ -164,8 +172,9 @@ class FortiCloudAsset(Fortinet):
             )
 
             if response.status_code == 200:
-                if "access_token" in response.json():
-                    self.access_token = response.json()["access_token"]
+                data = response.json()
+                if "access_token" in data:
+                    self.access_token = data["access_token"]
                     if self.token_path:
                         log.debug("Saving access token into file '%s'", token_file)
 
@@ -2,17 +2,25 @@
 FortiGate class.
 """
 
+import hashlib
 import logging
-from typing import Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
 
 import requests
 
-from fotoobo.exceptions import APIError, GeneralWarning
+from fotoobo.exceptions import APIError, GeneralError, GeneralWarning
+from fotoobo.helpers import json_codec
+from fotoobo.helpers.concurrency import clear_overload, overload_reported, report_overload
 
 from .fortinet import Fortinet
 
 log = logging.getLogger("fotoobo")
 
+DEFAULT_PAGE_SIZE = 1000
+
 
 class FortiGate(Fortinet):
     """
@@ -44,6 +52,7 @@ class FortiGate(Fortinet):
         params: dict[str, str] | None = None,
         payload: dict[str, Any] | None = None,
         timeout: float | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         Native API request to a FortiGate.
@@ -57,6 +66,7 @@ class FortiGate(Fortinet):
             params:  Dictionary with parameters (if needed)
             payload: JSON body for post requests (if needed)
             timeout: The requests read timeout
+            stream:  Do not download the body immediately (see Fortinet.api())
 
         Returns:
             Response from the request
@@ -66,10 +76,22 @@ class FortiGate(Fortinet):
         self.session.headers.update({"Authorization": f"Bearer {self.token}"})
 
         return super().api(
-            method, url, payload=payload, params=params, timeout=timeout, headers=headers
+            method,
+            url,
+            payload=payload,
+            params=params,
+            timeout=timeout,
+            headers=headers,
+            stream=stream,
         )
 
-    def api_get(self, url: str, vdom: str = "*", timeout: float | None = None) -> list[Any]:
+    def api_get(
+        self,
+        url: str,
+        vdom: str = "*",
+        timeout: float | None = None,
+        fields: list[str] | None = None,
+    ) -> list[Any]:
         """
         Low level GET request to a FortiGate.
 
@@ -80,18 +102,199 @@ class FortiGate(Fortinet):
             url:     The API endpoint to access
             vdom:    The VDOM to access ("vdom1" or "vdom1,vdom2" or "*")
             timeout: The time to wait for a response from the FortiGate
+            fields:  The fields of the entries to request (all fields if not given)
 
         Returns:
             The Result object with all the results as list (even if only one result is returned)
         """
 
-        params = {"vdom": vdom}
+        params = self._get_params(vdom, fields)
         response = self.api(method="get", url=url, params=params, timeout=timeout)
-        data: list[Any] = (
-            [response.json()] if isinstance(response.json(), dict) else response.json()
-        )  # this is to listify the data from the response
+        data = response.json()
+
+        # this is to listify the data from the response
+        return [data] if isinstance(data, dict) else data
+
+    def api_get_paged(  # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+        self,
+        url: str,
+        vdom: str = "*",
+        page_size: int = DEFAULT_PAGE_SIZE,
+        prefetch: bool = True,
+        timeout: float | None = None,
+        fields: list[str] | None = None,
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Low level paged GET request to a FortiGate.
+
+        Other than api_get() the table is requested page by page (FortiOS parameters 'start' and
+        'count') and its entries are yielded one by one as the pages arrive. So even huge CMDB
+        tables never have to be in memory as a whole and every single request is small enough to
+        finish within the timeout. A VDOM is done as soon as it returns less entries than
+        page_size, the following pages are only requested from the VDOMs which are not done yet.
+        A VDOM which returns more entries than page_size or the same page again (the same first and
+        last entry) ignored the paging (it returned the whole table), so it is done as well. A
+        repeated page is dropped.
+
+        Args:
+            url:       The API endpoint to access
+            vdom:      The VDOM to access ("vdom1" or "vdom1,vdom2" or "*")
+            page_size: The number of entries to request at once
+            prefetch:  Request the next page in the background while the entries of the current
+                       page are processed
+            timeout:   The time to wait for the response of a single page
+            fields:    The fields of the entries to request (all fields if not given)
+
+        Yields:
+            The VDOM and the entry for every entry of the table
+
+        Raises:
+            GeneralError: If page_size is lower than 1
+        """
+        if page_size < 1:
+            raise GeneralError("The page size has to be at least 1")
+
+        def _get_page(start: int, vdoms: str) -> list[Any]:
+            params = self._get_params(vdoms, fields)
+            params.update({"start": str(start), "count": str(page_size)})
+            log.debug("Getting page '%s' of '%s' from '%s'", start // page_size, url, self.hostname)
+            data = self.api(method="get", url=url, params=params, timeout=timeout).json()
+
+            return [data] if isinstance(data, dict) else data
+
+        # The overload feedback is kept per thread (see helpers.concurrency), so the overload
+        # reported in the prefetch thread is handed over to the calling thread
+        prefetch_overloaded = threading.Event()
 
-        return data
+        def _prefetch_page(start: int, vdoms: str) -> list[Any]:
+            clear_overload()
+            try:
+                return _get_page(start, vdoms)
+
+            finally:
+                if overload_reported():
+                    prefetch_overloaded.set()
+
+        # A prefetched page which is not needed anymore (e.g. the generator is closed early) is
+        # cancelled or at least not waited for
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            start = 0
+            page = _get_page(start, vdom)
+            # The first and last entry of the last page of every VDOM
+            bounds: dict[str, tuple[Any, Any]] = {}
+            while page:
+                pages, unfinished = self._split_page(url, page, vdom, page_size, bounds)
+                start += page_size
+                next_page: Future[list[Any]] | None = None
+                if unfinished and prefetch:
+                    next_page = executor.submit(_prefetch_page, start, ",".join(unfinished))
+
+                yield from ((name, entry) for name, results in pages for entry in results)
+
+                if next_page:
+                    try:
+                        page = next_page.result()
+
+                    finally:
+                        if prefetch_overloaded.is_set():
+                            prefetch_overloaded.clear()
+                            report_overload()
+
+                else:
+                    page = _get_page(start, ",".join(unfinished)) if unfinished else []
+
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _split_page(
+        self,
+        url: str,
+        page: list[Any],
+        vdom: str,
+        page_size: int,
+        bounds: dict[str, tuple[Any, Any]],
+    ) -> tuple[list[tuple[str, list[Any]]], list[str]]:
+        """
+        Split a page of api_get_paged() into the entries of every VDOM and find the unfinished
+        VDOMs.
+
+        Args:
+            url:       The API endpoint of the page
+            page:      The page (the response of every VDOM)
+            vdom:      The VDOM the page was requested for (if the response has none)
+            page_size: The number of entries requested at once
+            bounds:    The first and last entry of the last page of every VDOM (updated)
+
+        Returns:
+            The entries of every VDOM (without the repeated pages) and the unfinished VDOMs
+        """
+        pages = []
+        unfinished = []
+        for data in page:
+            name, results = str(data.get("vdom", vdom)), data.get("results", [])
+            if results and bounds.get(name) == (results[0], results[-1]):
+                log.warning("'%s' ignored the paging of '%s' (VDOM '%s')", self.hostname, url, name)
+                continue
+
+            pages.append((name, results))
+            if results:
+                bounds[name] = (results[0], results[-1])
+
+            if len(results) == page_size:
+                unfinished.append(name)
+
+            elif len(results) > page_size:
+                log.warning("'%s' ignored the paging of '%s' (VDOM '%s')", self.hostname, url, name)
+
+        return pages, unfinished
+
+    async def api_get_async(
+        self,
+        url: str,
+        vdom: str = "*",
+        timeout: float | None = None,
+        fields: list[str] | None = None,
+    ) -> list[Any]:
+        """
+        Asynchronous low level GET request to a FortiGate.
+
+        This is the asyncio counterpart of api_get().
+
+        Args:
+            url:     The API endpoint to access
+            vdom:    The VDOM to access ("vdom1" or "vdom1,vdom2" or "*")
+            timeout: The time to wait for a response from the FortiGate
+            fields:  The fields of the entries to request (all fields if not given)
+
+        Returns:
+            The data from the response as list (even if only one result is returned)
+        """
+
+        params = self._get_params(vdom, fields)
+        response = await self.api_async(method="get", url=url, params=params, timeout=timeout)
+        data = response.json()
+
+        return [data] if isinstance(data, dict) else data
+
+    @staticmethod
+    def _get_params(vdom: str, fields: list[str] | None) -> dict[str, str]:
+        """
+        Get the parameters of a GET request.
+
+        Args:
+            vdom:   The VDOM to access ("vdom1" or "vdom1,vdom2" or "*")
+            fields: The fields of the entries to request. They are handed over to FortiOS with the
+                    'format' parameter, so the FortiGate only returns these fields of every entry.
+
+        Returns:
+            The parameters for the request
+        """
+        params = {"vdom": vdom}
+        if fields:
+            params["format"] = "|".join(fields)
+
+        return params
 
     def backup(self, timeout: int = 60) -> str:
         """
@@ -110,6 +313,148 @@ class FortiGate(Fortinet):
 
         return data.text
 
+    async def backup_async(self, timeout: int = 60) -> str:
+        """
+        Asynchronously get the configuration backup from a FortiGate.
+
+        The request runs in a worker thread (see api_async()).
+
+        Args:
+            timeout: Timeout in sec to wait for the response
+
+        Returns:
+            Configuration backup as text
+        """
+
+        data = await self.api_async(
+            "get", "monitor/system/config/backup", params={"scope": "global"}, timeout=timeout
+        )
+
+        return data.text
+
+    def backup_to_file(
+        self, file: Path, timeout: int = 60, chunk_size: int = 1024 * 1024
+    ) -> dict[str, Any]:
+        """
+        Stream the configuration backup from a FortiGate directly into a file.
+
+        Other than backup() the configuration is never held in memory as a whole. It is written to
+        a temporary file chunk by chunk as it arrives which is then renamed to the given file. If
+        the first chunk is not a valid configuration backup (starting with '#config-version') no
+        file is written at all.
+
+        Args:
+            file:       The file to write the configuration backup to
+            timeout:    Timeout in sec to wait for the response
+            chunk_size: The size of the chunks in bytes to read and write at once
+
+        Returns:
+            Some metadata of the backup: The file, its size in bytes, its sha256 checksum and the
+            config-version header (the first line of the configuration backup)
+
+        Raises:
+            GeneralWarning: If the FortiGate did not return a valid configuration backup or the
+                            download was interrupted
+        """
+
+        response = self.api(
+            "get",
+            "monitor/system/config/backup",
+            params={"scope": "global"},
+            timeout=timeout,
+            stream=True,
+        )
+        part_file = file.with_name(f"{file.name}.part")
+        checksum = hashlib.sha256()
+        header = b""
+        size = 0
+
+        try:
+            chunks = response.iter_content(chunk_size=chunk_size)
+            first_chunk = b""
+            for chunk in chunks:
+                first_chunk += chunk
+                if len(first_chunk) >= len(b"#config-version"):
+                    break
+
+            if not first_chunk.startswith(b"#config-version"):
+                error = self._get_backup_error(first_chunk + b"".join(chunks))
+                raise GeneralWarning(f"Backup failed with error '{error}' ({self.hostname})")
+
+            header = first_chunk.split(b"\n", 1)[0].strip()
+            with part_file.open("wb") as out_file:
+                out_file.write(first_chunk)
+                checksum.update(first_chunk)
+                size = len(first_chunk)
+                for chunk in chunks:
+                    out_file.write(chunk)
+                    checksum.update(chunk)
+                    size += len(chunk)
+
+            part_file.replace(file)
+
+        except requests.exceptions.RequestException as err:
+            log.debug(err)
+            raise GeneralWarning(f"Backup download interrupted ({self.hostname})") from err
+
+        finally:
+            response.close()
+            part_file.unlink(missing_ok=True)
+
+        log.debug("Backup of '%s' saved to '%s' (%s bytes)", self.hostname, file, size)
+
+        return {
+            "config_version": header.decode("UTF-8", errors="replace"),
+            "file": str(file),
+            "sha256": checksum.hexdigest(),
+            "size": size,
+        }
+
+    @staticmethod
+    def _get_backup_error(data: bytes) -> str:
+        """
+        Get the error from a failed configuration backup.
+
+        Args:
+            data: The response of the FortiGate which is not a configuration backup
+
+        Returns:
+            The http_status from the JSON response or 'unknown' if there is none
+        """
+        try:
+            return str(json_codec.loads(data)["http_status"])
+
+        except (ValueError, KeyError, TypeError):
+            return "unknown"
+
+    def get_config_checksum(self) -> str:
+        """
+        Get the checksum of the whole configuration of a FortiGate.
+
+        The checksum is taken from the HA checksums (which are also available on standalone
+        FortiGates). It is a cheap way to find out if the configuration changed without downloading
+        it.
+
+        Returns:
+            The checksum of the whole configuration
+
+        Raises:
+            GeneralWarning: If the FortiGate did not return a configuration checksum
+        """
+
+        try:
+            data = self.api("get", "monitor/system/ha-checksums").json()
+
+        except APIError as err:
+            log.warning("'%s' returned: '%s'", self.hostname, err.message)
+            raise GeneralWarning(f"{self.hostname} returned: {err.message}") from err
+
+        for node in data.get("results", []):
+            if node.get("serial_no") == data.get("serial") and node.get("checksum", {}).get("all"):
+                return str(node["checksum"]["all"])
+
+        raise GeneralWarning(f"{self.hostname} returned no config checksum")
+
     def get_version(self) -> str:
         """
         Get FortiGate version.
@@ -130,3 +475,24 @@ class FortiGate(Fortinet):
         fgt_version = response.json().get("version", "unknown")
 
         return fgt_version
+
+    async def get_version_async(self) -> str:
+        """
+        Asynchronously get FortiGate version.
+
+        The request runs in a worker thread (see api_async()).
+
+        Returns:
+            FortiGate version
+        """
+
+        try:
+            response = await self.api_async("get", "monitor/system/status")
+
+        except APIError as err:
+            log.warning("'%s' returned: '%s'", self.hostname, err.message)
+            raise GeneralWarning(f"{self.hostname} returned: {err.message}") from err
+
+        fgt_version: str = response.json().get("version", "unknown")
+
+        return fgt_version
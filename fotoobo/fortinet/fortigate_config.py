@@ -2,25 +2,29 @@
 The FortiGate configuration class represents the whole or parts of a FortiGate configuration
 """
 
+import hashlib
 import logging
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any, IO
+from typing import Any, Iterable
 
 from fotoobo.exceptions import GeneralWarning
-from fotoobo.helpers.files import load_json_file, save_json_file
+from fotoobo.helpers.files import load_json_file, open_text_file, save_json_file
 
+from .fortigate_config_record import FortiGateConfigRecord
 from .fortigate_info import FortiGateInfo
 
 log = logging.getLogger("fotoobo")
 
+# Marks a configuration part which is missing on one side of a diff
+_MISSING = object()
+
 
 class FortiGateConfig:
     """
     The FortiGateConfig class represents a FortiGate configuration (or parts of it)
     """
 
-    _config_path: list[str] = []
-
     def __init__(
         self,
         global_config: dict[str, Any] | None = None,
@@ -30,6 +34,9 @@ class FortiGateConfig:
         self.global_config = global_config or {}
         self.vdom_config = vdom_config or {}
         self.info = FortiGateInfo(**(info or {}))
+        self._index: dict[tuple[str, tuple[str, ...]], Any] | None = None
+        self._lookups: dict[tuple[str, str], Any] = {}
+        self._compact = False
         try:
             self.info.hostname = self.global_config["system"]["global"]["hostname"]
 
@@ -48,15 +55,22 @@ class FortiGateConfig:
             /system/global/...          : Sub-path in global configuration
             /system/global/admin-scp    : Exact configuration option
             /root/firewall/address/...  : Sub-path in root vdom
+            /root/firewall/policy/1     : Entry of a configuration list by its 'id' (or position)
 
         Returns:
             FortiGateConfig configuration value or snippet from the given path.
-            If the path or value does not exist None is returned.
+            If the path or value does not exist an empty dict is returned. The snippet is a part
+            of the configuration itself (and memoized if the index is enabled), so it must be
+            treated as read-only. Copy it before changing it.
         """
         log.debug("Getting configuration from scope: '%s'", scope)
         log.debug("Getting configuration from path: '%s'", path)
+        if self._index is not None and (scope, path) in self._lookups:
+            lookup = self._lookups[(scope, path)]
+            return {} if lookup is _MISSING else lookup
+
         # split the path by / and remove all empty parts
-        path_list: list[str] = [p for p in path.strip("/").split("/") if p]
+        path_list = tuple(p for p in path.strip("/").split("/") if p)
         config: Any = {}
 
         if scope == "global":
@@ -65,16 +79,59 @@ class FortiGateConfig:
         elif scope == "vdom":
             config = self.vdom_config
 
-        if len(path_list) > 0:
-            for key in path_list:
-                if key in config:
-                    config = config[key]
-
-                else:
-                    config = {}
+        # continue from the deepest section of the path which is in the index (if any)
+        depth = 0
+        if self._index is not None:
+            for depth in range(len(path_list), 0, -1):
+                if (scope, path_list[:depth]) in self._index:
+                    config = self._index[(scope, path_list[:depth])]
                     break
 
-        return config
+            else:
+                depth = 0
+
+        for depth in range(depth, len(path_list)):
+            config = self._get_child(config, path_list[depth])
+            if config is _MISSING:
+                break
+
+            if self._index is not None and isinstance(config, Mapping):
+                self._index[(scope, path_list[: depth + 1])] = config
+
+        if self._index is not None:
+            # a missing path is memoized as _MISSING so every miss gets a dict of its own
+            self._lookups[(scope, path)] = config
+
+        return {} if config is _MISSING else config
+
+    def enable_index(self) -> None:
+        """
+        Enable the path index of the configuration.
+
+        The index is filled while paths are looked up: Every section get_configuration() walks
+        through is indexed by its path, so later lookups start at the deepest indexed section of
+        their path. Every lookup is memoized as well, so asking for the same path again is a single
+        dictionary hit. This is worth it if many paths are looked up (e.g. by
+        FortiGateConfigCheck). The index is never updated by itself: After the configuration was
+        changed the index has to be enabled again, which drops everything indexed so far.
+        """
+        self._index = {}
+        self._lookups = {}
+
+    def compact(self) -> None:
+        """
+        Convert the configuration into its compact form to save memory.
+
+        The keys and the short values are interned and the sections which only hold settings are
+        stored as read-only FortiGateConfigRecords instead of dicts. get_configuration() works as
+        before, but the returned settings sections are read-only mappings which compare equal to
+        the dicts they replace. The path index (if enabled) is dropped and filled again.
+        """
+        self.global_config = FortiGateConfigRecord.compact(self.global_config)
+        self.vdom_config = FortiGateConfigRecord.compact(self.vdom_config)
+        self._compact = True
+        if self._index is not None:
+            self.enable_index()
 
     def get_vdoms(self) -> list[str]:
         """
@@ -90,6 +147,76 @@ class FortiGateConfig:
 
         return vdoms
 
+    def diff(self, other: "FortiGateConfig") -> list[dict[str, Any]]:
+        """
+        Compare the configuration with another (newer) configuration.
+
+        The configurations are compared structurally: Every added, removed or changed part of the
+        global and the vdom configuration is a delta with its 'scope', its 'path' (which may be
+        passed to get_configuration() of the configuration it is in), its 'type'
+        (added|removed|changed) and its 'old' and/or 'new' value. An added or removed section is a
+        single delta. The entries of a configuration list are compared by their 'id' (or by their
+        position if they have none, see _get_child()).
+
+        Every section is hashed once (see _digest()), so unchanged sections are skipped with a
+        single comparison of their digests no matter how big they are.
+
+        Args:
+            other: The configuration to compare with
+
+        Returns:
+            The deltas in the order of the configurations
+        """
+        deltas: list[dict[str, Any]] = []
+        digests: dict[int, bytes] = {}
+        for scope in ("global", "vdom"):
+            stack: list[tuple[str, Any, Any]] = [
+                ("", self.get_configuration(scope), other.get_configuration(scope))
+            ]
+            while stack:
+                path, old, new = stack.pop()
+                if old is _MISSING:
+                    deltas.append(
+                        {
+                            "scope": scope,
+                            "path": path,
+                            "type": "added",
+                            "new": FortiGateConfigRecord.expand(new),
+                        }
+                    )
+
+                elif new is _MISSING:
+                    deltas.append(
+                        {
+                            "scope": scope,
+                            "path": path,
+                            "type": "removed",
+                            "old": FortiGateConfigRecord.expand(old),
+                        }
+                    )
+
+                elif (isinstance(old, Mapping) and isinstance(new, Mapping)) or (
+                    isinstance(old, list) and isinstance(new, list)
+                ):
+                    if self._digest(old, digests) != self._digest(new, digests):
+                        children = self._diff_children(old, new)
+                        stack.extend((f"{path}/{key}", *nodes) for key, nodes in reversed(children))
+
+                elif old != new:
+                    deltas.append(
+                        {
+                            "scope": scope,
+                            "path": path,
+                            "type": "changed",
+                            "old": FortiGateConfigRecord.expand(old),
+                            "new": FortiGateConfigRecord.expand(new),
+                        }
+                    )
+
+        log.debug("Found '%s' differences", len(deltas))
+
+        return deltas
+
     def save_configuration_file(self, configuration_file: Path) -> None:
         """
         Save the configuration to a json configuration file.
@@ -99,14 +226,113 @@ class FortiGateConfig:
         """
         save_json_file(
             configuration_file,
-            {"global": self.global_config, "vdom": self.vdom_config, "info": self.info.__dict__},
+            {
+                "global": FortiGateConfigRecord.expand(self.global_config),
+                "vdom": FortiGateConfigRecord.expand(self.vdom_config),
+                "info": self.info.__dict__,
+            },
         )
 
+    @staticmethod
+    def _get_child(config: Any, key: str) -> Any:
+        """
+        Get a child of a configuration section or list by its key in a path.
+
+        The entries of a configuration list are addressed by their 'id' if all of them have one or
+        else by their position in the list.
+
+        Args:
+            config: The configuration section or list
+            key:    The key of the child
+
+        Returns:
+            The child (_MISSING if there is no such child)
+        """
+        if isinstance(config, Mapping):
+            return config.get(key, _MISSING)
+
+        if isinstance(config, list):
+            if all(isinstance(entry, Mapping) and "id" in entry for entry in config):
+                return next((entry for entry in config if str(entry["id"]) == key), _MISSING)
+
+            if key.isdigit() and int(key) < len(config):
+                return config[int(key)]
+
+        return _MISSING
+
+    @staticmethod
+    def _diff_children(old: Any, new: Any) -> list[tuple[str, tuple[Any, Any]]]:
+        """
+        Pair the children of two configuration sections (or lists) to compare them.
+
+        Args:
+            old: The old configuration section or list
+            new: The new configuration section or list
+
+        Returns:
+            The key of every child in the old or new configuration with its old and new value
+            (_MISSING if the child is not in the old or new configuration)
+        """
+        if isinstance(old, list):
+            if all(isinstance(entry, Mapping) and "id" in entry for entry in old + new):
+                old = {str(entry["id"]): entry for entry in old}
+                new = {str(entry["id"]): entry for entry in new}
+
+            else:
+                old = {str(index): entry for index, entry in enumerate(old)}
+                new = {str(index): entry for index, entry in enumerate(new)}
+
+        children = [(key, (value, new.get(key, _MISSING))) for key, value in old.items()]
+        children += [(key, (_MISSING, value)) for key, value in new.items() if key not in old]
+
+        return children
+
+    @staticmethod
+    def _digest(config: Any, digests: dict[int, bytes]) -> bytes:
+        """
+        Get the digest of a configuration part.
+
+        The digest of a section is built from the keys and the digests of its children (in the
+        order of the keys), so it only has to be calculated once for every section.
+
+        Args:
+            config:  The configuration part
+            digests: The digests calculated so far by the id of their section or list
+
+        Returns:
+            The digest of the configuration part
+        """
+        if not isinstance(config, (Mapping, list)):
+            return repr(config).encode("UTF-8")
+
+        if id(config) not in digests:
+            digest = hashlib.blake2b(digest_size=16)
+            if isinstance(config, Mapping):
+                digest.update(b"{")
+                for key in sorted(config):
+                    child = FortiGateConfig._digest(config[key], digests)
+                    digest.update(
+                        b"%d:%s%d:%s" % (len(key), key.encode("UTF-8"), len(child), child)
+                    )
+
+            else:
+                digest.update(b"[")
+                for value in config:
+                    child = FortiGateConfig._digest(value, digests)
+                    digest.update(b"%d:%s" % (len(child), child))
+
+            digests[id(config)] = digest.digest()
+
+        return digests[id(config)]
+
     @staticmethod
     def parse_configuration_file(configuration_file: Path) -> "FortiGateConfig":
         """
         Parse the FortiGate configuration from a file into a python object
 
+        A compressed configuration file (.gz, .lzma, .xz or .zip) is decompressed on the fly while
+        it is parsed (see helpers.files.open_text_file()).
+
         Args:
             configuration_file: The filename of the FortiGate configuration file
 
@@ -115,8 +341,7 @@ class FortiGateConfig:
         """
         log.debug("Start configuration parser with file '%s'", configuration_file)
 
-        FortiGateConfig._config_path = []
-        with configuration_file.open(encoding="UTF-8") as forti_file:
+        with open_text_file(configuration_file) as forti_file:
             parsed_config = FortiGateConfig._parse_to_dict(forti_file)
 
         global_config: dict[str, Any] = {}
@@ -242,16 +467,37 @@ class FortiGateConfig:
 
         return info
 
+    @staticmethod
+    def _add_section(config: dict[str, Any], section: str | list[str], section_config: Any) -> None:
+        """
+        Add the configuration of a section to the configuration of its parent section.
+
+        Args:
+            config:         The configuration of the parent section
+            section:        The name of the section ("config name" or "edit name") or the path of
+                            a nested section ("config name_1 name_2 ...")
+            section_config: The configuration of the section
+        """
+        if isinstance(section, str):
+            config[section] = section_config
+
+        else:
+            temp_config = FortiGateConfig._get_nested_dict(section[1:], section_config)
+            config[section[0]] = {**config.get(section[0], {}), **temp_config}
+
     @staticmethod
     # pylint: disable=too-many-branches
-    def _parse_to_dict(config_file: IO[str]) -> Any:
+    def _parse_to_dict(config_file: Iterable[str]) -> Any:
         # should be dict[str, Any] | list[Any]
         """
         Fabric function to create a FortiGateConfig object from a backup configuration file
-        This recursive method parses a FortiGate configuration from a file line by line
+        This method parses a FortiGate configuration from a file line by line
+
+        The nesting of the sections is tracked on a local stack (no recursion and no shared state)
+        so several configurations may be parsed at the same time in different threads.
 
         Args:
-            config_file: FortiGate configuration file object
+            config_file: FortiGate configuration file object (or any iterable of lines)
 
         Returns:
             A dict which contains the parsed FortiGate configuration
@@ -261,6 +507,10 @@ class FortiGateConfig:
         multiline: str = ""
         multiline_key: str = ""
 
+        # The parent sections of the current section with their configuration, their info and the
+        # name (or path) of the current section in the parent section
+        stack: list[tuple[Any, dict[str, str], str | list[str]]] = []
+
         for line in config_file:
             line = line.strip()
 
@@ -271,6 +521,8 @@ class FortiGateConfig:
             # handle comment lines
             if line.startswith("#"):
                 info = FortiGateConfig._parse_config_comment(info, line)
+                if not multiline:
+                    continue
 
             # handle multiline strings (do that before all the other logic)
             if multiline:
@@ -280,56 +532,54 @@ class FortiGateConfig:
 
                 continue
 
-            # check if a multiline string starts. begin with "set" and uneven amount of quotes (")
-            if line.startswith("set ") and line.count('"') % 2 == 1 and not line.endswith('"'):
-                _, multiline_key, value = line.split(maxsplit=2)  # first part is always "set"
-                multiline += value
-                continue
-
-            # handle configuration option
             if line.startswith("set "):
-                _, key, value = line.split(maxsplit=2)  # first part ist always "set"
-                config[key] = " ".join(value.replace('"', "").split())
+                # check if a multiline string starts (uneven amount of quotes)
+                if line.count('"') % 2 == 1 and not line.endswith('"'):
+                    _, multiline_key, multiline = line.split(maxsplit=2)
+
+                # handle configuration option
+                else:
+                    _, key, value = line.split(maxsplit=2)  # first part ist always "set"
+                    config[key] = " ".join(value.replace('"', "").split())
 
-            # handle recursion
-            if line.startswith("config vdom") and len(FortiGateConfig._config_path) == 1:
                 continue
 
+            # handle section starts
             if line.startswith("config "):
+                # every vdom is in its own "config vdom" section. Put them into the first one.
+                if line.startswith("config vdom") and len(stack) == 1:
+                    continue
+
                 if len(line[7:].split(" ")) == 1:
-                    FortiGateConfig._config_path.append(line[7:])
-                    config[line[7:].strip('"')] = FortiGateConfig._parse_to_dict(config_file)
+                    stack.append((config, info, line[7:].strip('"')))
 
                 else:
-                    FortiGateConfig._config_path.append(line[7:])
-                    config_path = [word.strip('"') for word in line[7:].split()]
-                    temp_config = FortiGateConfig._get_nested_dict(
-                        config_path[1:], FortiGateConfig._parse_to_dict(config_file)
-                    )
-
-                    if config_path[0] not in config:
-                        config[config_path[0]] = {}
+                    stack.append((config, info, [word.strip('"') for word in line[7:].split()]))
 
-                    config[config_path[0]] = {**config[config_path[0]], **temp_config}
+                config, info = {}, {}
 
-            if line.startswith("edit "):
-                FortiGateConfig._config_path.append(line[5:])
-                config[line[5:].strip('"')] = FortiGateConfig._parse_to_dict(config_file)
+            elif line.startswith("edit "):
+                stack.append((config, info, line[5:].strip('"')))
+                config, info = {}, {}
 
             # handle section ends
-            if line == "end":
-                FortiGateConfig._config_path.pop()
-                if FortiGateConfig._config_is_list(config):
+            elif line in ("end", "next"):
+                if line == "end" and FortiGateConfig._config_is_list(config):
                     config = FortiGateConfig._config_convert_dict_to_list(config)
 
-                return config
+                parent_config, info, section = stack.pop()
+                FortiGateConfig._add_section(parent_config, section, config)
+                config = parent_config
 
-            if line == "next":
-                FortiGateConfig._config_path.pop()
-                return config
+        # close the sections which are not closed at the end of the file
+        while True:
+            # append info dict to config if it's set
+            if len(info) > 0:
+                config["info"] = info
 
-        # append info dict to config if it's set
-        if len(info) > 0:
-            config["info"] = info
+            if not stack:
+                return config
 
-        return config
+            parent_config, info, section = stack.pop()
+            FortiGateConfig._add_section(parent_config, section, config)
+            config = parent_config
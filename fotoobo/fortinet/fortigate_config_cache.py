@@ -0,0 +1,165 @@
+"""
+The FortiGateConfigCache class
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from fotoobo import __version__
+from fotoobo.helpers.config import config as fotoobo_config
+
+from .fortigate_config import FortiGateConfig
+
+log = logging.getLogger("fotoobo")
+
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+# The entries are only valid for the parser of this fotoobo version and the marshal format of this
+# Python version
+CACHE_VERSION = f"{__version__}-py{sys.version_info.major}.{sys.version_info.minor}"
+
+
+class FortiGateConfigCache:
+    """
+    A persistent cache for parsed FortiGate configurations.
+
+    Every parsed configuration is stored in the cache directory in a compact binary form (marshal)
+    keyed by the size and the sha256 digest of the content of its configuration file and by the
+    fotoobo and Python version (see CACHE_VERSION). Hashing a configuration file is much faster
+    than parsing it, so unchanged configuration files are never parsed again no matter where they
+    are or what their modification time is. The cache entries only hold plain data, so loading them
+    never executes any code. An entry which cannot be loaded for whatever reason is a cache miss.
+
+    Every hit refreshes the modification time of its entry. So evict() removes the least recently
+    used entries first as soon as the cache is bigger than its maximum size. The maximum size is
+    taken from the argument or else from 'max_size' (in MiB) in the 'config_cache' section of the
+    fotoobo configuration (default: DEFAULT_CACHE_SIZE).
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int | None = None) -> None:
+        """
+        Create the cache.
+
+        Args:
+            cache_dir: The directory to store the parsed configurations in (created if needed)
+            max_size:  The maximum size of the cache in bytes (see evict())
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = (
+            max_size
+            or int(fotoobo_config.config_cache.get("max_size", 0)) * 1024 * 1024
+            or DEFAULT_CACHE_SIZE
+        )
+
+    def get(self, configuration_file: Path) -> FortiGateConfig:
+        """
+        Get the parsed configuration of a configuration file.
+
+        The configuration file is only parsed if it is not in the cache yet (see
+        FortiGateConfig.parse_configuration_file()).
+
+        Args:
+            configuration_file: The FortiGate configuration file
+
+        Returns:
+            The parsed FortiGate configuration object
+        """
+        entry = self._get_entry(configuration_file)
+        try:
+            global_config, vdom_config, info = marshal.loads(entry.read_bytes())
+
+            os.utime(entry)
+            log.debug("Found '%s' in the cache", configuration_file)
+
+            return FortiGateConfig(global_config, vdom_config, info)
+
+        except FileNotFoundError:
+            log.debug("'%s' is not in the cache", configuration_file)
+
+        except Exception:  # pylint: disable=broad-except
+            # Whatever is wrong with the entry it is just a miss and replaced below
+            log.warning("Cache entry '%s' is invalid", entry.name)
+
+        config = FortiGateConfig.parse_configuration_file(configuration_file)
+        try:
+            self._save_entry(entry, config)
+
+        except OSError as err:
+            log.warning("Unable to save '%s' to the cache: %s", configuration_file, err)
+
+        return config
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries until the cache is not bigger than its maximum size.
+
+        Returns:
+            The number of entries removed
+        """
+        entries = []
+        size = 0
+        for entry in self.cache_dir.glob("*.marshal"):
+            try:
+                stat = entry.stat()
+
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            size += stat.st_size
+
+        removed = 0
+        for _, entry_size, entry in sorted(entries):
+            if size <= self.max_size:
+                break
+
+            entry.unlink(missing_ok=True)
+            size -= entry_size
+            removed += 1
+
+        if removed:
+            log.debug("Removed '%s' entries from the cache", removed)
+
+        return removed
+
+    def _get_entry(self, configuration_file: Path) -> Path:
+        """
+        Get the cache entry of a configuration file.
+
+        Args:
+            configuration_file: The FortiGate configuration file
+
+        Returns:
+            The path of the cache entry (which may not exist)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with configuration_file.open("rb") as config_file:
+            while chunk := config_file.read(1024 * 1024):
+                digest.update(chunk)
+                size += len(chunk)
+
+        return self.cache_dir / f"{size}-{digest.hexdigest()}-{CACHE_VERSION}.marshal"
+
+    def _save_entry(self, entry: Path, config: FortiGateConfig) -> None:
+        """
+        Save a parsed configuration to the cache.
+
+        The entry is written to a temporary file first and then renamed. So other processes using
+        the same cache never see a partial entry.
+
+        Args:
+            entry:  The path of the cache entry
+            config: The parsed FortiGate configuration object
+        """
+        data = (config.global_config, config.vdom_config, config.info.__dict__)
+        with tempfile.NamedTemporaryFile("wb", dir=self.cache_dir, delete=False) as temp_file:
+            marshal.dump(data, temp_file)
+
+        os.replace(temp_file.name, entry)
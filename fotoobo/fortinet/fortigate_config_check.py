@@ -19,6 +19,9 @@ class FortiGateConfigCheck:
         """
         Initialize the configuration checker.
 
+        The configuration is not changed. For many checks it is worth enabling its path index
+        before (see FortiGateConfig.enable_index()).
+
         Args:
             config: The FortiGate configuration
             checks: The checks to do against the FortiGate configuration
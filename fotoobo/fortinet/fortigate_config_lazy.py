@@ -0,0 +1,295 @@
+"""
+The LazyFortiGateConfig class
+"""
+
+import logging
+import mmap
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from fotoobo.exceptions import GeneralWarning
+
+from .fortigate_config import FortiGateConfig
+from .fortigate_config_record import FortiGateConfigRecord
+
+log = logging.getLogger("fotoobo")
+
+
+@dataclass
+class _Section:
+    """
+    A top-level section of a FortiGate configuration file ("config ..." up to its "end").
+    """
+
+    scope: str
+    container: tuple[str, ...]
+    words: tuple[str, ...]
+    start: int
+    end: int = -1
+
+
+class LazyFortiGateConfig(FortiGateConfig):
+    """
+    A FortiGate configuration which only parses the sections it is asked for.
+
+    Creating the object only scans the configuration file for the byte offsets of its top-level
+    sections (the sections of the global configuration and of every VDOM) which is much faster than
+    parsing the whole file. Every call to get_configuration() then only parses the sections the
+    requested path is in (and keeps them for later calls). So getting a single setting from a huge
+    configuration file only parses a small part of it.
+
+    The configuration returned by get_configuration() is the same as with a FortiGateConfig parsed
+    by parse_configuration_file().
+    """
+
+    def __init__(self, configuration_file: Path) -> None:
+        """
+        Scan the configuration file.
+
+        Args:
+            configuration_file: The filename of the FortiGate configuration file
+
+        Raises:
+            GeneralWarning: If there is no info in the configuration file
+        """
+        log.debug("Start configuration scanner with file '%s'", configuration_file)
+        self.configuration_file = configuration_file
+        self._loaded: set[tuple[str, tuple[str, ...], tuple[str, ...]]] = set()
+        info, self._sections, vdoms = self._scan(configuration_file)
+        if not info:
+            raise GeneralWarning(f"There is no info in {configuration_file}")
+
+        vdom_config: dict[str, Any] = {vdom: {} for vdom in vdoms}
+        if info.get("vdom") == "0":
+            vdom_config = {"root": {}}
+
+        super().__init__(None, vdom_config, info)
+        try:
+            self.info.hostname = self.get_configuration("global", "/system/global")["hostname"]
+
+        except (KeyError, TypeError):
+            self.info.hostname = "HOSTNAME UNKNOWN"
+
+    def get_configuration(self, scope: str = "global", path: str = "/") -> Any:
+        """
+        Return a config snippet from the given configuration path.
+
+        The sections needed for the path are parsed first (if they are not parsed yet). See
+        FortiGateConfig.get_configuration() for the arguments and the return value.
+        """
+        path_list = tuple(p for p in path.strip("/").split("/") if p)
+        if scope == "global":
+            self._load("global", (), path_list[:2])
+
+        elif scope == "vdom":
+            vdoms = list(self.vdom_config) if not path_list else [path_list[0]]
+            for vdom in vdoms:
+                self._load("vdom", (vdom,), path_list[1:3])
+
+        return super().get_configuration(scope, path)
+
+    def save_configuration_file(self, configuration_file: Path) -> None:
+        """
+        Parse all the sections and save the configuration to a json configuration file.
+
+        Args:
+            configuration_file: The json file to save the FortiGate configuration to
+        """
+        self.get_configuration("global")
+        self.get_configuration("vdom")
+        super().save_configuration_file(configuration_file)
+
+    def _load(self, scope: str, container: tuple[str, ...], selector: tuple[str, ...]) -> None:
+        """
+        Parse the sections of a container which are needed for a selector.
+
+        A section "config a b ..." is needed for the selector (a, b) as well as the sections
+        "config a" and "config a b c", because they all change the configuration of a/b. The
+        needed sections are parsed together in the order of the configuration file, so the result
+        is the same as if the whole configuration file was parsed.
+
+        Args:
+            scope:     The scope of the container (global|vdom)
+            container: The path of the container in the scope (e.g. the VDOM)
+            selector:  The first two keys of the path in the container to parse the sections for
+        """
+        if any((scope, container, selector[:i]) in self._loaded for i in range(len(selector) + 1)):
+            return
+
+        self._loaded.add((scope, container, selector))
+        if scope == "vdom" and container[0] not in self.vdom_config:
+            return
+
+        sections = [
+            section
+            for section in self._sections
+            if section.scope == scope
+            and section.container == container
+            and all(word == key for word, key in zip(section.words, selector))
+        ]
+        target = self.global_config if scope == "global" else self.vdom_config
+        for key in container:
+            target = target.setdefault(key, {})
+
+        log.debug("Parsing '%s' section(s) for '%s' '%s'", len(sections), scope, selector)
+        config = self._parse_sections(sections)
+        if self._compact:
+            config = FortiGateConfigRecord.compact(config)
+
+        if self._index is not None:
+            self.enable_index()
+        if not selector:
+            target.clear()
+            target.update(config)
+
+        elif len(selector) == 1 or not isinstance(config.get(selector[0], {}), Mapping):
+            if selector[0] in config:
+                target[selector[0]] = config[selector[0]]
+
+        elif selector[1] in config.get(selector[0], {}):
+            if not isinstance(target.get(selector[0]), dict):
+                parent = target.get(selector[0])
+                target[selector[0]] = dict(parent) if isinstance(parent, Mapping) else {}
+
+            target[selector[0]][selector[1]] = config[selector[0]][selector[1]]
+
+    def _parse_sections(self, sections: list[_Section]) -> dict[str, Any]:
+        """
+        Parse some sections of the configuration file.
+
+        The sections are parsed within the same parent sections as in the configuration file
+        ("config global" or "config vdom" and "edit <vdom>") as the parser depends on the depth.
+
+        Args:
+            sections: The sections to parse (all of the same container)
+
+        Returns:
+            The configuration of the sections in their container
+        """
+        if not sections:
+            return {}
+
+        lines: list[str] = []
+        if self.info.vdom != "0":
+            lines.append("config global" if sections[0].scope == "global" else "config vdom")
+            lines += [f"edit {key}" for key in sections[0].container]
+
+        with self.configuration_file.open("rb") as config_file:
+            with mmap.mmap(config_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for section in sections:
+                    lines += data[section.start : section.end].decode("UTF-8").splitlines()
+
+        config: dict[str, Any] = self._parse_to_dict(lines)
+        if self.info.vdom != "0":
+            config = config["global"] if sections[0].scope == "global" else config["vdom"]
+            for key in sections[0].container:
+                config = config[key]
+
+        return config
+
+    @staticmethod
+    # pylint: disable=too-many-branches, too-many-locals, too-many-statements
+    def _scan(
+        configuration_file: Path,
+    ) -> tuple[dict[str, str], list[_Section], list[str]]:
+        """
+        Scan a FortiGate configuration file for its top-level sections.
+
+        It follows the nesting of the sections exactly like the parser does (see
+        FortiGateConfig._parse_to_dict()) without building the configuration. Sections which are
+        overwritten later in the file (e.g. a VDOM which is defined twice) are dropped.
+
+        Args:
+            configuration_file: The filename of the FortiGate configuration file
+
+        Returns:
+            The info from the comments, the top-level sections and the VDOMs in multi VDOM mode
+        """
+        info: dict[str, str] = {}
+        sections: list[_Section] = []
+        vdoms: dict[str, None] = {}
+        stack: list[tuple[str, _Section | None]] = []
+        multiline = False
+
+        with configuration_file.open("rb") as config_file:
+            if not configuration_file.stat().st_size:
+                return info, sections, []
+
+            with mmap.mmap(config_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offset = 0
+                for raw_line in iter(data.readline, b""):
+                    start, offset = offset, offset + len(raw_line)
+                    line = raw_line.strip()
+                    if not line:
+                        continue
+
+                    if line.startswith(b"#") and not stack:
+                        info = FortiGateConfig._parse_config_comment(info, line.decode("UTF-8"))
+
+                    if multiline:
+                        multiline = not line.endswith(b'"')
+                        continue
+
+                    if line.startswith(b"set "):
+                        multiline = line.count(b'"') % 2 == 1 and not line.endswith(b'"')
+                        continue
+
+                    if line.startswith(b"config "):
+                        if line.startswith(b"config vdom") and len(stack) == 1:
+                            continue
+
+                        name = line[7:].decode("UTF-8")
+                        words = tuple(word.strip('"') for word in name.split())
+                        if len(name.split(" ")) == 1:
+                            words = (name.strip('"'),)
+
+                    elif line.startswith(b"edit "):
+                        words = (line[5:].decode("UTF-8").strip('"'),)
+
+                    elif line in (b"end", b"next"):
+                        _, section = stack.pop()
+                        if section:
+                            section.end = offset
+                            sections.append(section)
+
+                        continue
+
+                    else:
+                        continue
+
+                    parents = [parent for parent, _ in stack]
+                    section = None
+                    if info.get("vdom") == "0":
+                        if not stack and line.startswith(b"config "):
+                            scope = "global" if words[0] == "system" else "vdom"
+                            container = () if scope == "global" else ("root",)
+                            section = _Section(scope, container, words, start)
+
+                    elif not stack and words[0] in ("global", "vdom"):
+                        sections = [s for s in sections if s.scope != words[0]]
+                        if words[0] == "vdom":
+                            vdoms = {}
+
+                    elif parents == ["vdom"] and line.startswith(b"edit "):
+                        sections = [s for s in sections if s.container != words]
+                        vdoms[words[0]] = None
+
+                    elif parents == ["global"] and line.startswith(b"config "):
+                        section = _Section("global", (), words, start)
+
+                    elif len(parents) == 2 and parents[0] == "vdom" and line.startswith(b"config "):
+                        section = _Section("vdom", (parents[1],), words, start)
+
+                    stack.append((words[0], section))
+
+                # close the sections which are not closed at the end of the file
+                for _, section in stack:
+                    if section:
+                        section.end = offset
+                        sections.append(section)
+
+        sections.sort(key=lambda section: section.start)
+
+        return info, sections, list(vdoms)
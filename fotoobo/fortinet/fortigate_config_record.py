@@ -0,0 +1,111 @@
+"""
+The FortiGateConfigRecord class
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+# Values up to this length are interned (e.g. "enable", "disable", "all", "accept")
+INTERN_MAX_LENGTH = 32
+
+
+class FortiGateConfigRecord(Mapping[str, Any]):
+    """
+    A compact and read-only FortiGate configuration section which only holds settings.
+
+    The values are stored in a tuple and the keys in a layout which is shared by all the records
+    with the same keys (e.g. all the entries of a firewall policy table). So a record takes a
+    fraction of the memory of a dict with the same content. It behaves like a read-only dict and
+    compares equal to a dict with the same items.
+    """
+
+    __slots__ = ("_layout", "_values")
+
+    _layouts: dict[tuple[str, ...], dict[str, int]] = {}
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        """
+        Create the record from the settings of a configuration section.
+
+        Args:
+            config: The settings of the configuration section (with interned keys)
+        """
+        keys = tuple(config)
+        layout = self._layouts.get(keys)
+        if layout is None:
+            layout = self._layouts.setdefault(keys, {key: pos for pos, key in enumerate(keys)})
+
+        self._layout = layout
+        self._values = tuple(config.values())
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._layout[key]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._layout
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return FortiGateConfigRecord, (dict(self.items()),)
+
+    @staticmethod
+    def compact(config: Any) -> Any:
+        """
+        Convert a configuration (or a part of it) into its compact form.
+
+        All the keys and the short values are interned and every section which only holds settings
+        is converted into a FortiGateConfigRecord. Sections with subsections stay dicts.
+
+        Args:
+            config: The configuration to convert
+
+        Returns:
+            The compact configuration
+        """
+        if isinstance(config, dict):
+            compact = {
+                sys.intern(key): FortiGateConfigRecord.compact(value)
+                for key, value in config.items()
+            }
+            if compact and not any(
+                isinstance(value, (Mapping, list)) for value in compact.values()
+            ):
+                return FortiGateConfigRecord(compact)
+
+            return compact
+
+        if isinstance(config, list):
+            return [FortiGateConfigRecord.compact(value) for value in config]
+
+        if isinstance(config, str) and len(config) <= INTERN_MAX_LENGTH:
+            return sys.intern(config)
+
+        return config
+
+    @staticmethod
+    def expand(config: Any) -> Any:
+        """
+        Convert a compact configuration (or a part of it) back into plain dicts and lists.
+
+        Args:
+            config: The configuration to convert
+
+        Returns:
+            The configuration with plain dicts and lists only
+        """
+        if isinstance(config, Mapping):
+            return {key: FortiGateConfigRecord.expand(value) for key, value in config.items()}
+
+        if isinstance(config, list):
+            return [FortiGateConfigRecord.expand(value) for value in config]
+
+        return config
@@ -2,6 +2,8 @@
 FortiManager class.
 """
 
+# pylint: disable=too-many-lines
+
 import logging
 import re
 from pathlib import Path
@@ -108,16 +110,26 @@ class FortiManager(Fortinet):  # pylint: disable=too-many-public-methods
             FortiManager result item
         """
 
-        _params = {"url": f"{url}"}
-        if params:
-            _params = {**_params, **params}
+        return self.api("post", payload=self._get_payload(url, params), timeout=timeout)
 
-        payload = {
-            "method": "get",
-            "params": [_params],
-        }
+    async def api_get_async(
+        self, url: str, params: dict[str, Any] | None = None, timeout: float | None = None
+    ) -> requests.Response:
+        """
+        Asynchronous GET method for API requests.
+
+        This is the asyncio counterpart of api_get().
+
+        Args:
+            url:     API endpoint to access
+            params:  Additional query parameters if needed
+            timeout: The requests read timeout in seconds
+
+        Result:
+            FortiManager result item
+        """
 
-        return self.api("post", payload=payload, timeout=timeout)
+        return await self.api_async("post", payload=self._get_payload(url, params), timeout=timeout)
 
     def api(  # pylint: disable=too-many-arguments, too-many-positional-arguments
         self,
@@ -127,6 +139,7 @@ class FortiManager(Fortinet):  # pylint: disable=too-many-public-methods
         params: dict[str, str] | None = None,
         payload: dict[str, Any] | None = None,
         timeout: float | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         API request to a FortiManager device.
@@ -141,6 +154,7 @@ class FortiManager(Fortinet):  # pylint: disable=too-many-public-methods
             params:  Dictionary with parameters (if needed)
             payload: JSON body for post requests (if needed)
             timeout: The requests read timeout in seconds
+            stream:  Do not download the body immediately (see Fortinet.api())
 
         Returns:
             Response from the request
@@ -158,7 +172,13 @@ class FortiManager(Fortinet):  # pylint: disable=too-many-public-methods
             payload["session"] = self.session_key
 
         return super().api(
-            method, url, headers=headers, payload=payload, params=params, timeout=timeout
+            method,
+            url,
+            headers=headers,
+            payload=payload,
+            params=params,
+            timeout=timeout,
+            stream=stream,
         )
 
     def assign_all_objects(self, adoms: str, policy: str) -> int:
@@ -197,15 +217,16 @@ class FortiManager(Fortinet):  # pylint: disable=too-many-public-methods
         response = self.api("post", payload=payload)
 
         if response.status_code == 200:
-            if response.json()["result"][0]["status"]["code"] == 0:
-                task_id = response.json()["result"][0]["data"]["task"]
+            result = response.json()["result"][0]
+            if result["status"]["code"] == 0:
+                task_id = result["data"]["task"]
                 log.debug("Assign task created with id '%s'", task_id)
 
             else:
                 log.debug(
                     "Did not assign to '%s' with error '%s'",
                     adoms,
-                    response.json()["result"][0]["status"]["message"],
+                    result["status"]["message"],
                 )
                 task_id = 0
 
@@ -589,6 +610,28 @@ class FortiManager(Fortinet):  # pylint: disable=too-many-public-methods
 
         return result
 
+    @staticmethod
+    def _get_payload(url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """
+        Create the JSON-RPC payload for a get request.
+
+        Args:
+            url:    API endpoint to access
+            params: Additional query parameters if needed
+
+        Returns:
+            The payload for the get request
+        """
+
+        _params = {"url": f"{url}"}
+        if params:
+            _params = {**_params, **params}
+
+        return {
+            "method": "get",
+            "params": [_params],
+        }
+
     def get_adoms(self, ignored_adoms: list[str] | None = None) -> list[Any]:
         """
         Get FortiManager ADOM list.
@@ -853,8 +896,9 @@ class FortiManager(Fortinet):  # pylint: disable=too-many-public-methods
             }
             response = super().api("post", payload=payload)
             if response.status_code == 200:
-                if "session" in response.json():
-                    self.session_key = response.json()["session"]
+                data = response.json()
+                if "session" in data:
+                    self.session_key = data["session"]
 
                     if self.session_path:
                         log.debug("Saving session key into file '%s'", session_file)
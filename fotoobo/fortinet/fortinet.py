@@ -6,18 +6,25 @@ This module is used to define some global and generic variables and methods.
 
 import logging
 from abc import ABC, abstractmethod
-from time import time
+from contextlib import AbstractContextManager, nullcontext
+from time import sleep, time
 from typing import Any
 
 import requests
 import urllib3
 
 from fotoobo.exceptions import APIError, GeneralError
+from fotoobo.helpers.concurrency import OVERLOAD_STATUS_CODES, report_overload, run_blocking
+
+from .adapter import FortinetAdapter
+from .circuit_breaker import CircuitBreaker
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
 
 log = logging.getLogger("fotoobo")
 
 
-class Fortinet(ABC):
+class Fortinet(ABC):  # pylint: disable=too-many-instance-attributes
     """
     This is the Fortinet abstract base class.
 
@@ -55,6 +62,16 @@ class Fortinet(ABC):
                 disable the warnings in urllib3. This prevents unwanted SSL warnings to be
                 logged.
             timeout: Connection timeout in seconds
+            retry: The retry policy as a dict (see RetryPolicy for available options)
+                By default failed requests are not retried.
+            circuit_breaker: The circuit breaker settings as a dict (see CircuitBreaker for
+                available options). By default there is no circuit breaker.
+            rate_limit: The rate limit settings as a dict (see RateLimiter for available options)
+                The limit is shared by all requests to the same host. By default the requests are
+                not limited.
+            pool: The connection pool settings as a dict (see FortinetAdapter for available
+                options). With the additional option 'shared' the connections are shared with all
+                other objects connecting to the same host and port.
         """
 
         self.api_url: str = ""
@@ -74,7 +91,20 @@ class Fortinet(ABC):
         self.timeout = kwargs.get("timeout", 3)
         self.type: str = ""
 
-    def api(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        try:
+            self.retry = RetryPolicy(**kwargs.get("retry", {}))
+
+        except TypeError as err:
+            raise GeneralError(f"Invalid retry configuration ({self.hostname})") from err
+
+        self.retry_messages: list[str] = []
+        self.circuit_breaker: dict[str, Any] = kwargs.get("circuit_breaker", {})
+        self.rate_limit: dict[str, Any] = kwargs.get("rate_limit", {})
+        self.pool: dict[str, Any] = kwargs.get("pool", {})
+        self._adapter_key: str = ""
+        self._mount_adapter()
+
+    def api(  # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
         self,
         method: str,
         url: str = "",
@@ -82,6 +112,7 @@ class Fortinet(ABC):
         params: dict[str, str] | None = None,
         payload: dict[str, Any] | None = None,
         timeout: float | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         API request to a Fortinet device.
@@ -93,6 +124,8 @@ class Fortinet(ABC):
             params:     Dictionary with parameters (if needed)
             payload:    JSON body for post requests (if needed)
             timeout:    The requests read timeout
+            stream:     Do not download the body immediately (use response.iter_content() to
+                        read it and do not forget to close the response)
 
         Returns:
             Response from the request
@@ -100,24 +133,148 @@ class Fortinet(ABC):
 
         full_url = f"{self.api_url}/{url.strip('/')}".strip("/")
         timeout = timeout or self.timeout
-        start = time()
 
         if method.upper() not in self.ALLOWED_HTTP_METHODS:
             error = f"HTTP method '{method.upper()}' is not implemented"
             log.error(error)
             raise NotImplementedError(error)
 
-        try:
-            response: requests.Response = getattr(self.session, method.lower())(
+        self._mount_adapter()
+        if self.circuit_breaker.get("threshold"):
+            CircuitBreaker.get(self.hostname, **self.circuit_breaker).before_request()
+
+        rate_limiter = self._get_rate_limiter()
+        request_kwargs: dict[str, Any] = {"stream": True} if stream else {}
+        attempts = self.retry.get_attempts(method)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            start = time()
+
+            try:
+                with rate_limiter:
+                    response: requests.Response = getattr(self.session, method.lower())(
+                        full_url,
+                        headers=headers,
+                        json=payload,
+                        params=params,
+                        timeout=timeout,
+                        verify=self.ssl_verify,
+                        **request_kwargs,
+                    )
+                    # the body of a streamed response is read later, so it keeps its slot until
+                    # it is closed
+                    if stream and isinstance(rate_limiter, RateLimiter):
+                        rate_limiter.hold(response)
+
+            except (requests.exceptions.ConnectTimeout, requests.exceptions.ReadTimeout) as err:
+                report_overload()
+                if attempt < attempts:
+                    self._wait_for_retry(attempt, attempts, method, full_url, type(err).__name__)
+                    continue
+
+                self._record_connection(err)
+                raise self._get_general_error(err) from err
+
+            except requests.exceptions.ConnectionError as err:
+                self._record_connection(err)
+                raise self._get_general_error(err) from err
+
+            log.debug(
+                'Request time: [bold green]%2dms[/] "%s %s"',
+                ((time() - start) * 1000),
+                method.upper(),
                 full_url,
-                headers=headers,
-                json=payload,
-                params=params,
-                timeout=timeout,
-                verify=self.ssl_verify,
             )
 
-        except requests.exceptions.SSLError as err:
+            if response.status_code in OVERLOAD_STATUS_CODES:
+                report_overload()
+
+            if response.status_code in self.retry.status_codes and attempt < attempts:
+                if stream:
+                    response.close()
+
+                self._wait_for_retry(
+                    attempt,
+                    attempts,
+                    method,
+                    full_url,
+                    f"HTTP/{response.status_code}",
+                    self.retry.get_retry_after(response.headers),
+                )
+                continue
+
+            break
+
+        self._record_connection()
+
+        try:
+            response.raise_for_status()
+
+        except requests.exceptions.HTTPError as err:
+            log.debug(err)
+            if stream:
+                response.close()
+
+            raise APIError(err) from err
+
+        return response
+
+    async def api_async(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        method: str,
+        url: str = "",
+        headers: dict[str, str] | None = None,
+        params: dict[str, str] | None = None,
+        payload: dict[str, Any] | None = None,
+        timeout: float | None = None,
+    ) -> requests.Response:
+        """
+        Asynchronous API request to a Fortinet device.
+
+        This is the asyncio counterpart of api(). The request itself is done by the api() method of
+        the actual device class (so a FortiGate still sends its token and a FortiManager still adds
+        its session key) but it is handed over to a worker thread. This way the event loop is never
+        blocked and the exceptions raised are exactly the same as with the synchronous api().
+
+        The number of requests in flight is limited by the thread pool: Within
+        helpers.concurrency.blocking_executor() (e.g. in the asyncio fleet tools) it is its size,
+        else it is the size of the default executor of the event loop.
+
+        Args:
+            method:     HTTP request method
+            url:        Rest API URL to request data from
+            headers:    Dictionary with headers (if needed)
+            params:     Dictionary with parameters (if needed)
+            payload:    JSON body for post requests (if needed)
+            timeout:    The requests read timeout
+
+        Returns:
+            Response from the request
+        """
+
+        return await run_blocking(
+            self.api,
+            method,
+            url,
+            headers=headers,
+            params=params,
+            payload=payload,
+            timeout=timeout,
+        )
+
+    def _get_general_error(self, err: requests.exceptions.RequestException) -> GeneralError:
+        """
+        Translate an exception from requests into a GeneralError with a meaningful message.
+
+        Args:
+            err: The exception raised by requests
+
+        Returns:
+            The GeneralError to raise
+        """
+        if isinstance(err, requests.exceptions.SSLError):
             log.debug(err)
             error = "Unknown SSL error"
 
@@ -131,13 +288,13 @@ class Fortinet(ABC):
             except (AttributeError, IndexError):
                 pass
 
-            raise GeneralError(f"{error} ({self.hostname})") from err
+            return GeneralError(f"{error} ({self.hostname})")
 
-        except requests.exceptions.ConnectTimeout as err:
+        if isinstance(err, requests.exceptions.ConnectTimeout):
             log.debug(err)
-            raise GeneralError(f"Connection timeout ({self.hostname})") from err
+            return GeneralError(f"Connection timeout ({self.hostname})")
 
-        except requests.exceptions.ConnectionError as err:
+        if isinstance(err, requests.exceptions.ConnectionError):
             log.debug(err)
             error = "Unknown connection error"
 
@@ -151,27 +308,116 @@ class Fortinet(ABC):
             except (IndexError, AttributeError, TypeError):
                 pass
 
-            raise GeneralError(f"{error} ({self.hostname})") from err
+            return GeneralError(f"{error} ({self.hostname})")
 
-        except requests.exceptions.ReadTimeout as err:
-            log.error(err)
-            raise GeneralError(f"Read timeout ({self.hostname})") from err
+        log.error(err)
+        return GeneralError(f"Read timeout ({self.hostname})")
 
-        log.debug(
-            'Request time: [bold green]%2dms[/] "%s %s"',
-            ((time() - start) * 1000),
-            method.upper(),
-            full_url,
-        )
+    def _get_rate_limiter(self) -> AbstractContextManager[Any]:
+        """
+        Get the rate limiter for this host.
+
+        Returns:
+            The shared RateLimiter for the hostname or a context manager which does nothing if
+            there is no rate limit configured
+
+        Raises:
+            GeneralError: If the rate limit configuration is invalid
+        """
+        if not self.rate_limit:
+            return nullcontext()
 
         try:
-            response.raise_for_status()
+            return RateLimiter.get(self.hostname, **self.rate_limit)
 
-        except requests.exceptions.HTTPError as err:
-            log.debug(err)
-            raise APIError(err) from err
+        except (TypeError, ValueError) as err:
+            raise GeneralError(f"Invalid rate_limit configuration ({self.hostname})") from err
 
-        return response
+    def _mount_adapter(self) -> None:
+        """
+        Mount the transport adapter for the current hostname and port to the session.
+
+        The adapter is only mounted again if the hostname or port changed since the last time
+        (e.g. if the hostname of a FortiGate is replaced by its HA cluster IP).
+
+        Raises:
+            GeneralError: If the pool configuration is invalid
+        """
+        key = f"{self.hostname}:{self.https_port}"
+        if key == self._adapter_key:
+            return
+
+        try:
+            adapter = FortinetAdapter.from_config(self.hostname, self.https_port, self.pool)
+
+        except TypeError as err:
+            raise GeneralError(f"Invalid pool configuration ({self.hostname})") from err
+
+        self.session.mount("https://", adapter)
+        self._adapter_key = key
+
+    def _record_connection(self, err: requests.exceptions.RequestException | None = None) -> None:
+        """
+        Record the outcome of a connection attempt in the circuit breaker of the host.
+
+        Only connection timeouts and connection errors count as failures. Every other outcome
+        (even an SSL error or a read timeout) proves that the host is reachable.
+
+        Args:
+            err: The exception raised by requests or None if we got a response
+        """
+        if not self.circuit_breaker.get("threshold"):
+            return
+
+        circuit_breaker = CircuitBreaker.get(self.hostname, **self.circuit_breaker)
+        if isinstance(err, requests.exceptions.ConnectionError) and not isinstance(
+            err, requests.exceptions.SSLError
+        ):
+            circuit_breaker.record_failure()
+
+        else:
+            circuit_breaker.record_success()
+
+    def _wait_for_retry(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        attempt: int,
+        attempts: int,
+        method: str,
+        url: str,
+        reason: str,
+        retry_after: float | None = None,
+    ) -> None:
+        """
+        Wait before the next attempt of a failed request and remember it as a retry message.
+
+        Args:
+            attempt:     The number of the attempt which failed (starting with 1)
+            attempts:    The number of attempts allowed
+            method:      The HTTP method of the failed request
+            url:         The URL of the failed request
+            reason:      The reason why the request failed
+            retry_after: The time in seconds the device asked us to wait (if any)
+        """
+        backoff = self.retry.get_backoff(attempt, retry_after)
+        message = (
+            f"Retry {attempt}/{attempts - 1} for '{method.upper()} {url}' "
+            f"in {backoff:.1f}s due to {reason}"
+        )
+        log.warning("%s (%s)", message, self.hostname)
+        self.retry_messages.append(message)
+        sleep(backoff)
+
+    def pop_retry_messages(self) -> list[str]:
+        """
+        Get and clear the messages about the retries done so far.
+
+        Use it to report flaky devices, e.g. by pushing the messages to a Result.
+
+        Returns:
+            The list of retry messages
+        """
+        messages, self.retry_messages = self.retry_messages, []
+        return messages
 
     @staticmethod
     def get_vendor() -> str:
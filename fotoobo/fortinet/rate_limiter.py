@@ -0,0 +1,179 @@
+"""
+The RateLimiter class
+"""
+
+import logging
+import threading
+from time import monotonic, sleep
+from types import TracebackType
+from typing import Any
+
+log = logging.getLogger("fotoobo")
+
+
+class RateLimiter:  # pylint: disable=too-many-instance-attributes
+    """
+    A rate limiter for a single host.
+
+    It limits the requests to a host with a token bucket (requests per second with a given burst
+    size) and optionally also the number of requests running at the same time. Use it as a context
+    manager around every single request:
+
+        with RateLimiter.get("host", rate=5, max_concurrent=2):
+            session.get(...)
+
+    The body of a streamed response is read after the with block. Call hold() with the response
+    within the with block to keep its slot of max_concurrent until the response is closed.
+
+    There is only one rate limiter per hostname in the whole process (see get()) so every Fortinet
+    object and every thread connecting to the same host (e.g. the same FortiManager) shares it.
+    """
+
+    _limiters: dict[str, "RateLimiter"] = {}
+    _limiters_lock = threading.Lock()
+
+    def __init__(
+        self, hostname: str, rate: float = 0, burst: int = 0, max_concurrent: int = 0
+    ) -> None:
+        """
+        Create a rate limiter.
+
+        Args:
+            hostname:       The hostname the rate limiter is for
+            rate:           The number of requests per second (0 does not limit the rate)
+            burst:          The number of requests which may be sent at once before the rate
+                            applies (defaults to the rate but at least 1)
+            max_concurrent: The maximum number of requests at the same time (0 for no limit)
+        """
+        self.hostname = hostname
+        self.rate = float(rate)
+        self.burst = float(burst or max(self.rate, 1))
+        self.max_concurrent = int(max_concurrent)
+        self.tokens = self.burst
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+        self._semaphore = (
+            threading.BoundedSemaphore(self.max_concurrent) if self.max_concurrent > 0 else None
+        )
+        self._held = threading.local()
+
+    def __enter__(self) -> "RateLimiter":
+        """
+        Wait until a request may be sent.
+        """
+        if self._semaphore:
+            self._semaphore.acquire()
+
+        try:
+            self.acquire()
+
+        except BaseException:
+            if self._semaphore:
+                self._semaphore.release()
+
+            raise
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """
+        Mark the request as done (unless its slot is held by hold()).
+        """
+        if getattr(self._held, "slot", False):
+            self._held.slot = False
+            return
+
+        if self._semaphore:
+            self._semaphore.release()
+
+    def hold(self, response: Any) -> None:
+        """
+        Keep the concurrency slot of the current request until its response is closed.
+
+        It has to be called within the with block of the request. The slot is released the first
+        time response.close() is called (also by 'with response:').
+
+        Args:
+            response: The (streamed) response of the request
+        """
+        if not self._semaphore:
+            return
+
+        semaphore = self._semaphore
+        close = response.close
+        lock = threading.Lock()
+        released = False
+
+        def _close() -> None:
+            nonlocal released
+            try:
+                close()
+
+            finally:
+                with lock:
+                    release, released = not released, True
+
+                if release:
+                    semaphore.release()
+
+        response.close = _close
+        self._held.slot = True
+
+    @classmethod
+    def get(cls, hostname: str, **kwargs: Any) -> "RateLimiter":
+        """
+        Get the rate limiter for a hostname.
+
+        The rate limiter is created with the given arguments if it does not exist yet.
+
+        Args:
+            hostname: The hostname to get the rate limiter for
+            **kwargs: See __init__() for available arguments
+
+        Returns:
+            The rate limiter for the hostname
+        """
+        with cls._limiters_lock:
+            if hostname not in cls._limiters:
+                cls._limiters[hostname] = RateLimiter(hostname, **kwargs)
+
+            return cls._limiters[hostname]
+
+    @classmethod
+    def reset_all(cls) -> None:
+        """
+        Forget all the rate limiters in this process.
+        """
+        with cls._limiters_lock:
+            cls._limiters = {}
+
+    def acquire(self) -> float:
+        """
+        Take a token from the bucket and wait until it is available.
+
+        The token is reserved immediately so concurrent callers queue up in order and every one of
+        them waits for its own slot instead of all of them waking up at the same time.
+
+        Returns:
+            The time in seconds it waited
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait > 0:
+            log.debug("Rate limit for '%s' reached, waiting %.2fs", self.hostname, wait)
+            sleep(wait)
+
+        return wait
@@ -0,0 +1,66 @@
+"""
+The FortinetResponse class
+"""
+
+import json
+from typing import Any
+
+import requests
+
+from fotoobo.helpers import json_codec
+
+
+class FortinetResponse(requests.Response):
+    """
+    A requests Response which decodes its JSON body only once.
+
+    The decoded JSON body is cached, so calling json() several times on the same response does not
+    decode it again. Be aware that this means every call returns the very same object, so changes
+    to the returned data are visible to later calls. The JSON body is decoded with the fastest
+    codec available (see fotoobo.helpers.json_codec).
+    """
+
+    _json_cache: Any
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> "FortinetResponse":
+        """
+        Create a FortinetResponse from a requests Response.
+
+        Args:
+            response: The response to take over
+
+        Returns:
+            The FortinetResponse with the same state as the given response
+        """
+        fortinet_response = cls()
+        fortinet_response.__dict__.update(response.__dict__)
+
+        return fortinet_response
+
+    def json(self, **kwargs: Any) -> Any:
+        """
+        Get the decoded JSON body of the response.
+
+        Args:
+            **kwargs: Optional arguments for json.loads(). If given the body is decoded by requests
+                      without using the cache.
+
+        Returns:
+            The decoded JSON body
+
+        Raises:
+            requests.exceptions.JSONDecodeError: If the body is not valid JSON
+        """
+        if kwargs:
+            return super().json(**kwargs)
+
+        if "_json_cache" not in self.__dict__:
+            try:
+                self._json_cache = json_codec.loads(self.content)
+
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # Let requests guess the encoding and raise its own exception if it really fails
+                self._json_cache = super().json()
+
+        return self._json_cache
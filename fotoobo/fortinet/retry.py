@@ -0,0 +1,104 @@
+"""
+The RetryPolicy class
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+
+@dataclass(eq=False, order=False)
+class RetryPolicy:
+    """
+    This dataclass holds the retry policy for the requests to a Fortinet device.
+
+    The default policy does not retry at all (max_attempts = 1). Only idempotent HTTP methods are
+    retried and only if the request failed with a connect timeout, a read timeout or one of the
+    given HTTP status codes.
+    """
+
+    # The maximum number of attempts (including the first one)
+    max_attempts: int = 1
+
+    # The base of the exponential backoff in seconds
+    backoff_factor: float = 0.5
+
+    # The maximum backoff in seconds
+    backoff_max: float = 30.0
+
+    # The HTTP methods which may be retried
+    methods: list[str] = field(default_factory=lambda: ["DELETE", "GET", "HEAD", "OPTIONS", "PUT"])
+
+    # The HTTP status codes which should be retried
+    status_codes: list[int] = field(default_factory=lambda: [429, 500, 502, 503, 504])
+
+    def get_attempts(self, method: str) -> int:
+        """
+        Get the number of attempts allowed for the given HTTP method.
+
+        Args:
+            method: The HTTP method of the request
+
+        Returns:
+            The number of attempts (1 if the method must not be retried)
+        """
+        if method.upper() in [_.upper() for _ in self.methods]:
+            return max(self.max_attempts, 1)
+
+        return 1
+
+    def get_backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Get the time to wait before the next attempt.
+
+        The backoff grows exponentially with every attempt and uses full jitter, which means a
+        random time between zero and the exponential backoff is returned. If the device told us
+        when to retry (with the Retry-After header) this time is used instead.
+
+        Args:
+            attempt:     The number of the attempt which failed (starting with 1)
+            retry_after: The time in seconds the device asked us to wait (if any)
+
+        Returns:
+            The time to wait in seconds
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** (attempt - 1)))
+
+    @staticmethod
+    def get_retry_after(headers: Any) -> float | None:
+        """
+        Get the time to wait from a Retry-After header.
+
+        The Retry-After header may either contain the seconds to wait or an HTTP date.
+
+        Args:
+            headers: The headers from the response
+
+        Returns:
+            The time to wait in seconds or None if there is no (valid) Retry-After header
+        """
+        value = headers.get("Retry-After") if hasattr(headers, "get") else None
+        if not value:
+            return None
+
+        try:
+            return max(float(value), 0.0)
+
+        except ValueError:
+            pass
+
+        try:
+            retry_date = parsedate_to_datetime(value)
+
+        except (TypeError, ValueError):
+            return None
+
+        if retry_date.tzinfo is None:
+            retry_date = retry_date.replace(tzinfo=timezone.utc)
+
+        return max((retry_date - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,98 @@
+"""
+Concurrency signals shared by the Fortinet classes and the fleet helpers.
+
+The Fortinet classes (the transport layer) and the fleet helpers (the orchestration layer) must not
+depend on each other. This module holds the little state they share: The overload feedback of the
+current thread and the thread pool the blocking requests of the asyncio API are run in.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# The HTTP status codes a device answers with if it is overloaded
+OVERLOAD_STATUS_CODES = (429, 503)
+
+_feedback = threading.local()
+
+_executor: ContextVar[ThreadPoolExecutor | None] = ContextVar("fotoobo_executor", default=None)
+
+
+@contextmanager
+def blocking_executor(max_workers: int) -> Iterator[ThreadPoolExecutor]:
+    """
+    Run the blocking calls of run_blocking() in a thread pool of the given size.
+
+    The default executor of asyncio only has min(32, cpu_count + 4) threads, which would limit the
+    number of requests in flight no matter how many coroutines are waiting for them. Within this
+    context (and in the tasks created within it) run_blocking() uses a dedicated thread pool with
+    max_workers threads instead.
+
+    Args:
+        max_workers: The number of threads (the maximum number of blocking calls at the same time)
+
+    Yields:
+        The thread pool
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fotoobo")
+    token = _executor.set(executor)
+    try:
+        yield executor
+
+    finally:
+        _executor.reset(token)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function in a thread without blocking the event loop.
+
+    The thread pool of the surrounding blocking_executor() is used or else the default executor of
+    the event loop.
+
+    Args:
+        func:   The blocking function
+        args:   The positional arguments for the function
+        kwargs: The keyword arguments for the function
+
+    Returns:
+        The return value of the function
+    """
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(_executor.get(), partial(func, *args, **kwargs))
+
+
+def clear_overload() -> None:
+    """
+    Forget the overload reported in the current thread (e.g. before the next device is processed).
+    """
+    _feedback.overloaded = False
+
+
+def overload_reported() -> bool:
+    """
+    Check if an overload was reported in the current thread since clear_overload() was called.
+
+    Returns:
+        True if an overload was reported, else False
+    """
+    return bool(getattr(_feedback, "overloaded", False))
+
+
+def report_overload() -> None:
+    """
+    Report that the device processed in the current thread seems to be overloaded.
+
+    It is called by the Fortinet classes on every request which timed out or was answered with an
+    overload status code (see OVERLOAD_STATUS_CODES). An adaptive FleetExecutor reduces its
+    concurrency on these reports. Outside of a FleetExecutor the report has no effect.
+    """
+    _feedback.overloaded = True
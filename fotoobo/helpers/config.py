@@ -17,7 +17,7 @@ from fotoobo.helpers.files import load_yaml_file
 
 
 @dataclass(eq=False, order=False)
-class Config:
+class Config:  # pylint: disable=too-many-instance-attributes
     """
     This is the configuration dataclass for the global configuration options.
     First all the configuration options must be initialized.
@@ -31,6 +31,8 @@ class Config:
     no_logo: bool = False
     cli_info: dict[str, Any] = field(default_factory=dict)
     vault: dict[str, str] = field(default_factory=dict)
+    fleet: dict[str, Any] = field(default_factory=dict)
+    config_cache: dict[str, Any] = field(default_factory=dict)
 
     def load_configuration(  # pylint: disable=too-many-branches
         self, config_file: Path | None = None
@@ -96,6 +98,14 @@ class Config:
 
                 self.no_logo = loaded_config.get("no_logo", self.no_logo)
 
+                self.fleet = loaded_config.get("fleet", {}) or {}
+                if not isinstance(self.fleet, dict):
+                    raise GeneralError("Setting fleet has to be a dictionary")
+
+                self.config_cache = loaded_config.get("config_cache", {}) or {}
+                if not isinstance(self.config_cache, dict):
+                    raise GeneralError("Setting config_cache has to be a dictionary")
+
                 self.vault = loaded_config.get("vault", {})
                 if self.vault:
                     # role_id and secret_id may be stored in environment variables (they overwrite
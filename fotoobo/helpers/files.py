@@ -2,20 +2,26 @@
 Some helper functions for file manipulation.
 """
 
-import json
+import gzip
+import io
 import logging
+import lzma
 import re
-from ftplib import FTP, FTP_TLS
+from ftplib import all_errors, error_temp, FTP, FTP_TLS
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 from zipfile import ZIP_DEFLATED, ZipFile
 
 import yaml
 
-from fotoobo.exceptions import GeneralError
+from fotoobo.exceptions import GeneralError, GeneralWarning
+from fotoobo.helpers import json_codec
 
 log = logging.getLogger("fotoobo")
 
+# The suffixes of the compressed files which open_text_file() decompresses on the fly
+COMPRESSED_SUFFIXES = (".gz", ".lzma", ".xz", ".zip")
+
 
 def create_dir(directory: Path) -> None:
     """
@@ -35,10 +41,140 @@ def create_dir(directory: Path) -> None:
             raise GeneralError(f"Unable to create directory {directory}") from err
 
 
+class FTPUploader:
+    """
+    Upload files to a ftp server over one persistent connection.
+
+    The connection is opened with the first upload and reused for all the following uploads until
+    close() is called (or the context manager is left). If a reused connection was dropped by the
+    server in the meantime it is reopened once. An FTPUploader must not be shared between threads,
+    use one per thread instead.
+    """
+
+    def __init__(self, server: Any) -> None:
+        """
+        Create the uploader (without connecting to the server yet).
+
+        Args:
+            server: The ftp sever definition (see file_to_ftp())
+
+        Raises:
+            GeneralError: If the protocol of the server is unknown
+        """
+        self.server = server
+        self.protocol = getattr(server, "protocol", "sftp")
+        if self.protocol not in ("ftp", "sftp"):
+            raise GeneralError(
+                f'Unknown FTP protocol "{self.protocol}" for server "{server.hostname}"'
+            )
+
+        self._ftp: FTP | None = None
+
+    def __enter__(self) -> "FTPUploader":
+        """
+        Use the uploader as a context manager which closes the connection on exit.
+        """
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """
+        Close the connection to the ftp server.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connection to the ftp server (if there is one).
+        """
+        ftp, self._ftp = self._ftp, None
+        if ftp is not None:
+            try:
+                if ftp.sock is not None:
+                    ftp.quit()
+
+            except all_errors:
+                pass
+
+            finally:
+                ftp.close()
+
+    def upload(self, file: Path) -> int:
+        """
+        Upload a file to the ftp server.
+
+        Args:
+            file: The source file to upload
+
+        Returns:
+            Return code (0 on success, 666 if the file does not exist or the ftp code otherwise)
+        """
+        if not file.is_file():
+            return 666
+
+        reused = self._ftp is not None
+        try:
+            return self._store(file)
+
+        except (OSError, EOFError, error_temp) as err:
+            if not reused:
+                raise
+
+            log.debug("Connection to '%s' lost, reconnecting (%s)", self.server.hostname, err)
+            self.close()
+
+        return self._store(file)
+
+    def _connect(self) -> FTP:
+        """
+        Connect and log in to the ftp server and change to the destination directory.
+
+        Returns:
+            The connection to the ftp server
+        """
+        ftp: FTP
+        if self.protocol == "sftp":
+            ftp = FTP_TLS(self.server.hostname)
+            log.debug("SFTP transfer for '%s'", self.server.hostname)
+            ftp.sendcmd(f"USER {self.server.username}")
+            ftp.sendcmd(f"PASS {self.server.password}")
+
+        else:
+            ftp = FTP(self.server.hostname, self.server.username, self.server.password)
+            log.debug("FTP transfer for '%s'", self.server.hostname)
+
+        ftp.cwd(self.server.directory)
+
+        return ftp
+
+    def _store(self, file: Path) -> int:
+        """
+        Store a file on the ftp server (and connect to it if needed).
+
+        Args:
+            file: The source file to upload
+
+        Returns:
+            Return code
+        """
+        if self._ftp is None:
+            self._ftp = self._connect()
+
+        with file.open("rb") as ftp_file:
+            response = self._ftp.storbinary(f"STOR {file.name}", ftp_file)
+
+        if response != "226 Transfer complete.":
+            if code := re.search(r"^([0-9]{0,3})\s", response):
+                return int(code[1])
+
+        return 0
+
+
 def file_to_ftp(file: Path, server: Any) -> int:
     """
     Upload a file to a ftp server.
 
+    To upload several files to the same server use an FTPUploader which keeps the connection open.
+
     Args:
         file:   The source file to upload
         server: The ftp sever definition dict containing the following keys:
@@ -51,46 +187,11 @@ def file_to_ftp(file: Path, server: Any) -> int:
     Returns:
         Return code
     """
-    return_code = 0
-
-    if file.is_file():
-        if hasattr(server, "protocol"):
-            protocol = server.protocol
-
-        else:
-            protocol = "sftp"
-
-        if protocol == "sftp":
-            with FTP_TLS(server.hostname) as ftp:
-                log.debug("SFTP transfer for '%s'", server.hostname)
-                ftp.sendcmd(f"USER {server.username}")
-                ftp.sendcmd(f"PASS {server.password}")
-                ftp.cwd(server.directory)
-
-                with file.open("rb") as ftp_file:
-                    response = ftp.storbinary(f"STOR {file.name}", ftp_file)
-                    if response != "226 Transfer complete.":
-                        if code := re.search(r"^([0-9]{0,3})\s", response):
-                            return_code = int(code[1])
-
-        elif protocol == "ftp":
-            with FTP(server.hostname, server.username, server.password) as ftp:
-                log.debug("FTP transfer for '%s'", server.hostname)
-                ftp.cwd(server.directory)
-
-                with file.open("rb") as ftp_file:
-                    response = ftp.storbinary(f"STOR {file.name}", ftp_file)
-                    if response != "226 Transfer complete.":
-                        if code := re.search(r"^([0-9]{0,3})\s", response):
-                            return_code = int(code[1])
-
-        else:
-            raise GeneralError(f'Unknown FTP protocol "{protocol}" for server "{server.hostname}"')
+    if not file.is_file():
+        return 666
 
-    else:
-        return_code = 666
-
-    return return_code
+    with FTPUploader(server) as uploader:
+        return uploader.upload(file)
 
 
 def file_to_zip(src: Path, dst: Path, level: int = 9) -> None:
@@ -127,8 +228,7 @@ def load_json_file(json_file: Path) -> list[Any] | dict[str, Any] | None:
     """
     content = None
     if json_file.is_file():
-        with json_file.open(encoding="UTF-8") as in_file:
-            content = json.load(in_file)
+        content = json_codec.loads(json_file.read_bytes())
 
     return content
 
@@ -150,6 +250,42 @@ def load_yaml_file(yaml_file: Path) -> list[Any] | dict[str, Any] | None:
     return content
 
 
+def open_text_file(file: Path, encoding: str = "UTF-8") -> TextIO:
+    """
+    Open a text file for reading which may be compressed (see COMPRESSED_SUFFIXES).
+
+    Compressed files are decompressed on the fly while they are read, so there is no need to
+    decompress them to disk first. A zip archive has to contain the text file as its first file
+    (like the ones written by file_to_zip()).
+
+    Args:
+        file:     The text file (plain, .gz, .lzma, .xz or .zip)
+        encoding: The encoding of the text
+
+    Returns:
+        The text file object (use it as a context manager to close it)
+
+    Raises:
+        GeneralWarning: If a zip archive does not contain a file
+    """
+    if file.suffix == ".gz":
+        return gzip.open(file, "rt", encoding=encoding)
+
+    if file.suffix in (".lzma", ".xz"):
+        return lzma.open(file, "rt", encoding=encoding)
+
+    if file.suffix == ".zip":
+        # The opened member keeps the archive file open after the archive is closed
+        with ZipFile(file) as archive:
+            members = [member for member in archive.infolist() if not member.is_dir()]
+            if not members:
+                raise GeneralWarning(f"There is no file in {file}")
+
+            return io.TextIOWrapper(archive.open(members[0]), encoding=encoding)
+
+    return file.open(encoding=encoding)
+
+
 def save_json_file(json_file: Path, data: list[Any] | dict[Any, Any]) -> bool:
     """
     Saves the content of a list or dict to a json file.
@@ -163,8 +299,7 @@ def save_json_file(json_file: Path, data: list[Any] | dict[Any, Any]) -> bool:
     """
     status = True
     if isinstance(data, (list, dict)):
-        with json_file.open("w", encoding="UTF-8") as out_file:
-            json.dump(data, out_file, indent=4)
+        json_file.write_text(json_codec.dumps(data, indent=4), encoding="UTF-8")
 
     else:
         status = False
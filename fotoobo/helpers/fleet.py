@@ -0,0 +1,514 @@
+"""
+Helpers for running an operation over a fleet of devices.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from time import monotonic
+from typing import Any, Awaitable, Callable, TypeVar
+
+from rich.progress import Progress
+
+from fotoobo.helpers import json_codec
+from fotoobo.helpers.concurrency import blocking_executor, clear_overload, overload_reported
+from fotoobo.helpers.config import config
+from fotoobo.helpers.result import Result
+
+log = logging.getLogger("fotoobo")
+
+T = TypeVar("T")
+
+DEFAULT_WORKERS = 10
+
+
+class AdaptiveConcurrency:  # pylint: disable=too-many-instance-attributes
+    """
+    Limit the number of tasks in flight with additive increase and multiplicative decrease (AIMD).
+
+    As long as the tasks finish without being overloaded and their latency stays within
+    latency_tolerance times the average latency, the limit grows by one per limit tasks finished
+    (so by about one per round of tasks). If a task reports an overload the limit is multiplied
+    with decrease. Only the tasks started after the last decrease may decrease the limit again, so
+    a whole round of tasks failing at the same time only decreases it once.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        """
+        Create the concurrency limit.
+
+        Args:
+            initial:           The number of tasks in flight to start with
+            maximum:           The maximum number of tasks in flight
+            minimum:           The minimum number of tasks in flight
+            decrease:          The factor to multiply the limit with on an overload
+            latency_tolerance: The factor the latency of a task may exceed the average latency
+                               without stopping the increase
+        """
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.maximum = maximum
+        self.minimum = minimum
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.latency: float | None = None
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    def acquire(self) -> float:
+        """
+        Wait until there is room for another task in flight.
+
+        Returns:
+            The time the task started (to hand over to release())
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+        return monotonic()
+
+    def release(self, started: float, overloaded: bool) -> None:
+        """
+        Finish a task in flight and adjust the limit with its outcome.
+
+        Args:
+            started:    The time the task started (as returned by acquire())
+            overloaded: Whether the task reported an overload
+        """
+        now = monotonic()
+        latency = now - started
+        with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                if started > self._last_decrease:
+                    self.limit = max(self.limit * self.decrease, self.minimum)
+                    self._last_decrease = now
+                    log.debug("Overload reported, decreased concurrency to %d", int(self.limit))
+
+            else:
+                if self.latency is None or latency <= self.latency * self.latency_tolerance:
+                    self.limit = min(self.limit + 1 / self.limit, self.maximum)
+
+                self.latency = (
+                    latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+                )
+
+            self._condition.notify_all()
+
+
+class FleetJournal:
+    """
+    The checkpoint journal of a fleet run which allows to resume the run if it died halfway.
+
+    Every asset done is appended to the journal file as a JSON line with the run-id and its name as
+    soon as it is done. When a run is resumed the assets already done in the same run are skipped.
+    A partly written last line (e.g. if the process was killed while writing) is ignored.
+    """
+
+    def __init__(self, file: Path, resume: bool = False, run_id: str | None = None) -> None:
+        """
+        Open the journal.
+
+        Args:
+            file:   The journal file
+            resume: Resume the run in the journal instead of starting a new one (which empties the
+                    journal file)
+            run_id: The run-id to start or resume. If omitted a new run-id is created for a new run
+                    and the last run in the journal is resumed.
+        """
+        self.file = file
+        self.deferred: set[str] = set()
+        self._lock = threading.Lock()
+        entries = self._load() if resume else []
+        self.run_id = (
+            run_id
+            or (entries[-1]["run_id"] if entries else "")
+            or datetime.now().strftime("%Y%m%d-%H%M%S")
+        )
+        self.done = {entry["name"] for entry in entries if entry["run_id"] == self.run_id}
+        if resume:
+            log.info("Resuming run '%s' with %d assets already done", self.run_id, len(self.done))
+
+        else:
+            file.write_text("", encoding="UTF-8")
+
+    def _load(self) -> list[dict[str, str]]:
+        """
+        Load the valid entries of the journal file.
+
+        Returns:
+            The entries of the journal (empty if the file does not exist)
+        """
+        entries = []
+        if self.file.is_file():
+            for line in self.file.read_bytes().splitlines():
+                try:
+                    entry = json_codec.loads(line)
+
+                except ValueError:
+                    log.debug("Ignoring invalid journal line '%s'", line)
+                    continue
+
+                if isinstance(entry, dict) and "run_id" in entry and "name" in entry:
+                    entries.append(entry)
+
+        return entries
+
+    def defer(self, name: str) -> None:
+        """
+        Do not record an asset as done when its task is finished.
+
+        Use it if there is still some work to do for the asset in the background and call record()
+        when this work is done.
+
+        Args:
+            name: The name of the asset
+        """
+        with self._lock:
+            self.deferred.add(name)
+
+    def record(self, name: str) -> None:
+        """
+        Record an asset as done.
+
+        Args:
+            name: The name of the asset
+        """
+        line = json_codec.dumps({"run_id": self.run_id, "name": name}) + "\n"
+        with self._lock:
+            self.done.add(name)
+            self.deferred.discard(name)
+            with self.file.open("a", encoding="UTF-8") as journal:
+                journal.write(line)
+
+
+class FleetExecutor:
+    """
+    Run an operation for every asset of a fleet in a pool of threads.
+
+    This is the one place where the concurrency of the (synchronous) fleet tools is controlled.
+    The settings are taken from the arguments or else from the 'fleet' section of the fotoobo
+    configuration:
+
+    - workers:      The number of threads processing the assets (default: 10)
+    - task_timeout: The time in seconds a single asset may take before it is reported as timed out
+    - deadline:     The time in seconds the whole run may take. The assets which are not finished
+                    when the deadline is reached are reported as skipped.
+    - max_workers:  If it is greater than workers the number of assets in flight is adapted
+                    automatically between 1 and max_workers starting with workers (see
+                    AdaptiveConcurrency). It grows as long as the assets finish without overload
+                    and shrinks on timeouts or overload responses (see
+                    helpers.concurrency.report_overload()). A max_workers lower than workers
+                    limits the number of threads to max_workers (with a warning).
+
+    Threads cannot be killed, so a timed out asset keeps its thread busy until the underlying
+    request times out itself. Its late return value is discarded. On Ctrl-C (KeyboardInterrupt) the
+    assets not started yet are cancelled and the exception is raised again.
+
+    The duration of every finished asset is recorded in result.durations.
+
+    With a journal (see FleetJournal) the assets already done in the run are skipped and every
+    asset which finished in time without an error message is recorded as done.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        task_timeout: float | None = None,
+        deadline: float | None = None,
+        max_workers: int | None = None,
+        journal: FleetJournal | None = None,
+    ) -> None:
+        """
+        Create the fleet executor.
+
+        Args:
+            workers:      The number of threads processing the assets
+            task_timeout: The time in seconds a single asset may take (None for no timeout)
+            deadline:     The time in seconds the whole run may take (None for no deadline)
+            max_workers:  The upper bound of the adaptive concurrency (None to not adapt it)
+            journal:      The journal to resume and record the run (None for no journal)
+        """
+        self.workers = int(workers or config.fleet.get("workers") or DEFAULT_WORKERS)
+        self.task_timeout = task_timeout or config.fleet.get("task_timeout")
+        self.deadline = deadline or config.fleet.get("deadline")
+        self.max_workers = int(max_workers or config.fleet.get("max_workers") or self.workers)
+        if self.max_workers < self.workers:
+            log.warning(
+                "max_workers '%s' is lower than workers '%s', only '%s' assets are processed at "
+                "the same time",
+                self.max_workers,
+                self.workers,
+                self.max_workers,
+            )
+
+        self.concurrency: AdaptiveConcurrency | None = None
+        self.journal = journal
+
+    def run(  # pylint: disable=too-many-locals
+        self,
+        func: Callable[[str, Any], tuple[str, T]],
+        assets: dict[str, Any],
+        result: Result[T],
+        description: str,
+        push: Callable[[str, T], None] | None = None,
+    ) -> Result[T]:
+        """
+        Run a function for every asset and push its return value into the result.
+
+        Args:
+            func:        The function to run for every asset. It gets the name and the asset and has
+                         to return the name and the data to push to the result.
+            assets:      The assets to process with their name as key
+            result:      The Result object to push the results to
+            description: The description for the progress bar
+            push:        The function called with the name and the data of every finished asset
+                         (in the calling thread). The default is result.push_result.
+
+        Returns:
+            The Result object with all the results
+        """
+        push = push or result.push_result
+        started: dict[str, float] = {}
+        deadline = monotonic() + self.deadline if self.deadline else None
+        if self.max_workers > self.workers:
+            self.concurrency = AdaptiveConcurrency(self.workers, self.max_workers)
+
+        if self.journal:
+            assets = self._skip_done(assets, self.journal, result)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            with Progress() as progress:
+                task = progress.add_task(description, total=len(assets))
+                pending = {
+                    executor.submit(self._run_single, func, name, asset, started): name
+                    for name, asset in assets.items()
+                }
+                while pending:
+                    done = concurrent.futures.wait(
+                        pending,
+                        timeout=self._get_wait_time(
+                            [started.get(name) for name in pending.values()], deadline
+                        ),
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    ).done
+                    for future in done:
+                        name = pending.pop(future)
+                        # Look at the messages before the result is pushed, as pushing it may trim
+                        # the messages of the Result (see Result.keep)
+                        failed = any(msg["level"] == "error" for msg in result.get_messages(name))
+                        result.durations[name] = monotonic() - started[name]
+                        push(*future.result())
+                        push_retry_messages(result, name, assets.get(name))
+                        if self.journal and name not in self.journal.deferred and not failed:
+                            self.journal.record(name)
+
+                    progress.update(
+                        task, advance=len(done) + self._expire(pending, started, deadline, result)
+                    )
+
+        except KeyboardInterrupt:
+            log.warning("Interrupted, cancelling the remaining assets")
+            raise
+
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self.concurrency:
+                log.debug("Finished with a concurrency of %d", int(self.concurrency.limit))
+
+        return result
+
+    def _run_single(
+        self,
+        func: Callable[[str, Any], tuple[str, T]],
+        name: str,
+        asset: Any,
+        started: dict[str, float],
+    ) -> tuple[str, T]:
+        """
+        Run the function for a single asset and record its start time (in a worker thread).
+
+        With adaptive concurrency it waits for room in the concurrency limit first and hands over
+        the outcome of the asset to it when it is finished.
+
+        Args:
+            func:    The function to run
+            name:    The name of the asset
+            asset:   The asset
+            started: The start times of the assets to record the start time in
+
+        Returns:
+            The return value of the function
+        """
+        clear_overload()
+        if self.concurrency:
+            started[name] = self.concurrency.acquire()
+
+        else:
+            started[name] = monotonic()
+
+        try:
+            return func(name, asset)
+
+        finally:
+            if self.concurrency:
+                self.concurrency.release(started[name], overload_reported())
+
+    @staticmethod
+    def _skip_done(
+        assets: dict[str, Any], journal: FleetJournal, result: Result[Any]
+    ) -> dict[str, Any]:
+        """
+        Skip the assets which are already done in the run of the journal.
+
+        Args:
+            assets:  The assets to process with their name as key
+            journal: The journal of the run
+            result:  The Result object to push the messages about the skipped assets to
+
+        Returns:
+            The assets which are not done yet
+        """
+        for name in journal.done.intersection(assets):
+            result.push_message(
+                name, f"Skipped '{name}' as it is already done in run '{journal.run_id}'"
+            )
+
+        return {name: asset for name, asset in assets.items() if name not in journal.done}
+
+    def _expire(
+        self,
+        pending: dict[concurrent.futures.Future[Any], str],
+        started: dict[str, float],
+        deadline: float | None,
+        result: Result[Any],
+    ) -> int:
+        """
+        Give up the pending assets which passed their task timeout or the deadline.
+
+        The expired assets are removed from pending and reported in the result.
+
+        Args:
+            pending:  The names of the assets not finished yet by their future
+            started:  The start time of every asset which already started
+            deadline: The time the whole run has to be finished (None for no deadline)
+            result:   The Result object to push the messages to
+
+        Returns:
+            The number of expired assets
+        """
+        now = monotonic()
+        if deadline and now >= deadline:
+            expired = list(pending)
+            reason = f"skipped as the deadline of {self.deadline}s passed"
+
+        elif self.task_timeout:
+            expired = [
+                future
+                for future, name in pending.items()
+                if name in started and now - started[name] >= self.task_timeout
+            ]
+            reason = f"timed out after {self.task_timeout}s"
+
+        else:
+            return 0
+
+        for future in expired:
+            future.cancel()
+            name = pending.pop(future)
+            log.warning("'%s' %s", name, reason)
+            result.push_message(name, f"'{name}' {reason}", level="error")
+
+        return len(expired)
+
+    def _get_wait_time(self, starts: list[float | None], deadline: float | None) -> float | None:
+        """
+        Get the time to wait for the next asset to finish before checking the timeouts again.
+
+        Args:
+            starts:   The start times of the pending assets (None if not started yet)
+            deadline: The time the whole run has to be finished (None for no deadline)
+
+        Returns:
+            The time to wait in seconds (None to wait until the next asset finished)
+        """
+        now = monotonic()
+        limits = [deadline] if deadline else []
+        if self.task_timeout:
+            # Assets which did not start yet are checked again at the latest after a full timeout
+            limits += [(start or now) + self.task_timeout for start in starts]
+
+        return max(min(limits) - now, 0) if limits else None
+
+
+async def run_async(
+    func: Callable[[str, Any], Awaitable[tuple[str, T]]],
+    assets: dict[str, Any],
+    result: Result[T],
+    description: str,
+    max_in_flight: int = 100,
+) -> Result[T]:
+    """
+    Run a coroutine function for every asset and push its return value into the result.
+
+    The assets are processed as tasks of the running event loop. The amount of assets processed at
+    the same time is limited by max_in_flight. The blocking requests of the assets (see
+    Fortinet.api_async()) are run in a thread pool with max_in_flight threads (see
+    blocking_executor()), so up to max_in_flight requests are in flight at the same time.
+
+    Args:
+        func:          The coroutine function to run for every asset. It gets the name and the
+                       asset and has to return the name and the data to push to the result.
+        assets:        The assets to process with their name as key
+        result:        The Result object to push the results to
+        description:   The description for the progress bar
+        max_in_flight: The maximum amount of assets processed at the same time
+
+    Returns:
+        The Result object with all the results
+    """
+    semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def _run_single(name: str, asset: Any) -> tuple[str, T]:
+        async with semaphore:
+            return await func(name, asset)
+
+    with blocking_executor(max_in_flight), Progress() as progress:
+        task = progress.add_task(description, total=len(assets))
+        for future in asyncio.as_completed(
+            [_run_single(name, asset) for name, asset in assets.items()]
+        ):
+            name, data = await future
+            result.push_result(name, data)
+            push_retry_messages(result, name, assets.get(name))
+            progress.update(task, advance=1)
+
+    return result
+
+
+def push_retry_messages(result: Result[Any], name: str, asset: Any) -> None:
+    """
+    Push the messages about retried requests of an asset to the result.
+
+    This makes flaky devices visible in the messages of a fleet operation.
+
+    Args:
+        result: The Result object to push the messages to
+        name:   The name of the asset (as defined in the inventory)
+        asset:  The asset which may have done some retries
+    """
+    if hasattr(asset, "pop_retry_messages"):
+        for message in asset.pop_retry_messages():
+            result.push_message(name, message, level="warning")
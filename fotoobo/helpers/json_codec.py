@@ -0,0 +1,77 @@
+"""
+Helpers for encoding and decoding JSON.
+
+If the optional package orjson is installed it is used for encoding and decoding JSON which is a
+lot faster than the json package from the standard library (especially on large responses from
+FortiManager or FortiGate). Otherwise the standard library is used. Both give the same output (a
+compact JSON string has no spaces, non-ASCII characters are not escaped and non-string keys like
+numbers are converted to strings), except for the notation of floats with an exponent.
+"""
+
+import json
+import logging
+import re
+from typing import Any
+
+try:
+    import orjson
+
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+log = logging.getLogger("fotoobo")
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def dumps(data: Any, indent: int | None = None) -> str:
+    """
+    Encode data to a JSON string.
+
+    Args:
+        data:   The data to encode
+        indent: The number of spaces to indent with (None for a compact JSON string)
+
+    Returns:
+        The JSON string
+
+    Raises:
+        TypeError: If the data is not JSON serializable
+    """
+    if not orjson:
+        if indent is None:
+            return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+        return json.dumps(data, ensure_ascii=False, indent=indent)
+
+    if indent is None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("UTF-8")
+
+    encoded = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+    if indent != 2:
+        # orjson only knows an indentation of two spaces. As line breaks in strings are always
+        # escaped every leading space is part of the indentation and we can simply scale it.
+        encoded = re.sub(
+            rb"(?m)^( +)", lambda match: b" " * (len(match.group(1)) // 2 * indent), encoded
+        )
+
+    return encoded.decode("UTF-8")
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Decode a JSON string.
+
+    Args:
+        data: The JSON string (as str or UTF-8 encoded bytes)
+
+    Returns:
+        The decoded data
+
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON
+    """
+    if orjson:
+        return orjson.loads(data)
+
+    return json.loads(data)
@@ -2,12 +2,13 @@
 The fotoobo Result class
 """
 
-import json
 import logging
 import re
 import smtplib
+import threading
 from pathlib import Path
-from typing import Any, Generic, TypeVar
+from types import TracebackType
+from typing import Any, Callable, Generic, IO, TypeVar
 
 import jinja2
 from rich.console import Console
@@ -16,7 +17,7 @@ from rich.table import Table
 from rich.theme import Theme
 
 from fotoobo.exceptions import GeneralWarning
-from fotoobo.helpers import cli_path
+from fotoobo.helpers import cli_path, json_codec
 from fotoobo.helpers.files import save_json_file, save_txt_file
 
 log = logging.getLogger("fotoobo")
@@ -25,19 +26,38 @@ ftb_theme = Theme({"var": "white", "ftb": "#FF33BB bold", "chk": "green"})
 T = TypeVar("T")
 
 
-class Result(Generic[T]):
+class Result(Generic[T]):  # pylint: disable=too-many-instance-attributes
     """
     This class represents a Result of an operation in fotoobo.
 
     This dataset is meant to be the generic result structure for any tool inside fotoobo.
     It can then be rendered to some command line output (CLI) or JSON response (REST API).
+    Results and messages may be pushed from several threads at the same time.
+
+    With a sink every result and message is also handed over to the sink as soon as it is pushed.
+    The sink is either a JSON Lines file (every record is written as one line and flushed, so the
+    output survives a crash) or a function which gets every record. A record is a dict like
+    {"type": "result", "key": <key>, "data": <data>, "successful": <bool>} or
+    {"type": "message", "host": <host>, "message": <message>, "level": <level>}. A record is
+    serialized before the Result is changed, so data which cannot be written to the JSON Lines file
+    is rejected and not kept. The function is called outside of the lock and may be called from
+    several threads at the same time. Set keep to only keep the results, messages and durations of
+    the latest hosts in memory. The print and save methods then only see these.
     """
 
     OUTPUT_FORMAT_MAPPING = {".json": "json", ".txt": "text"}
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        sink: Path | Callable[[dict[str, Any]], None] | None = None,
+        keep: int | None = None,
+    ) -> None:
         """
         Create the FotooboResult object
+
+        Args:
+            sink: The JSON Lines file or the function to hand over every result and message to
+            keep: The number of latest hosts to keep in memory (all hosts if None)
         """
         # The devices where the processing has been successful
         self.successful: list[str] = []
@@ -54,6 +74,22 @@ class Result(Generic[T]):
         # The results for each device
         self.results: dict[str, T] = {}
 
+        # The time in seconds it took to process each device (see helpers.fleet.FleetExecutor)
+        self.durations: dict[str, float] = {}
+
+        # The lock to push results and messages from several threads
+        self._lock = threading.Lock()
+
+        # The sink to hand over every result and message to
+        self.keep = keep
+        self._sink_file: IO[str] | None = None
+        self._sink: Callable[[dict[str, Any]], None] | None = None
+        if isinstance(sink, Path):
+            self._sink_file = sink.open("w", encoding="UTF-8")
+
+        else:
+            self._sink = sink
+
         # Console object for rich output
         self.console = Console(theme=ftb_theme)
 
@@ -66,13 +102,22 @@ class Result(Generic[T]):
             data:       The output data for this key
             successful: Whether the call has been successful or not [default: True]
         """
-        self.results[key] = data
+        record = {"type": "result", "key": key, "data": data, "successful": successful}
+        line = self._serialize(record)
+        with self._lock:
+            self.results[key] = data
 
-        if successful:
-            self.successful.append(key)
+            if successful:
+                self.successful.append(key)
 
-        else:
-            self.failed.append(key)
+            else:
+                self.failed.append(key)
+
+            self._write_line(line)
+            self._trim()
+
+        if self._sink:
+            self._sink(record)
 
     def push_message(self, host: str, message: str, level: str = "info") -> None:
         """
@@ -84,10 +129,91 @@ class Result(Generic[T]):
             level:   The level to assign to this message, used for later filtering
                      (use for example "info", "warning", "error")
         """
-        if host not in self.messages:
-            self.messages[host] = []
+        record = {"type": "message", "host": host, "message": message, "level": level}
+        line = self._serialize(record)
+        with self._lock:
+            # The host moves to the end, so it is the last one to be trimmed (see _trim())
+            messages = self.messages.pop(host, [])
+            messages.append({"message": message, "level": level})
+            self.messages[host] = messages
+            self._write_line(line)
+            self._trim()
+
+        if self._sink:
+            self._sink(record)
+
+    def close(self) -> None:
+        """
+        Close the JSON Lines file of the sink (if there is one)
+        """
+        with self._lock:
+            if self._sink_file:
+                self._sink_file.close()
+                self._sink_file = None
+
+    def __enter__(self) -> "Result[T]":
+        """
+        Use the Result as context manager which closes its sink at the end
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """
+        Close the sink
+        """
+        self.close()
+
+    def _serialize(self, record: dict[str, Any]) -> str | None:
+        """
+        Serialize a record for the JSON Lines file of the sink
+
+        Args:
+            record: The record to serialize
+
+        Returns:
+            The JSON line of the record (None if there is no JSON Lines file)
+        """
+        if self._sink_file:
+            return json_codec.dumps(record) + "\n"
+
+        return None
+
+    def _write_line(self, line: str | None) -> None:
+        """
+        Write a JSON line to the JSON Lines file of the sink (call it with the lock held)
+
+        Args:
+            line: The JSON line to write
+        """
+        if line is not None and self._sink_file:
+            self._sink_file.write(line)
+            self._sink_file.flush()
+
+    def _trim(self) -> None:
+        """
+        Only keep the results, messages and durations of the latest hosts (call it with the lock
+        held). The messages and durations of a host are dropped together with its result.
+        """
+        if self.keep is None:
+            return
+
+        while len(self.results) > self.keep:
+            key = next(iter(self.results))
+            del self.results[key]
+            self.messages.pop(key, None)
+            self.durations.pop(key, None)
+
+        for collection in (self.messages, self.durations):
+            while len(collection) > self.keep:
+                del collection[next(iter(collection))]
 
-        self.messages[host].append({"message": message, "level": level})
+        for keys in (self.successful, self.failed):
+            del keys[: max(0, len(keys) - self.keep)]
 
     def get_messages(self, host: str) -> list[dict[str, str]]:
         """
@@ -220,7 +346,7 @@ class Result(Generic[T]):
 
             for entry in _values:
                 if isinstance(entry, (dict, list)):
-                    values.append(json.dumps(entry, indent=4))
+                    values.append(json_codec.dumps(entry, indent=4))
 
                 else:
                     values.append(str(entry))
@@ -3,6 +3,6 @@ fgt tools
 """
 
 from . import config, get, monitor
-from .main import backup
+from .main import backup, backup_async, backup_to_dir
 
-__all__ = ["backup", "monitor", "config", "get"]
+__all__ = ["backup", "backup_async", "backup_to_dir", "monitor", "config", "get"]
@@ -2,64 +2,67 @@
 FortiGate CMDB firewall address module
 """
 
-from pathlib import Path
 from typing import Any
 
-from fotoobo.fortinet.fortigate import FortiGate
-from fotoobo.helpers.config import config
 from fotoobo.helpers.result import Result
-from fotoobo.inventory import Inventory
+from fotoobo.tools.fgt.cmdb.get import get_cmdb
+
+FIELDS = ["name", "type", "subnet", "fqdn", "country", "start-ip", "end-ip"]
 
 
 def get_cmdb_firewall_address(
-    host: str, name: str, vdom: str, output_file: str | None
+    host: str, name: str, vdom: str, output_file: str | None, fields: list[str] | None = None
 ) -> Result[list[Any]]:
     """
     Get the firewall address object(s).
 
     The FortiGate api endpoint is: /cmdb/firewall/address
-    """
-    inventory = Inventory(config.inventory_file)
-    fgt: FortiGate = inventory.get_item(host, "fortigate")
-    result = Result[list[Any]]()
-
-    address_list = fgt.api_get(url=f"/cmdb/firewall/address/{name}", vdom=vdom)
-    result.push_result(key=host, data=address_list)
 
-    if output_file:
-        result.push_result(key=host, data=address_list)
-        result.save_raw(file=Path(output_file), key=host)
+    Use a wildcard * in host to query several FortiGates at once (see get_cmdb()). Only the
+    FIELDS shown in the result are requested unless other fields are given (an empty list
+    requests all the fields).
+    """
+    return get_cmdb(
+        host,
+        f"/cmdb/firewall/address/{name}",
+        vdom,
+        output_file,
+        _convert,
+        FIELDS if fields is None else fields,
+    )
 
-    assets = []
-    if address_list:
-        for vd in address_list:
-            for asset in vd["results"]:
 
-                data: dict[str, str] = {
-                    "name": asset["name"],
-                    "vdom": vd["vdom"],
-                    "type": asset["type"],
-                }
+def _convert(vdom: str, asset: Any) -> dict[str, str]:
+    """
+    Convert a raw entry of a FortiGate to an entry of its result.
 
-                if asset["type"] == "fqdn":
-                    data["content"] = asset["fqdn"]
+    Args:
+        vdom:  The VDOM of the entry
+        asset: The raw entry
 
-                elif asset["type"] == "geography":
-                    data["content"] = asset["country"]
+    Returns:
+        The entry of the result
+    """
+    # Use get() as the fields may have been limited to other fields than the default FIELDS
+    data: dict[str, str] = {
+        "name": asset.get("name", ""),
+        "vdom": vdom,
+        "type": asset.get("type", ""),
+    }
 
-                elif asset["type"] == "ipmask":
-                    data["content"] = "/".join(
-                        [asset["subnet"].split(" ")[0], asset["subnet"].split(" ")[1]]
-                    )
+    if data["type"] == "fqdn":
+        data["content"] = asset.get("fqdn", "")
 
-                elif asset["type"] == "iprange":
-                    data["content"] = " - ".join([asset["start-ip"], asset["end-ip"]])
+    elif data["type"] == "geography":
+        data["content"] = asset.get("country", "")
 
-                else:
-                    data["content"] = ""
+    elif data["type"] == "ipmask":
+        data["content"] = "/".join(asset.get("subnet", "").split(" ")[:2])
 
-                assets.append(data)
+    elif data["type"] == "iprange":
+        data["content"] = " - ".join([asset.get("start-ip", ""), asset.get("end-ip", "")])
 
-    result.push_result(host, assets)
+    else:
+        data["content"] = ""
 
-    return result
+    return data
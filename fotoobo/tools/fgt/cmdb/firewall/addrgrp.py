@@ -2,46 +2,51 @@
 FortiGate CMDB firewall addrgrp module
 """
 
-from pathlib import Path
 from typing import Any
 
-from fotoobo.fortinet.fortigate import FortiGate
-from fotoobo.helpers.config import config
 from fotoobo.helpers.result import Result
-from fotoobo.inventory import Inventory
+from fotoobo.tools.fgt.cmdb.get import get_cmdb
+
+FIELDS = ["name", "member"]
 
 
 def get_cmdb_firewall_addrgrp(
-    host: str, name: str, vdom: str, output_file: str | None
+    host: str, name: str, vdom: str, output_file: str | None, fields: list[str] | None = None
 ) -> Result[list[Any]]:
     """
     Get the firewall address group object(s).
 
     The FortiGate api endpoint is: /cmdb/firewall/addrgrp
-    """
-    inventory = Inventory(config.inventory_file)
-    fgt: FortiGate = inventory.get_item(host, "fortigate")
-    result = Result[list[Any]]()
 
-    addrgrp_list = fgt.api_get(url=f"/cmdb/firewall/addrgrp/{name}", vdom=vdom)
+    Use a wildcard * in host to query several FortiGates at once (see get_cmdb()). Only the
+    FIELDS shown in the result are requested unless other fields are given (an empty list
+    requests all the fields).
+    """
+    return get_cmdb(
+        host,
+        f"/cmdb/firewall/addrgrp/{name}",
+        vdom,
+        output_file,
+        _convert,
+        FIELDS if fields is None else fields,
+    )
 
-    if output_file:
-        result.push_result(key=host, data=addrgrp_list)
-        result.save_raw(file=Path(output_file), key=host)
 
-    assets = []
-    if addrgrp_list:
-        for vd in addrgrp_list:
-            for asset in vd["results"]:
-                # print(asset)
-                data: dict[str, str] = {
-                    "name": asset["name"],
-                    "vdom": vd["vdom"],
-                    "content": "\n".join(_["name"] for _ in asset["member"]),
-                }
+def _convert(vdom: str, asset: Any) -> dict[str, str]:
+    """
+    Convert a raw entry of a FortiGate to an entry of its result.
 
-                assets.append(data)
+    Args:
+        vdom:  The VDOM of the entry
+        asset: The raw entry
 
-    result.push_result(host, assets)
+    Returns:
+        The entry of the result
+    """
+    data: dict[str, str] = {
+        "name": asset.get("name", ""),
+        "vdom": vdom,
+        "content": "\n".join(_["name"] for _ in asset.get("member", [])),
+    }
 
-    return result
+    return data
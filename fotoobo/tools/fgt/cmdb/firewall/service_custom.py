@@ -2,62 +2,76 @@
 FortiGate CMDB firewall service custom module
 """
 
-from pathlib import Path
 from typing import Any
 
-from fotoobo.fortinet.fortigate import FortiGate
-from fotoobo.helpers.config import config
 from fotoobo.helpers.result import Result
-from fotoobo.inventory import Inventory
+from fotoobo.tools.fgt.cmdb.get import get_cmdb
+
+FIELDS = [
+    "name",
+    "protocol",
+    "tcp-portrange",
+    "udp-portrange",
+    "icmptype",
+    "icmpcode",
+    "protocol-number",
+]
 
 
 def get_cmdb_firewall_service_custom(
-    host: str, name: str, vdom: str, output_file: str | None
+    host: str, name: str, vdom: str, output_file: str | None, fields: list[str] | None = None
 ) -> Result[list[Any]]:
     """
     Get the firewall service custom object(s).
 
     The FortiGate api endpoint is: /cmdb/firewall.service/custom
-    """
-    inventory = Inventory(config.inventory_file)
-    fgt: FortiGate = inventory.get_item(host, "fortigate")
-    result = Result[list[Any]]()
-
-    service_custom_list = fgt.api_get(url=f"/cmdb/firewall.service/custom/{name}", vdom=vdom)
-
-    if output_file:
-        result.push_result(key=host, data=service_custom_list)
-        result.save_raw(file=Path(output_file), key=host)
-
-    assets = []
-    if service_custom_list:
-        for vd in service_custom_list:
-            for asset in vd["results"]:
-
-                data: dict[str, str] = {
-                    "name": asset["name"],
-                    "vdom": vd["vdom"],
-                    "protocol": asset["protocol"],
-                }
 
-                if asset["protocol"] == "TCP/UDP/SCTP":
-                    data["data_1"] = asset.get("tcp-portrange", "")
-                    data["data_2"] = asset.get("udp-portrange", "")
-
-                elif asset["protocol"] in ["ICMP", "ICMP6"]:
-                    data["data_1"] = asset.get("icmptype", "")
-                    data["data_2"] = asset.get("icmpcode", "")
-
-                elif asset["protocol"] == "IP":
-                    data["data_1"] = asset.get("protocol-number", "")
-                    data["data_2"] = ""
+    Use a wildcard * in host to query several FortiGates at once (see get_cmdb()). Only the
+    FIELDS shown in the result are requested unless other fields are given (an empty list
+    requests all the fields).
+    """
+    return get_cmdb(
+        host,
+        f"/cmdb/firewall.service/custom/{name}",
+        vdom,
+        output_file,
+        _convert,
+        FIELDS if fields is None else fields,
+    )
 
-                else:
-                    data["data_1"] = ""
-                    data["data_2"] = ""
 
-                assets.append(data)
+def _convert(vdom: str, asset: Any) -> dict[str, str]:
+    """
+    Convert a raw entry of a FortiGate to an entry of its result.
 
-    result.push_result(host, assets)
+    Args:
+        vdom:  The VDOM of the entry
+        asset: The raw entry
 
-    return result
+    Returns:
+        The entry of the result
+    """
+    # Use get() as the fields may have been limited to other fields than the default FIELDS
+    data: dict[str, str] = {
+        "name": asset.get("name", ""),
+        "vdom": vdom,
+        "protocol": asset.get("protocol", ""),
+    }
+
+    if data["protocol"] == "TCP/UDP/SCTP":
+        data["data_1"] = asset.get("tcp-portrange", "")
+        data["data_2"] = asset.get("udp-portrange", "")
+
+    elif data["protocol"] in ["ICMP", "ICMP6"]:
+        data["data_1"] = asset.get("icmptype", "")
+        data["data_2"] = asset.get("icmpcode", "")
+
+    elif data["protocol"] == "IP":
+        data["data_1"] = asset.get("protocol-number", "")
+        data["data_2"] = ""
+
+    else:
+        data["data_1"] = ""
+        data["data_2"] = ""
+
+    return data
@@ -0,0 +1,120 @@
+"""
+FortiGate CMDB get utility
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable
+
+from fotoobo.exceptions import APIError, GeneralError, GeneralWarning
+from fotoobo.fortinet.fortigate import DEFAULT_PAGE_SIZE, FortiGate
+from fotoobo.helpers.config import config
+from fotoobo.helpers.fleet import FleetExecutor
+from fotoobo.helpers.result import Result
+from fotoobo.inventory import Inventory
+
+log = logging.getLogger("fotoobo")
+
+
+def get_cmdb(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+    host: str,
+    url: str,
+    vdom: str,
+    output_file: str | None,
+    convert: Callable[[str, Any], dict[str, str]],
+    fields: list[str] | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Result[list[Any]]:
+    """
+    Get a CMDB table from one or more FortiGates.
+
+    All the FortiGates matching host are queried concurrently (see FleetExecutor). The table is
+    fetched page by page (see FortiGate.api_get_paged()) and every entry is converted as soon as it
+    arrives, so the raw table of a FortiGate is never held in memory as a whole unless it has to be
+    written to an output file at the end. The result of every FortiGate is keyed by its name and
+    holds the converted entries of all its VDOMs (every entry has its 'vdom').
+
+    The raw entries are written to the output file (if given). If it ends with '.jsonl' every entry
+    is handed over to the sink of a Result as soon as it arrives (see Result), so it is written as
+    a JSON line of the type 'result' with the name of the FortiGate as 'key' and the 'vdom' and raw
+    'data' of the entry as 'data'. Otherwise
+    the file is written at the end (see Result.save_raw()) with the 'vdom' and 'results' of every
+    VDOM of a single FortiGate or of several FortiGates keyed by their name.
+
+    Args:
+        host:        The FortiGate(s) from the inventory to query. Wildcard * is supported in any
+                     position (see Inventory.get()).
+        url:         The CMDB endpoint to query
+        vdom:        The VDOM to access ("vdom1" or "vdom1,vdom2" or "*")
+        output_file: The file to write the raw entries to
+        convert:     The function to convert a raw entry (and its VDOM) to an entry of the result
+        fields:      The fields of the entries to request (all fields if not given)
+        page_size:   The number of entries to request from a FortiGate at once
+
+    Returns:
+        The Result object with the converted entries of every FortiGate. A FortiGate which failed
+        has no entries and an error message.
+
+    Raises:
+        GeneralError, GeneralWarning, APIError: If a single FortiGate (host without wildcard) failed
+    """
+    fgts = Inventory(config.inventory_file).get(host, "fortigate")
+    single = len(fgts) == 1 and "*" not in host
+    result = Result[list[Any]]()
+    stream = output_file is not None and output_file.endswith(".jsonl")
+    raw_result = Result[Any](sink=Path(str(output_file)), keep=0) if stream else Result[Any]()
+
+    def _get_single_table(name: str, fgt: FortiGate) -> tuple[str, list[Any]]:
+        """
+        Get the CMDB table from a single FortiGate.
+
+        Args:
+            name: The name of the FortiGate (as defined in the inventory)
+            fgt:  The FortiGate object to query
+
+        Returns:
+            name:    The name of the FortiGate (as defined in the inventory)
+            entries: The converted entries (empty if the request failed)
+        """
+        log.debug("Getting '%s' from FortiGate '%s'", url, name)
+        entries = []
+        raw: dict[str, list[Any]] = {}
+        try:
+            for entry_vdom, entry in fgt.api_get_paged(
+                url=url, vdom=vdom, page_size=page_size, fields=fields
+            ):
+                entries.append(convert(entry_vdom, entry))
+                if stream:
+                    raw_result.push_result(name, {"vdom": entry_vdom, "data": entry})
+
+                elif output_file:
+                    raw.setdefault(entry_vdom, []).append(entry)
+
+        except (GeneralError, GeneralWarning) as err:
+            if single:
+                raise
+
+            result.push_message(name, err.message, level="error")
+            return name, []
+
+        except APIError as err:
+            if single:
+                raise
+
+            result.push_message(name, f"{name} returned {err.message}", level="error")
+            return name, []
+
+        if output_file and not stream:
+            raw_result.push_result(name, [{"vdom": k, "results": v} for k, v in raw.items()])
+
+        return name, entries
+
+    with raw_result:
+        FleetExecutor().run(_get_single_table, fgts, result, f"Getting {url}...")
+
+    if output_file and not stream:
+        # A single FortiGate is saved without its name as key (as it always was)
+        key = next(iter(fgts)) if single else None
+        raw_result.save_raw(file=Path(output_file), key=key)
+
+    return result
@@ -3,30 +3,54 @@ FortiGate configuration check utility
 """
 
 import logging
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator, TypeVar
 
 import typer
 
 from fotoobo.exceptions import GeneralError, GeneralWarning
 from fotoobo.fortinet.fortigate_config import FortiGateConfig
+from fotoobo.fortinet.fortigate_config_cache import FortiGateConfigCache
 from fotoobo.fortinet.fortigate_config_check import FortiGateConfigCheck
+from fotoobo.fortinet.fortigate_config_lazy import LazyFortiGateConfig
 from fotoobo.fortinet.fortigate_info import FortiGateInfo
-from fotoobo.helpers.files import load_yaml_file
+from fotoobo.helpers import json_codec
+from fotoobo.helpers.files import COMPRESSED_SUFFIXES, load_yaml_file
 from fotoobo.helpers.result import Result
 
 app = typer.Typer(no_args_is_help=True, rich_markup_mode="rich")
 log = logging.getLogger("fotoobo")
 
+S = TypeVar("S")
+T = TypeVar("T")
 
-def check(config: Path, bundles: Path) -> Result[list[str]]:
+# The timestamp in the name of a compressed backup (e.g. "fgt_1-20240131-2300.conf.zip")
+BACKUP_TIMESTAMP = re.compile(r"-(\d{8}-\d{4})(?=\.conf)")
+
+
+def check(
+    config: Path,
+    bundles: Path,
+    jobs: int = 1,
+    cache_dir: Path | None = None,
+    lazy: bool = False,
+) -> Result[list[str]]:
     """
     The FortiGate configuration check
 
     Args:
-        config:  The configuration to check (either a file or directory)
-                 in case it's a directory all .conf files in it will be checked.
-        bundles: The check bundle to check the configuration against
+        config:    The configuration to check (either a file or directory)
+                   in case it's a directory all .conf files (and their .gz, .lzma, .xz or .zip
+                   archives) in it will be checked.
+        bundles:   The check bundle to check the configuration against
+        jobs:      The number of processes to parse and check the files in (see _map_files())
+        cache_dir: The directory to cache the parsed configurations in (see FortiGateConfigCache)
+        lazy:      Only scan the plain configuration files and parse their sections as they are
+                   needed (see LazyFortiGateConfig)
 
     Raises:
         GeneralWarning: GeneralWarning
@@ -40,7 +64,7 @@ def check(config: Path, bundles: Path) -> Result[list[str]]:
 
     elif config.is_dir():
         log.debug("Given config is a directory")
-        files = [file for file in config.iterdir() if file.suffix == ".conf"]
+        files = sorted(file for file in config.iterdir() if _is_config_file(file))
 
     else:
         log.error("No valid configuration file")
@@ -60,21 +84,23 @@ def check(config: Path, bundles: Path) -> Result[list[str]]:
     total_results: int = 0
     result = Result[list[str]]()
 
-    for file in files:
-        try:
-            fortigate_config = FortiGateConfig.parse_configuration_file(file)
-            conf_check = FortiGateConfigCheck(fortigate_config, checks, result)
-
-        except GeneralWarning as warn:
-            log.warning(warn.message)
+    for file, (hostname, messages) in zip(
+        files,
+        _map_files(
+            partial(_check_file, checks=checks, cache_dir=cache_dir, lazy=lazy), files, jobs
+        ),
+    ):
+        if hostname is None:
             continue
 
-        conf_check.execute_checks()
+        for message in messages:
+            result.push_message(hostname, message["message"], level=message["level"])
 
-        num_results = len(result.get_messages(fortigate_config.info.hostname))
+        num_results = len(result.get_messages(hostname))
         log.info("All checks in '%s' done with '%s' messages", file.name, num_results)
         total_results += num_results
 
+    _evict_cache(cache_dir)
     log.info("All checks done with '%s' messages", total_results)
 
     if total_results == 0:
@@ -83,13 +109,100 @@ def check(config: Path, bundles: Path) -> Result[list[str]]:
     return result
 
 
-def get(config: Path, scope: str = "", path: str = "") -> Result[FortiGateInfo]:
+def diff(
+    old: Path,
+    new: Path,
+    output_file: Path | None = None,
+    jobs: int = 1,
+    cache_dir: Path | None = None,
+) -> Result[list[dict[str, Any]]]:
+    """
+    The FortiGate configuration diff utility.
+
+    It compares two configuration files or all the configuration files in two directories (e.g.
+    the backups of yesterday and today). The files of the directories are paired by their name
+    without the timestamp of the backup (see BACKUP_TIMESTAMP). The deltas of every pair of files
+    are keyed by this name (or by the name of the new file if two files are compared), so the
+    backups of FortiGates with the same hostname do not collide (see FortiGateConfig.diff()).
+
+    Args:
+        old:         The old configuration (either a file or directory)
+        new:         The new configuration (either a file or directory)
+        output_file: The JSON Lines file to write every delta to (with the 'file' and 'host' it
+                     belongs to)
+        jobs:        The number of processes to parse and compare the files in (see _map_files())
+        cache_dir:   The directory to cache the parsed configurations in (see FortiGateConfigCache)
+
+    Returns:
+        The deltas of every FortiGate as result object
+
+    Raises:
+        GeneralWarning: If there are no configuration files to compare
+    """
+    result = Result[list[dict[str, Any]]]()
+    pairs: dict[str, tuple[Path, Path]] = {}
+    if old.is_file() and new.is_file():
+        pairs[new.name] = (old, new)
+
+    elif old.is_dir() and new.is_dir():
+        log.debug("Given configs are directories")
+        old_files, new_files = _get_backups(old), _get_backups(new)
+        pairs = {
+            name: (file, new_files[name]) for name, file in old_files.items() if name in new_files
+        }
+        for name in sorted(old_files.keys() ^ new_files.keys()):
+            result.push_message(
+                name,
+                f"Configuration '{name}' is only in the "
+                f"{'old' if name in old_files else 'new'} directory",
+                level="warning",
+            )
+
+    if not pairs:
+        log.warning("There are no configuration files to compare")
+        raise GeneralWarning("There are no configuration files to compare")
+
+    with ExitStack() as stack:
+        out_file = (
+            stack.enter_context(output_file.open("w", encoding="UTF-8")) if output_file else None
+        )
+        for name, (hostname, deltas) in zip(
+            pairs, _map_files(partial(_diff_files, cache_dir=cache_dir), list(pairs.values()), jobs)
+        ):
+            result.push_result(name, deltas)
+            log.info("Found '%s' differences in '%s' ('%s')", len(deltas), name, hostname)
+            if out_file:
+                for delta in deltas:
+                    out_file.write(
+                        json_codec.dumps({"file": name, "host": hostname, **delta}) + "\n"
+                    )
+
+    _evict_cache(cache_dir)
+
+    return result
+
+
+def get(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+    config: Path,
+    scope: str = "",
+    path: str = "",
+    jobs: int = 1,
+    cache_dir: Path | None = None,
+    lazy: bool = False,
+) -> Result[FortiGateInfo]:
     """
     The FortiGate get configuration utility.
 
     Args:
-        config: The configuration to get the information from (either a file or directory)
-                In case it's a directory all .conf files in it will be checked.
+        config:    The configuration to get the information from (either a file or directory)
+                   In case it's a directory all .conf files (and their .gz, .lzma, .xz or .zip
+                   archives) in it will be checked.
+        scope:     The configuration part to get the configuration from (global|vdom)
+        path:      The configuration path to get (see FortiGateConfig.get_configuration())
+        jobs:      The number of processes to parse the files in (see _map_files())
+        cache_dir: The directory to cache the parsed configurations in (see FortiGateConfigCache)
+        lazy:      Only scan the plain configuration files and parse their sections as they are
+                   needed (see LazyFortiGateConfig)
 
     Returns:
         Configuration as result object
@@ -103,7 +216,9 @@ def get(config: Path, scope: str = "", path: str = "") -> Result[FortiGateInfo]:
 
     elif config.is_dir():
         log.debug("Given config is a directory")
-        files = [file for file in config.iterdir() if file.is_file() and file.suffix == ".conf"]
+        files = sorted(
+            file for file in config.iterdir() if file.is_file() and _is_config_file(file)
+        )
 
     if not files:
         log.warning("There are no configuration files")
@@ -111,21 +226,30 @@ def get(config: Path, scope: str = "", path: str = "") -> Result[FortiGateInfo]:
 
     result = Result[Any]()
 
-    for file in files:
-        conf = FortiGateConfig.parse_configuration_file(file)
-        output = conf.get_configuration(scope, path)
-        result.push_result(conf.info.hostname, output)
+    for hostname, output in _map_files(
+        partial(_get_file, scope=scope, path=path, cache_dir=cache_dir, lazy=lazy), files, jobs
+    ):
+        result.push_result(hostname, output)
+
+    _evict_cache(cache_dir)
 
     return result
 
 
-def info(config: Path) -> Result[FortiGateInfo]:
+def info(
+    config: Path, jobs: int = 1, cache_dir: Path | None = None, lazy: bool = False
+) -> Result[FortiGateInfo]:
     """
     The FortiGate configuration information utility.
 
     Args:
-        config: The configuration to get the information from (either a file or directory)
-                In case it's a directory all .conf files in it will be checked.
+        config:    The configuration to get the information from (either a file or directory)
+                   In case it's a directory all .conf files (and their .gz, .lzma, .xz or .zip
+                   archives) in it will be checked.
+        jobs:      The number of processes to parse the files in (see _map_files())
+        cache_dir: The directory to cache the parsed configurations in (see FortiGateConfigCache)
+        lazy:      Only scan the plain configuration files and parse their sections as they are
+                   needed (see LazyFortiGateConfig)
 
     Returns:
         FortiGate information as result object
@@ -139,7 +263,9 @@ def info(config: Path) -> Result[FortiGateInfo]:
 
     elif config.is_dir():
         log.debug("Given config is a directory")
-        files = [file for file in config.iterdir() if file.is_file() and file.suffix == ".conf"]
+        files = sorted(
+            file for file in config.iterdir() if file.is_file() and _is_config_file(file)
+        )
 
     if not files:
         log.warning("There are no configuration files")
@@ -147,8 +273,198 @@ def info(config: Path) -> Result[FortiGateInfo]:
 
     result = Result[FortiGateInfo]()
 
-    for file in files:
-        conf = FortiGateConfig.parse_configuration_file(file)
-        result.push_result(conf.info.hostname, conf.info)
+    for hostname, fortigate_info in _map_files(
+        partial(_info_file, cache_dir=cache_dir, lazy=lazy), files, jobs
+    ):
+        result.push_result(hostname, fortigate_info)
+
+    _evict_cache(cache_dir)
 
     return result
+
+
+def _map_files(func: Callable[[S], T], files: list[S], jobs: int) -> Iterator[T]:
+    """
+    Run a function for every configuration file.
+
+    Parsing a configuration file is CPU bound. So with more than one job the files are parsed in a
+    pool of worker processes. The return values are always yielded in the order of the files, so
+    the result is the same no matter how many jobs are used.
+
+    Args:
+        func:  The function to run for every file (it has to be picklable with jobs > 1)
+        files: The configuration files
+        jobs:  The number of worker processes (1 to run in this process)
+
+    Yields:
+        The return value of the function for every file
+    """
+    if jobs <= 1 or len(files) <= 1:
+        yield from map(func, files)
+        return
+
+    log.debug("Parsing '%s' configuration files in '%s' processes", len(files), jobs)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+        yield from executor.map(func, files)
+
+
+def _check_file(
+    file: Path, checks: Any, cache_dir: Path | None, lazy: bool = False
+) -> tuple[str | None, list[dict[str, str]]]:
+    """
+    Parse and check a single configuration file.
+
+    Args:
+        file:      The configuration file
+        checks:    The checks to do against the configuration
+        cache_dir: The directory of the FortiGateConfigCache (None to not use a cache)
+        lazy:      Parse the sections of a plain configuration file as they are needed
+
+    Returns:
+        The hostname of the FortiGate (None if the file could not be parsed) and the messages of
+        the checks
+    """
+    result = Result[list[str]]()
+    try:
+        fortigate_config = _parse_file(file, cache_dir, lazy)
+        fortigate_config.enable_index()
+        conf_check = FortiGateConfigCheck(fortigate_config, checks, result)
+
+    except GeneralWarning as warn:
+        log.warning(warn.message)
+        return None, []
+
+    conf_check.execute_checks()
+
+    return fortigate_config.info.hostname, result.get_messages(fortigate_config.info.hostname)
+
+
+def _get_file(
+    file: Path, scope: str, path: str, cache_dir: Path | None, lazy: bool = False
+) -> tuple[str, Any]:
+    """
+    Parse a single configuration file and get a part of its configuration.
+
+    Args:
+        file:      The configuration file
+        scope:     The configuration part to get the configuration from (global|vdom)
+        path:      The configuration path to get
+        cache_dir: The directory of the FortiGateConfigCache (None to not use a cache)
+        lazy:      Parse the sections of a plain configuration file as they are needed
+
+    Returns:
+        The hostname of the FortiGate and the configuration from the path
+    """
+    conf = _parse_file(file, cache_dir, lazy)
+
+    return conf.info.hostname, conf.get_configuration(scope, path)
+
+
+def _info_file(file: Path, cache_dir: Path | None, lazy: bool = False) -> tuple[str, FortiGateInfo]:
+    """
+    Parse a single configuration file and get its information.
+
+    Args:
+        file:      The configuration file
+        cache_dir: The directory of the FortiGateConfigCache (None to not use a cache)
+        lazy:      Parse the sections of a plain configuration file as they are needed
+
+    Returns:
+        The hostname of the FortiGate and its information
+    """
+    conf = _parse_file(file, cache_dir, lazy)
+
+    return conf.info.hostname, conf.info
+
+
+def _diff_files(files: tuple[Path, Path], cache_dir: Path | None) -> tuple[str, Any]:
+    """
+    Parse two configuration files and compare them.
+
+    Args:
+        files:     The old and the new configuration file
+        cache_dir: The directory of the FortiGateConfigCache (None to not use a cache)
+
+    Returns:
+        The hostname of the FortiGate (from the new configuration) and the deltas
+    """
+    old, new = _parse_file(files[0], cache_dir), _parse_file(files[1], cache_dir)
+
+    return new.info.hostname, old.diff(new)
+
+
+def _get_backups(directory: Path) -> dict[str, Path]:
+    """
+    Get the configuration files of a directory by their name without the timestamp of the backup.
+
+    If there are several backups with the same name the one with the newest timestamp is taken. A
+    file without a timestamp is older than every backup with one.
+
+    Args:
+        directory: The directory with the configuration files
+
+    Returns:
+        The newest configuration file for every name
+    """
+    files: dict[str, tuple[str, Path]] = {}
+    for file in directory.iterdir():
+        if file.is_file() and _is_config_file(file):
+            match = BACKUP_TIMESTAMP.search(file.name)
+            timestamp = match[1] if match else ""
+            name = BACKUP_TIMESTAMP.sub("", file.name)
+            if name not in files or (timestamp, file.name) > (files[name][0], files[name][1].name):
+                files[name] = (timestamp, file)
+
+    return {name: file for name, (_, file) in sorted(files.items())}
+
+
+def _parse_file(file: Path, cache_dir: Path | None, lazy: bool = False) -> FortiGateConfig:
+    """
+    Parse a single configuration file (or get it from the cache).
+
+    In lazy mode (and without a cache) the configuration file is only scanned and its sections are
+    parsed as soon as they are needed (see LazyFortiGateConfig). Compressed configuration files are
+    always parsed as a whole while they are decompressed.
+
+    Args:
+        file:      The configuration file
+        cache_dir: The directory of the FortiGateConfigCache (None to not use a cache)
+        lazy:      Parse the sections of a plain configuration file as they are needed
+
+    Returns:
+        The parsed FortiGate configuration object
+    """
+    if cache_dir:
+        return FortiGateConfigCache(cache_dir).get(file)
+
+    if lazy and file.suffix not in COMPRESSED_SUFFIXES:
+        return LazyFortiGateConfig(file)
+
+    return FortiGateConfig.parse_configuration_file(file)
+
+
+def _is_config_file(file: Path) -> bool:
+    """
+    Check if a file in a configuration directory is a configuration file.
+
+    Args:
+        file: The file to check
+
+    Returns:
+        True for the .conf files and their compressed archives (e.g. .conf.zip), else False
+    """
+    if file.suffix in COMPRESSED_SUFFIXES:
+        file = file.with_suffix("")
+
+    return file.suffix == ".conf"
+
+
+def _evict_cache(cache_dir: Path | None) -> None:
+    """
+    Evict the least recently used entries from the cache (if a cache is used).
+
+    Args:
+        cache_dir: The directory of the FortiGateConfigCache (None to not use a cache)
+    """
+    if cache_dir:
+        FortiGateConfigCache(cache_dir).evict()
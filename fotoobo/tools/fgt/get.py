@@ -2,14 +2,12 @@
 FortiGate get version utility
 """
 
-import concurrent.futures
 import logging
 
-from rich.progress import Progress
-
 from fotoobo.exceptions import GeneralError, GeneralWarning
 from fotoobo.fortinet.fortigate import FortiGate
 from fotoobo.helpers.config import config
+from fotoobo.helpers.fleet import FleetExecutor, run_async
 from fotoobo.helpers.result import Result
 from fotoobo.inventory import Inventory
 
@@ -58,16 +56,48 @@ def version(host: str | None = None) -> Result[str]:
     fgts = inventory.get(host, "fortigate")
     result = Result[str]()
 
-    with Progress() as progress:
-        task = progress.add_task("getting FortiGate versions...", total=len(fgts))
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = []
-            for name, fgt in fgts.items():
-                futures.append(executor.submit(_get_single_version, name, fgt))
+    return FleetExecutor().run(_get_single_version, fgts, result, "getting FortiGate versions...")
+
+
+async def version_async(host: str | None = None, max_in_flight: int = 100) -> Result[str]:
+    """
+    Asynchronously get the version(s) of one or more FortiGates.
+
+    This is the asyncio counterpart of version().
+
+    Args:
+        host:          The host from the inventory to get the version. If you omit host, it will
+                       run over all FortiGates in the inventory.
+        max_in_flight: The maximum amount of FortiGates to query at the same time
+
+    Returns:
+        The Result object with all the results
+    """
+
+    async def _get_single_version(name: str, fgt: FortiGate) -> tuple[str, str]:
+        """
+        Get the version from a FortiGate.
+
+        Args:
+            name: The name of the FortiGate (as defined in the inventory)
+            fgt:  The FortiGate object to query
+
+        Returns:
+            name:    The name of the FortiGate (as defined in the inventory)
+            version: The version of the FortiGate (fgt)
+        """
+        log.debug("Getting FortiGate version for '%s'", name)
+        try:
+            fortigate_version = await fgt.get_version_async()
 
-            for future in concurrent.futures.as_completed(futures):
-                name, fortigate_version = future.result()
-                result.push_result(name, fortigate_version)
-                progress.update(task, advance=1)
+        except (GeneralWarning, GeneralError) as exception:
+            fortigate_version = f"unknown due to {exception.message}"
+
+        return name, fortigate_version
+
+    inventory = Inventory(config.inventory_file)
+    fgts = inventory.get(host, "fortigate")
 
-    return result
+    return await run_async(
+        _get_single_version, fgts, Result[str](), "getting FortiGate versions...", max_in_flight
+    )
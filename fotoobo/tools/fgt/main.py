@@ -2,20 +2,36 @@
 FortiGate backup utility
 """
 
-import concurrent.futures
 import json
 import logging
+import queue
+import threading
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from time import monotonic
+from types import TracebackType
+from typing import Any
 
-from rich.progress import Progress
-
-from fotoobo.exceptions import APIError, GeneralError
+from fotoobo.exceptions import APIError, GeneralError, GeneralWarning
 from fotoobo.fortinet.fortigate import FortiGate
 from fotoobo.helpers.config import config
+from fotoobo.helpers.files import file_to_zip, FTPUploader, load_json_file, save_json_file
+from fotoobo.helpers.fleet import FleetExecutor, FleetJournal, run_async
 from fotoobo.helpers.result import Result
 from fotoobo.inventory import Inventory
 
 log = logging.getLogger("fotoobo")
 
+# The file in the backup directory with the configuration checksums for the incremental backup
+CHECKSUM_INDEX = ".fotoobo_checksums.json"
+
+# The file in the backup directory with the journal of the last backup run
+JOURNAL = ".fotoobo_journal.jsonl"
+
+# The seconds to wait for the threads of a cancelled UploadPipeline to finish their current backup
+CANCEL_TIMEOUT = 5
+
 
 def backup(
     host: str | None = None,
@@ -55,16 +71,61 @@ def backup(
 
         try:
             data = fgt.backup(timeout=timeout)
-            if data.startswith("#config-version"):
-                message = f"Config backup for '{name}' succeeded"
-                log.info(message)
-                result.push_message(name, message)
+            _check_backup(name, data, result)
+
+        except GeneralError as err:
+            result.push_message(name, err.message, level="error")
+
+        except APIError as err:
+            result.push_message(name, f"{name} returned {err.message}", level="error")
+
+        return name, data
 
-            else:
-                data_json = json.loads(data)
-                message = f"Backup '{name}' failed with error '{data_json['http_status']}'"
-                log.error(message)
-                result.push_message(name, message, level="error")
+    return FleetExecutor().run(_get_single_backup, fgts, result, "Download FortiGate backups...")
+
+
+async def backup_async(
+    host: str | None = None,
+    timeout: int = 60,
+    max_in_flight: int = 100,
+) -> Result[str]:
+    """
+    Asynchronously get the configuration backup from one or more FortiGates.
+
+    This is the asyncio counterpart of backup(). The FortiGates are processed as tasks of the event
+    loop while their requests run in a thread pool with max_in_flight threads (see run_async()).
+
+    Args:
+        host:          The host from the inventory to get the backup. If no host is given all
+                       FortiGate devices in the inventory are backed up.
+        timeout:       Timeout in seconds to wait for each FortiGate to
+        max_in_flight: The maximum amount of FortiGates to query at the same time
+
+    Returns:
+        The Result object with all the results
+    """
+    result = Result[str]()
+    inventory = Inventory(config.inventory_file)
+    fgts = inventory.get(host, "fortigate")
+
+    async def _get_single_backup(name: str, fgt: FortiGate) -> tuple[str, str]:
+        """
+        Get the configuration backup from a single FortiGate.
+
+        Args:
+            name: The name of the FortiGate (as defined in the inventory)
+            fgt:  The FortiGate object to query
+
+        Returns:
+            name: The name of the FortiGate (as defined in the inventory)
+            data: The configuration backup of the FortiGate (fgt)
+        """
+        log.debug("Backup FortiGate '%s'", name)
+        data: str = ""
+
+        try:
+            data = await fgt.backup_async(timeout=timeout)
+            _check_backup(name, data, result)
 
         except GeneralError as err:
             result.push_message(name, err.message, level="error")
@@ -74,16 +135,457 @@ def backup(
 
         return name, data
 
-    with Progress() as progress:
-        task = progress.add_task("Download FortiGate backups...", total=len(fgts))
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = []
-            for name, fgt in fgts.items():
-                futures.append(executor.submit(_get_single_backup, name, fgt))
+    return await run_async(
+        _get_single_backup, fgts, result, "Download FortiGate backups...", max_in_flight
+    )
+
 
-            for future in concurrent.futures.as_completed(futures):
-                name, configuration_backup = future.result()
-                result.push_result(name, configuration_backup)
-                progress.update(task, advance=1)
+def backup_to_dir(  # pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+    backup_dir: Path,
+    host: str | None = None,
+    timeout: int = 60,
+    incremental: bool = False,
+    ftp_server: str | None = None,
+    resume: bool = False,
+    journal_file: Path | None = None,
+) -> Result[dict[str, Any]]:
+    """
+    Stream the FortiGate configuration backups directly into files in a directory.
+
+    Other than backup() the configurations are never held in memory. Every backup is written to
+    '<backup_dir>/<name>.conf' while it is downloaded and only its metadata is kept in the result.
+
+    In incremental mode the configuration checksum of every FortiGate is queried first and compared
+    to the checksum index in the backup directory (see CHECKSUM_INDEX). Only the FortiGates with a
+    changed configuration (or without a backup file) are downloaded. If the checksum cannot be
+    queried the backup is downloaded anyway. As the checksum is queried before the download a
+    configuration change in between just leads to another download in the next run.
+
+    If an ftp server is given the (changed) backups are compressed and uploaded to it while the
+    other backups are still downloading (see UploadPipeline).
+
+    If a journal file is given every FortiGate done (including the upload) is recorded in it (see
+    FleetJournal). If a run died halfway it may be resumed to skip the FortiGates already done. The
+    journal in the backup directory is resumed if no journal file is given (see JOURNAL), which is
+    only written by resumed runs. Without a journal file and resume no journal is written.
+
+    Args:
+        backup_dir:   The directory to write the backups to
+        host:         The host from the inventory to get the backup. If no host is given all
+                      FortiGate devices in the inventory are backed up.
+        timeout:      Timeout in seconds to wait for each FortiGate to
+        incremental:  Only download the backups of FortiGates with a changed configuration
+        ftp_server:   The ftp server from the inventory to upload the backups to
+        resume:       Resume the last run and skip the FortiGates already done in it
+        journal_file: The journal file to record the FortiGates done in
+
+    Returns:
+        The Result object with the metadata of every successful backup (see
+        FortiGate.backup_to_file()). The metadata is enriched with 'changed' (False if the backup
+        was skipped because it did not change) and 'config_checksum' (in incremental mode).
+
+    Raises:
+        GeneralWarning: If the ftp server is not defined in the inventory or there is no journal
+                        to resume
+    """
+    result = Result[dict[str, Any]]()
+    inventory = Inventory(config.inventory_file)
+    fgts = inventory.get(host, "fortigate")
+    if ftp_server and ftp_server not in inventory.assets:
+        raise GeneralWarning(f"FTP server '{ftp_server}' not found in inventory")
+
+    if resume:
+        journal_file = journal_file or backup_dir / JOURNAL
+        if not journal_file.is_file():
+            raise GeneralWarning(f"There is no journal '{journal_file}' to resume")
+
+    index = _load_checksum_index(backup_dir) if incremental else {}
+
+    def _get_single_backup(name: str, fgt: FortiGate) -> tuple[str, dict[str, Any]]:
+        """Stream the configuration backup from a single FortiGate into its file.
+
+        Args:
+            name: The name of the FortiGate (as defined in the inventory)
+            fgt:  The FortiGate object to query
+
+        Returns:
+            name:     The name of the FortiGate (as defined in the inventory)
+            metadata: The metadata of the backup (empty if the backup failed)
+        """
+        log.debug("Backup FortiGate '%s'", name)
+        config_file = backup_dir / f"{name}.conf"
+        metadata: dict[str, Any] = {}
+        config_checksum = ""
+
+        try:
+            if incremental:
+                config_checksum = _get_config_checksum(name, fgt)
+                known = index.get(name, {})
+                if (
+                    config_checksum
+                    and known.get("config_checksum") == config_checksum
+                    and config_file.is_file()
+                ):
+                    message = f"Config for '{name}' did not change, backup skipped"
+                    log.info(message)
+                    result.push_message(name, message)
+
+                    return name, {**known, "file": str(config_file), "changed": False}
+
+            metadata = fgt.backup_to_file(config_file, timeout=timeout)
+            metadata["changed"] = True
+            if config_checksum:
+                metadata["config_checksum"] = config_checksum
+
+            message = f"Config backup for '{name}' succeeded"
+            log.info(message)
+            result.push_message(name, message)
+
+        except (GeneralError, GeneralWarning) as err:
+            result.push_message(name, err.message, level="error")
+
+        except APIError as err:
+            result.push_message(name, f"{name} returned {err.message}", level="error")
+
+        return name, metadata
+
+    journal = FleetJournal(journal_file, resume=resume) if journal_file else None
+
+    with ExitStack() as stack:
+        pipeline = None
+        if ftp_server:
+            pipeline = stack.enter_context(
+                UploadPipeline(
+                    backup_dir, ftp_server, inventory.assets[ftp_server], result, journal=journal
+                )
+            )
+
+        def _push(name: str, metadata: dict[str, Any]) -> None:
+            if metadata:
+                result.push_result(name, metadata)
+                if pipeline and metadata.get("changed"):
+                    if journal:
+                        journal.defer(name)
+
+                    pipeline.put(name, Path(metadata["file"]))
+
+        FleetExecutor(journal=journal).run(
+            _get_single_backup, fgts, result, "Download FortiGate backups...", push=_push
+        )
+
+    if incremental:
+        _save_checksum_index(backup_dir, index, result.all_results())
 
     return result
+
+
+class UploadPipeline:  # pylint: disable=too-many-instance-attributes
+    """
+    Compress the configuration backups and upload them to a ftp server in overlapping stages.
+
+    Backups handed over with put() are compressed by a pool of compression threads and then
+    uploaded by a pool of upload threads. Every upload thread keeps its own persistent connection
+    to the ftp server (see FTPUploader). The stages are connected by bounded queues, so put()
+    blocks while the following stages are busy instead of piling up the files.
+
+    An error with a single backup is pushed to the result and the thread goes on with the next
+    one, so the queues are always drained.
+
+    Use it as a context manager. On exit it waits until all the backups are uploaded. If the
+    context is left with an exception (e.g. on Ctrl-C) the pipeline is cancelled instead (see
+    cancel()).
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self,
+        backup_dir: Path,
+        name: str,
+        server: Any,
+        result: Result[Any],
+        compress_workers: int = 2,
+        upload_workers: int = 2,
+        journal: FleetJournal | None = None,
+    ) -> None:
+        """
+        Create the pipeline.
+
+        Args:
+            backup_dir:       The directory to write the compressed backups to
+            name:             The name of the ftp server in the inventory (used in the messages)
+            server:           The ftp server definition from the inventory
+            result:           The Result object to push the messages to
+            compress_workers: The number of threads compressing the backups
+            upload_workers:   The number of threads (and ftp connections) uploading the backups
+            journal:          The journal to record the FortiGates in whose backup is uploaded
+
+        Raises:
+            GeneralError: If the protocol of the ftp server is unknown
+        """
+        self.backup_dir = backup_dir
+        self.name = name
+        self.result = result
+        self.journal = journal
+        self.time = datetime.now().strftime("%Y%m%d-%H%M")
+        self._cancelled = threading.Event()
+        self._compress_queue: queue.Queue[tuple[str, Path] | None] = queue.Queue(
+            maxsize=2 * compress_workers
+        )
+        self._upload_queue: queue.Queue[tuple[str, Path] | None] = queue.Queue(
+            maxsize=2 * upload_workers
+        )
+        self._compress_threads = [
+            threading.Thread(target=self._compress, daemon=True) for _ in range(compress_workers)
+        ]
+        self._upload_threads = [
+            threading.Thread(target=self._upload, args=(FTPUploader(server),), daemon=True)
+            for _ in range(upload_workers)
+        ]
+
+    def __enter__(self) -> "UploadPipeline":
+        """
+        Start the compression and upload threads.
+        """
+        for thread in self._compress_threads + self._upload_threads:
+            thread.start()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """
+        Wait until all the backups handed over are compressed and uploaded or cancel the pipeline
+        if the context is left with an exception.
+        """
+        if exc_type is not None:
+            self.cancel()
+            return
+
+        try:
+            for work_queue, threads in (
+                (self._compress_queue, self._compress_threads),
+                (self._upload_queue, self._upload_threads),
+            ):
+                for _ in threads:
+                    work_queue.put(None)
+
+                for thread in threads:
+                    thread.join()
+
+        except BaseException:
+            self.cancel()
+            raise
+
+    def cancel(self) -> None:
+        """
+        Cancel the pipeline.
+
+        The backups which are not compressed or uploaded yet are dropped (an error is pushed for
+        every one of them) and the threads get CANCEL_TIMEOUT seconds to finish their current
+        backup. A thread which is still stuck then (e.g. on a stalled ftp server) is left behind.
+        """
+        self._cancelled.set()
+        for work_queue in (self._compress_queue, self._upload_queue):
+            while True:
+                try:
+                    item = work_queue.get_nowait()
+
+                except queue.Empty:
+                    break
+
+                if item:
+                    self._drop(*item)
+
+            for _ in range(len(self._compress_threads) + len(self._upload_threads)):
+                try:
+                    work_queue.put_nowait(None)
+
+                except queue.Full:
+                    break
+
+        deadline = monotonic() + CANCEL_TIMEOUT
+        for thread in self._compress_threads + self._upload_threads:
+            thread.join(timeout=max(0.0, deadline - monotonic()))
+
+    def put(self, name: str, config_file: Path) -> None:
+        """
+        Hand over a configuration backup to compress and upload.
+
+        Args:
+            name:        The name of the FortiGate (as defined in the inventory)
+            config_file: The configuration backup file
+        """
+        if self._cancelled.is_set():
+            self._drop(name, config_file)
+            return
+
+        self._compress_queue.put((name, config_file))
+
+    def _compress(self) -> None:
+        """
+        Compress the configuration backups from the compression queue (compression thread).
+        """
+        while item := self._compress_queue.get():
+            name, config_file = item
+            if self._cancelled.is_set():
+                self._drop(name, config_file)
+                continue
+
+            log.debug("Compressing configuration '%s'", name)
+            zip_file = self.backup_dir / f"{name}-{self.time}.conf.zip"
+            try:
+                file_to_zip(config_file, zip_file)
+
+            except Exception as err:  # pylint: disable=broad-except
+                self.result.push_message(
+                    name, f"Compressing config file for '{name}' failed: {err}", level="error"
+                )
+                continue
+
+            self._upload_queue.put((name, zip_file))
+
+    def _upload(self, uploader: FTPUploader) -> None:
+        """
+        Upload the compressed backups from the upload queue (upload thread).
+
+        Args:
+            uploader: The uploader with the persistent connection of this thread
+        """
+        with uploader:
+            while item := self._upload_queue.get():
+                name, zip_file = item
+                if self._cancelled.is_set():
+                    self._drop(name, zip_file)
+                    continue
+
+                try:
+                    return_code = uploader.upload(zip_file)
+                    if not return_code and self.journal:
+                        self.journal.record(name)
+
+                except Exception as err:  # pylint: disable=broad-except
+                    return_code = -1
+                    log.debug(err)
+
+                finally:
+                    zip_file.unlink(missing_ok=True)
+
+                if return_code:
+                    self.result.push_message(
+                        name,
+                        f"Uploading config file for '{name}' to '{self.name}' failed "
+                        f"({return_code})",
+                        level="error",
+                    )
+
+                else:
+                    self.result.push_message(
+                        name, f"Uploaded config file for '{name}' to '{self.name}'"
+                    )
+
+    def _drop(self, name: str, file: Path) -> None:
+        """
+        Drop a backup of a cancelled pipeline.
+
+        Args:
+            name: The name of the FortiGate (as defined in the inventory)
+            file: The configuration backup or its compressed file (which is removed)
+        """
+        if file.suffix == ".zip":
+            file.unlink(missing_ok=True)
+
+        self.result.push_message(
+            name, f"Uploading config file for '{name}' to '{self.name}' cancelled", level="error"
+        )
+
+
+def _load_checksum_index(backup_dir: Path) -> dict[str, Any]:
+    """
+    Load the checksum index of the incremental backup from the backup directory.
+
+    Args:
+        backup_dir: The directory with the backups
+
+    Returns:
+        The checksum index (empty if it does not exist or is invalid)
+    """
+    index_file = backup_dir / CHECKSUM_INDEX
+    try:
+        return dict(load_json_file(index_file) or {})
+
+    except (TypeError, ValueError):
+        log.warning("Checksum index '%s' is invalid and will be recreated", index_file)
+
+    return {}
+
+
+def _save_checksum_index(
+    backup_dir: Path, index: dict[str, Any], results: dict[str, dict[str, Any]]
+) -> None:
+    """
+    Update the checksum index of the incremental backup with the results of a backup run.
+
+    FortiGates without a config checksum in the results are removed from the index, so they are
+    downloaded again in the next run.
+
+    Args:
+        backup_dir: The directory with the backups
+        index:      The checksum index as it was loaded before the backup run
+        results:    The metadata of the successful backups
+    """
+    for name, metadata in results.items():
+        if metadata.get("config_checksum"):
+            index[name] = {
+                key: metadata[key]
+                for key in ("config_checksum", "config_version", "sha256", "size")
+                if key in metadata
+            }
+
+        else:
+            index.pop(name, None)
+
+    save_json_file(backup_dir / CHECKSUM_INDEX, index)
+
+
+def _get_config_checksum(name: str, fgt: FortiGate) -> str:
+    """
+    Get the configuration checksum of a FortiGate for the incremental backup.
+
+    Args:
+        name: The name of the FortiGate (as defined in the inventory)
+        fgt:  The FortiGate object to query
+
+    Returns:
+        The configuration checksum or an empty string if it is not available
+    """
+    try:
+        return fgt.get_config_checksum()
+
+    except (GeneralWarning, APIError) as err:
+        log.info("No config checksum for '%s', doing a full backup (%s)", name, err.message)
+
+    return ""
+
+
+def _check_backup(name: str, data: str, result: Result[str]) -> None:
+    """
+    Check if a configuration backup is valid and push the appropriate message to the result.
+
+    Args:
+        name:   The name of the FortiGate (as defined in the inventory)
+        data:   The configuration backup of the FortiGate
+        result: The Result object to push the message to
+    """
+    if data.startswith("#config-version"):
+        message = f"Config backup for '{name}' succeeded"
+        log.info(message)
+        result.push_message(name, message)
+
+    else:
+        data_json = json.loads(data)
+        message = f"Backup '{name}' failed with error '{data_json['http_status']}'"
+        log.error(message)
+        result.push_message(name, message, level="error")
@@ -2,20 +2,19 @@
 FortiGate check hamaster utility
 """
 
-import concurrent.futures
 import logging
-
-from rich.progress import Progress
+from typing import Any
 
 from fotoobo.fortinet.fortigate import FortiGate
 from fotoobo.helpers.config import config
+from fotoobo.helpers.fleet import FleetExecutor, run_async
 from fotoobo.helpers.result import Result
 from fotoobo.inventory import Inventory
 
 log = logging.getLogger("fotoobo")
 
 
-def hamaster(host: str) -> Result[str]:  # pylint: disable=too-many-locals
+def hamaster(host: str) -> Result[str]:
     """FortiGate check hamaster.
 
     This method first gets all the devices from a FortiManager to find all the managed FortiGates
@@ -46,16 +45,67 @@ def hamaster(host: str) -> Result[str]:  # pylint: disable=too-many-locals
             status: The HA status of the FortiGate (fgt)
         """
         response = fgt.api("get", "/monitor/system/ha-checksums")
-        ha_checksums = response.json()
-        status: str = "is not the expected master"
 
-        for node in ha_checksums["results"]:
-            if node["serial_no"] == ha_checksums["serial"]:
-                if node["is_root_master"] == 1:
-                    status = "ok"
+        return name, _get_ha_status(response.json())
+
+    result = Result[str]()
+    fgts = _get_ha_clusters(host, result)
+
+    return FleetExecutor().run(_get_single_status, fgts, result, "Getting FortiGate HA status...")
+
+
+async def hamaster_async(host: str, max_in_flight: int = 100) -> Result[str]:
+    """
+    Asynchronous FortiGate check hamaster.
+
+    This is the asyncio counterpart of hamaster().
 
-        return name, status
+    Args:
+        host:          The FortiManager host from the inventory to get the device list from. If
+                       you omit host, it will run over the default FortiManager (fmg).
+        max_in_flight: The maximum amount of FortiGates to query at the same time
 
+    Returns:
+        The Result object with all the results
+    """
+
+    async def _get_single_status(name: str, fgt: FortiGate) -> tuple[str, str]:
+        """Get the HA master status from a FortiGate.
+
+        Args:
+            name: The name of the FortiGate (as defined in the inventory)
+            fgt:  The FortiGate object to query
+
+        Returns:
+            name:   The name of the FortiGate (as defined in the inventory)
+            status: The HA status of the FortiGate (fgt)
+        """
+        response = await fgt.api_async("get", "/monitor/system/ha-checksums")
+
+        return name, _get_ha_status(response.json())
+
+    result = Result[str]()
+    fgts = _get_ha_clusters(host, result)
+
+    return await run_async(
+        _get_single_status, fgts, result, "Getting FortiGate HA status...", max_in_flight
+    )
+
+
+def _get_ha_clusters(host: str, result: Result[str]) -> dict[str, FortiGate]:
+    """
+    Get the designated HA master of every FortiGate cluster managed by a FortiManager.
+
+    Every designated master which is not defined in the inventory is pushed to the result as
+    "not found in inventory".
+
+    Args:
+        host:   The FortiManager host from the inventory to get the device list from
+        result: The Result object to push the missing FortiGates to
+
+    Returns:
+        The designated HA masters with their name as key
+    """
     inventory = Inventory(config.inventory_file)
     fmg = inventory.get_item(host, "fortimanager")
     payload = {
@@ -72,7 +122,6 @@ def hamaster(host: str) -> Result[str]:  # pylint: disable=too-many-locals
     fmg.login()
     response = fmg.api("post", payload=payload)
     fmg.logout()
-    result = Result[str]()
     fgts: dict[str, FortiGate] = {}
 
     for device in response.json()["result"][0]["data"]:
@@ -98,16 +147,24 @@ def hamaster(host: str) -> Result[str]:  # pylint: disable=too-many-locals
                 log.debug("Device '%s' not found in inventory", expected_master)
                 result.push_result(expected_master, "not found in inventory")
 
-    with Progress() as progress:
-        task = progress.add_task("Getting FortiGate HA status...", total=len(fgts))
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = []
-            for name, fgt in fgts.items():
-                futures.append(executor.submit(_get_single_status, name, fgt))
+    return fgts
+
+
+def _get_ha_status(ha_checksums: dict[str, Any]) -> str:
+    """
+    Evaluate the HA master status from the ha-checksums of a FortiGate.
+
+    Args:
+        ha_checksums: The response from the FortiGate endpoint /monitor/system/ha-checksums
+
+    Returns:
+        "ok" if the FortiGate is the root master or "is not the expected master" if not
+    """
+    status: str = "is not the expected master"
 
-            for future in concurrent.futures.as_completed(futures):
-                name, status = future.result()
-                result.push_result(name, status)
-                progress.update(task, advance=1)
+    for node in ha_checksums["results"]:
+        if node["serial_no"] == ha_checksums["serial"]:
+            if node["is_root_master"] == 1:
+                status = "ok"
 
-    return result
+    return status
@@ -2,9 +2,14 @@
 Testing the cli fgt get cmdb firewall.
 """
 
+from typing import Any
+
+from pytest import MonkeyPatch
 from typer.testing import CliRunner
 
 from fotoobo.cli.main import app
+from fotoobo.exceptions import APIError, GeneralError
+from fotoobo.fortinet.fortigate import FortiGate
 from tests.helper import parse_help_output
 
 runner = CliRunner()
@@ -47,7 +52,7 @@ def test_cli_app_fgt_get_cmdb_firewall_address_help(help_args: str) -> None:
     assert result.exit_code == 0
     arguments, options, commands = parse_help_output(result.stdout)
     assert set(arguments) == {"[host]", "[name]"}
-    assert options == {"-h", "--help", "-o", "--output", "--vdom"}
+    assert options == {"-f", "--fields", "-h", "--help", "-o", "--output", "--vdom"}
     assert not commands
 
 
@@ -67,7 +72,7 @@ def test_cli_app_fgt_get_cmdb_firewall_addrgrp_help(help_args: str) -> None:
     assert result.exit_code == 0
     arguments, options, commands = parse_help_output(result.stdout)
     assert set(arguments) == {"[host]", "[name]"}
-    assert options == {"-h", "--help", "-o", "--output", "--vdom"}
+    assert options == {"-f", "--fields", "-h", "--help", "-o", "--output", "--vdom"}
     assert not commands
 
 
@@ -87,7 +92,7 @@ def test_cli_app_fgt_get_cmdb_firewall_service_custom_help(help_args: str) -> No
     assert result.exit_code == 0
     arguments, options, commands = parse_help_output(result.stdout)
     assert set(arguments) == {"[host]", "[name]"}
-    assert options == {"-h", "--help", "-o", "--output", "--vdom"}
+    assert options == {"-f", "--fields", "-h", "--help", "-o", "--output", "--vdom"}
     assert not commands
 
 
@@ -107,5 +112,29 @@ def test_cli_app_fgt_get_cmdb_firewall_service_group_help(help_args: str) -> Non
     assert result.exit_code == 0
     arguments, options, commands = parse_help_output(result.stdout)
     assert set(arguments) == {"[host]", "[name]"}
-    assert options == {"-h", "--help", "-o", "--output", "--vdom"}
+    assert options == {"-f", "--fields", "-h", "--help", "-o", "--output", "--vdom"}
     assert not commands
+
+
+def test_cli_app_fgt_get_cmdb_firewall_address_wildcard_error(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test cli fgt get cmdb firewall address fails if any of several FortiGates failed.
+    """
+
+    # Arrange
+    def api_get_paged(self: FortiGate, **_: Any) -> list[tuple[str, Any]]:
+        if self.https_port == 111:
+            raise APIError("dummy")
+
+        return [("root", {"name": "dummy", "type": "ipmask", "subnet": "1.1.1.1 255.255.255.255"})]
+
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api_get_paged", api_get_paged)
+    args = ["-c", "tests/fotoobo.yaml", "fgt", "get", "cmdb", "firewall", "address", "test_fgt_*"]
+
+    # Act
+    result = runner.invoke(app, args)
+
+    # Assert
+    assert result.exit_code != 0
+    assert isinstance(result.exception, GeneralError)
+    assert "test_fgt_1" in result.exception.message
@@ -33,7 +33,7 @@ def test_cli_app_fgt_config_check_help(help_args_with_none: str) -> None:
     assert "Usage: root fgt config check" in result.stdout
     arguments, options, commands = parse_help_output(result.stdout)
     assert set(arguments) == {"[config]", "[bundles]"}
-    assert options == {"-h", "--help", "--smtp"}
+    assert options == {"-h", "--help", "-j", "--jobs", "--cache-dir", "--lazy", "--smtp"}
     assert not commands
 
 
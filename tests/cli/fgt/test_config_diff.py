@@ -0,0 +1,64 @@
+"""
+Testing the cli fgt config diff.
+"""
+
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from fotoobo.cli.main import app
+from tests.helper import parse_help_output
+
+runner = CliRunner()
+
+
+def test_cli_app_fgt_config_diff_help(help_args_with_none: str) -> None:
+    """
+    Test cli help for fgt config diff help.
+    """
+
+    # Arrange
+    args = ["-c", "tests/fotoobo.yaml", "fgt", "config", "diff"]
+    args.append(help_args_with_none)
+    args = list(filter(None, args))
+
+    # Act
+    result = runner.invoke(app, args)
+
+    # Assert
+    assert result.exit_code in [0, 2]
+    assert "Usage: root fgt config diff" in result.stdout
+    arguments, options, commands = parse_help_output(result.stdout)
+    assert set(arguments) == {"[old]", "[new]"}
+    assert options == {"-h", "--help", "-o", "--output", "-j", "--jobs", "--cache-dir"}
+    assert not commands
+
+
+def test_cli_app_fgt_config_diff(function_dir: Path) -> None:
+    """
+    Test fgt config diff.
+    """
+
+    # Arrange
+    new = function_dir / "new.conf"
+    config = Path("tests/data/fortigate_config_single.conf").read_text(encoding="UTF-8")
+    new.write_text(config.replace("value_2", "value_x"), encoding="UTF-8")
+
+    # Act
+    result = runner.invoke(
+        app,
+        [
+            "-c",
+            "tests/fotoobo.yaml",
+            "fgt",
+            "config",
+            "diff",
+            "tests/data/fortigate_config_single.conf",
+            str(new),
+        ],
+    )
+
+    # Assert
+    assert result.exit_code == 0
+    assert "changed" in result.stdout
+    assert "value_x" in result.stdout
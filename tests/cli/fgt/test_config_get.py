@@ -30,7 +30,7 @@ def test_cli_app_fgt_config_get_help(help_args_with_none: str) -> None:
     assert "Usage: root fgt config get" in result.stdout
     arguments, options, commands = parse_help_output(result.stdout)
     assert set(arguments) == {"[config]", "[scope]", "[path]"}
-    assert options == {"-h", "--help"}
+    assert options == {"-h", "--help", "-j", "--jobs", "--cache-dir", "--lazy"}
     assert not commands
 
 
@@ -30,7 +30,7 @@ def test_cli_app_fgt_config_info_help(help_args_with_none: str) -> None:
     assert "Usage: root fgt config info" in result.stdout
     arguments, options, commands = parse_help_output(result.stdout)
     assert set(arguments) == {"[config]"}
-    assert options == {"-h", "--help", "-l", "--list"}
+    assert options == {"-h", "--help", "-j", "--jobs", "--cache-dir", "--lazy", "-l", "--list"}
     assert not commands
 
 
@@ -9,7 +9,7 @@ from pytest import MonkeyPatch
 from typer.testing import CliRunner
 
 from fotoobo.cli.main import app
-from tests.helper import parse_help_output
+from tests.helper import parse_help_output, ResponseMock
 
 runner = CliRunner()
 
@@ -60,6 +60,12 @@ def test_cli_app_fgt_backup_help(help_args: str) -> None:
         "-f",
         "--smtp",
         "-s",
+        "--incremental",
+        "-i",
+        "--resume",
+        "-r",
+        "--journal",
+        "-j",
         "-h",
         "--help",
     }
@@ -73,8 +79,8 @@ def test_cli_app_fgt_backup_single(monkeypatch: MonkeyPatch, function_dir: Path)
 
     # Arrange
     monkeypatch.setattr(
-        "fotoobo.fortinet.fortigate.FortiGate.backup",
-        Mock(return_value="#config-version\ntest-1234"),
+        "fotoobo.fortinet.fortigate.FortiGate.api",
+        Mock(return_value=ResponseMock(chunks=[b"#config-version\ntest-1234"], status_code=200)),
     )
 
     # Act
@@ -84,7 +90,7 @@ def test_cli_app_fgt_backup_single(monkeypatch: MonkeyPatch, function_dir: Path)
 
     # Assert
     assert result.exit_code == 0
-    assert (function_dir / "test_fgt_1.conf").exists()
+    assert (function_dir / "test_fgt_1.conf").read_text() == "#config-version\ntest-1234"
     assert not (function_dir / "test_fgt_2.conf").exists()
 
 
@@ -95,8 +101,8 @@ def test_cli_app_fgt_backup_all(monkeypatch: MonkeyPatch, function_dir: Path) ->
 
     # Arrange
     monkeypatch.setattr(
-        "fotoobo.fortinet.fortigate.FortiGate.backup",
-        Mock(return_value="#config-version\ntest-1234"),
+        "fotoobo.fortinet.fortigate.FortiGate.api",
+        Mock(return_value=ResponseMock(chunks=[b"#config-version\ntest-1234"], status_code=200)),
     )
 
     # Act
@@ -86,6 +86,7 @@ def test_cli_app_help(help_args: str) -> None:
         "--show-completion",
         "-V",
         "--version",
+        "--workers",
     }
     assert set(commands) == {"convert", "ems", "faz", "cloud", "fgt", "fmg", "get"}
 
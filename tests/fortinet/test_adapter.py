@@ -0,0 +1,204 @@
+"""
+Test the FortinetAdapter class.
+"""
+
+import ssl
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+import requests
+import urllib3
+
+from fotoobo.fortinet.adapter import FortinetAdapter, get_ssl_context, ResumingSSLContext
+from fotoobo.fortinet.response import FortinetResponse
+
+
+@pytest.fixture(autouse=True)
+def reset_adapters() -> None:
+    """
+    Forget all the shared adapters before every test.
+    """
+
+    FortinetAdapter.reset_all()
+
+
+class TestFortinetAdapter:
+    """
+    Test the FortinetAdapter class.
+    """
+
+    @staticmethod
+    def test_init() -> None:
+        """
+        Test the pool settings are handed over to the pool manager.
+        """
+
+        # Act
+        adapter = FortinetAdapter(connections=2, maxsize=20, block=True)
+
+        # Assert
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 20
+        assert adapter.poolmanager.connection_pool_kw["block"] is True
+        assert adapter.poolmanager.pools._maxsize == 2  # pylint: disable=protected-access
+
+    @staticmethod
+    def test_get() -> None:
+        """
+        Test get returns the same adapter for the same host and port.
+        """
+
+        # Act
+        adapter = FortinetAdapter.get("host", 443, maxsize=20)
+
+        # Assert
+        assert FortinetAdapter.get("host", 443) is adapter
+        assert FortinetAdapter.get("host", 8443) is not adapter
+        assert FortinetAdapter.get("other_host", 443) is not adapter
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "pool, shared",
+        (
+            pytest.param({}, False, id="default"),
+            pytest.param({"maxsize": 5, "shared": False}, False, id="not shared"),
+            pytest.param({"maxsize": 5, "shared": True}, True, id="shared"),
+        ),
+    )
+    def test_from_config(pool: dict[str, int | bool], shared: bool) -> None:
+        """
+        Test from_config only returns the shared adapter if it is configured.
+        """
+
+        # Arrange
+        expected = dict(pool)
+
+        # Act
+        adapter = FortinetAdapter.from_config("host", 443, pool)
+
+        # Assert
+        assert (FortinetAdapter.get("host", 443) is adapter) is shared
+        assert pool == expected
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "verify, cert_reqs",
+        (
+            pytest.param(True, "CERT_REQUIRED", id="verify"),
+            pytest.param(False, "CERT_NONE", id="no verify"),
+        ),
+    )
+    def test_build_connection_pool_key_attributes(verify: bool, cert_reqs: str) -> None:
+        """
+        Test the shared SSLContext is used instead of the CA bundle.
+        """
+
+        # Arrange
+        request = requests.Request("GET", "https://host:8443/api").prepare()
+
+        # Act
+        host_params, pool_kwargs = FortinetAdapter().build_connection_pool_key_attributes(
+            request, verify
+        )
+
+        # Assert
+        assert host_params == {"scheme": "https", "host": "host", "port": 8443}
+        assert pool_kwargs == {"cert_reqs": cert_reqs, "ssl_context": get_ssl_context(verify)}
+
+    @staticmethod
+    def test_cert_verify() -> None:
+        """
+        Test the CA bundle is not handed over to the connection pool with the shared SSLContext.
+        """
+
+        # Arrange
+        conn = Mock(conn_kw={"ssl_context": get_ssl_context(True)})
+
+        # Act
+        FortinetAdapter().cert_verify(conn, "https://host/api", True, None)
+
+        # Assert
+        assert conn.cert_reqs == "CERT_REQUIRED"
+        assert conn.ca_certs is None
+        assert conn.ca_cert_dir is None
+
+    @staticmethod
+    def test_build_response() -> None:
+        """
+        Test the responses decode their JSON body only once.
+        """
+
+        # Arrange
+        request = requests.Request("GET", "https://host/api").prepare()
+        resp = urllib3.HTTPResponse(body=b"{}", status=200, reason="OK")
+
+        # Act
+        response = FortinetAdapter().build_response(request, resp)
+
+        # Assert
+        assert isinstance(response, FortinetResponse)
+        assert response.status_code == 200
+        assert response.url == "https://host/api"
+
+
+class TestSSLContext:
+    """
+    Test the shared SSLContext.
+    """
+
+    @staticmethod
+    def test_get_ssl_context() -> None:
+        """
+        Test there is only one SSLContext per ssl_verify value.
+        """
+
+        # Act
+        context = get_ssl_context(True)
+
+        # Assert
+        assert isinstance(context, ResumingSSLContext)
+        assert get_ssl_context(True) is context
+        assert get_ssl_context(False) is not context
+        assert context.verify_mode == ssl.CERT_REQUIRED
+        assert context.check_hostname is True
+
+    @staticmethod
+    def test_get_ssl_context_no_verify() -> None:
+        """
+        Test the SSLContext does not verify the certificates with ssl_verify False.
+        """
+
+        # Act
+        context = get_ssl_context(False)
+
+        # Assert
+        assert context.verify_mode == ssl.CERT_NONE
+        assert context.check_hostname is False
+
+    @staticmethod
+    def test_get_ssl_context_invalid_path(function_dir: Path) -> None:
+        """
+        Test get_ssl_context with a CA bundle which does not exist.
+        """
+
+        # Act & Assert
+        with pytest.raises(OSError):
+            get_ssl_context(str(function_dir / "missing.pem"))
+
+    @staticmethod
+    def test_session() -> None:
+        """
+        Test the TLS sessions are saved per server.
+        """
+
+        # Arrange
+        context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        session = Mock()
+
+        # Act
+        context.save_session("host", None)
+        context.save_session("host", session)
+
+        # Assert
+        assert context.get_session("host") is session
+        assert context.get_session("other_host") is None
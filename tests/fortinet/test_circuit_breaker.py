@@ -0,0 +1,158 @@
+"""
+Test the CircuitBreaker class.
+"""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from pytest import MonkeyPatch
+
+from fotoobo.exceptions import GeneralError
+from fotoobo.fortinet.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers() -> None:
+    """
+    Forget all the circuit breakers before every test.
+    """
+
+    CircuitBreaker.reset_all()
+
+
+class TestCircuitBreaker:
+    """
+    Test the CircuitBreaker class.
+    """
+
+    @staticmethod
+    def test_get() -> None:
+        """
+        Test get returns the same circuit breaker for the same hostname.
+        """
+
+        # Act
+        breaker = CircuitBreaker.get("host", threshold=2)
+
+        # Assert
+        assert CircuitBreaker.get("host") is breaker
+        assert CircuitBreaker.get("other_host") is not breaker
+        assert breaker.threshold == 2
+
+    @staticmethod
+    def test_disabled() -> None:
+        """
+        Test a circuit breaker with threshold 0 never opens.
+        """
+
+        # Arrange
+        breaker = CircuitBreaker("host")
+
+        # Act
+        for _ in range(10):
+            breaker.record_failure()
+
+        # Assert
+        breaker.before_request()
+        assert breaker.failures == 0
+
+    @staticmethod
+    def test_open_half_open_close(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the circuit opens after threshold failures and closes after a successful probe.
+        """
+
+        # Arrange
+        time_mock = Mock(return_value=1000.0)
+        monkeypatch.setattr("fotoobo.fortinet.circuit_breaker.time", time_mock)
+        breaker = CircuitBreaker("host", threshold=2, cooldown=60)
+
+        # Act & Assert
+        breaker.record_failure()
+        breaker.before_request()
+        breaker.record_failure()
+        with pytest.raises(GeneralError, match=r"Circuit open for 60s \(host\)"):
+            breaker.before_request()
+
+        # after the cool-down one single probe is allowed
+        time_mock.return_value = 1061.0
+        breaker.before_request()
+        with pytest.raises(GeneralError, match=r"Circuit open for 0s \(host\)"):
+            breaker.before_request()
+
+        # the probe succeeds
+        breaker.record_success()
+        breaker.before_request()
+        assert breaker.failures == 0
+
+    @staticmethod
+    def test_failed_probe(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the circuit opens again after a failed probe.
+        """
+
+        # Arrange
+        time_mock = Mock(return_value=1000.0)
+        monkeypatch.setattr("fotoobo.fortinet.circuit_breaker.time", time_mock)
+        breaker = CircuitBreaker("host", threshold=1, cooldown=60)
+        breaker.record_failure()
+        time_mock.return_value = 1061.0
+        breaker.before_request()
+
+        # Act
+        breaker.record_failure()
+
+        # Assert
+        with pytest.raises(GeneralError, match=r"Circuit open for 60s \(host\)"):
+            breaker.before_request()
+
+    @staticmethod
+    def test_persistence(function_dir: Path) -> None:
+        """
+        Test the state of the circuit breaker is persisted to the state file.
+        """
+
+        # Arrange
+        breaker = CircuitBreaker("host", threshold=1, state_path=str(function_dir))
+
+        # Act
+        breaker.record_failure()
+
+        # Assert
+        assert (function_dir / "host.circuit").is_file()
+        with pytest.raises(GeneralError, match=r"Circuit open"):
+            CircuitBreaker("host", threshold=1, state_path=str(function_dir)).before_request()
+
+        breaker.record_success()
+        CircuitBreaker("host", threshold=1, state_path=str(function_dir)).before_request()
+
+    @staticmethod
+    def test_persistence_invalid_file(function_dir: Path) -> None:
+        """
+        Test an invalid state file is ignored.
+        """
+
+        # Arrange
+        (function_dir / "host.circuit").write_text("invalid", encoding="UTF-8")
+
+        # Act
+        breaker = CircuitBreaker("host", threshold=1, state_path=str(function_dir))
+
+        # Assert
+        assert breaker.failures == 0
+
+    @staticmethod
+    def test_persistence_unable_to_save(function_dir: Path) -> None:
+        """
+        Test it is no error if the state file can not be written.
+        """
+
+        # Arrange
+        breaker = CircuitBreaker("host", threshold=1, state_path=str(function_dir / "missing"))
+
+        # Act
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.failures == 1
@@ -4,13 +4,18 @@ Test the FortiGate class.
 
 # mypy: disable-error-code=attr-defined
 
+import asyncio
+from pathlib import Path
+from typing import Any
 from unittest.mock import Mock
 
 import pytest
+import requests
 from pytest import MonkeyPatch
 
-from fotoobo.exceptions import GeneralWarning
+from fotoobo.exceptions import GeneralError, GeneralWarning
 from fotoobo.fortinet.fortigate import FortiGate
+from fotoobo.helpers.concurrency import clear_overload, overload_reported, report_overload
 from tests.helper import ResponseMock
 
 
@@ -19,6 +24,8 @@ class TestFortiGate:
     Test the FortiGate class.
     """
 
+    # pylint: disable=too-many-public-methods
+
     @staticmethod
     def test_init_no_hostname(monkeypatch: MonkeyPatch) -> None:
         """
@@ -52,7 +59,7 @@ class TestFortiGate:
         assert fortigate.api("get", "dummy").json() == {"key": "value"}
         assert fortigate.session.headers["Authorization"] == "Bearer token"
         api_mock.assert_called_with(
-            "get", "dummy", payload=None, params=None, timeout=None, headers=None
+            "get", "dummy", payload=None, params=None, timeout=None, headers=None, stream=False
         )
 
     def test_api_get(self, monkeypatch: MonkeyPatch) -> None:
@@ -75,6 +82,200 @@ class TestFortiGate:
             method="get", url="/test/dummy/fake", params={"vdom": "*"}, timeout=None
         )
 
+    @staticmethod
+    def test_api_get_fields(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the FortiGate api_get method with fields hands them over as 'format' parameter.
+        """
+
+        # Arrange
+        response_mock = ResponseMock(json={"results": [{"name": "dummy"}]}, status_code=200)
+        api_mock = Mock(return_value=response_mock)
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+        fortigate = FortiGate("dummy_hostname", "token")
+
+        # Act
+        fortigate.api_get("/test/dummy/fake", vdom="root", fields=["name", "type"])
+
+        # Assert
+        api_mock.assert_called_with(
+            method="get",
+            url="/test/dummy/fake",
+            params={"vdom": "root", "format": "name|type"},
+            timeout=None,
+        )
+
+    def test_api_get_async(self, monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the FortiGate api_get_async method.
+        """
+
+        # Arrange
+        response_mock = ResponseMock(json={"http_method": "GET", "results": []}, status_code=200)
+        api_mock = Mock(return_value=response_mock)
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+        fortigate = FortiGate("dummy_hostname", "token")
+
+        # Act
+        result = asyncio.run(fortigate.api_get_async("/test/dummy/fake", vdom="root"))
+
+        # Assert
+        assert result == [{"http_method": "GET", "results": []}]
+        api_mock.assert_called_with(
+            "get",
+            "/test/dummy/fake",
+            headers=None,
+            params={"vdom": "root"},
+            payload=None,
+            timeout=None,
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize("prefetch", (True, False))
+    def test_api_get_paged(prefetch: bool, monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the FortiGate api_get_paged method requests the pages of the unfinished VDOMs only.
+        """
+
+        # Arrange
+        pages = {
+            ("*", "0"): [
+                {"vdom": "root", "results": [{"name": "a"}, {"name": "b"}]},
+                {"vdom": "vdom_1", "results": [{"name": "c"}]},
+            ],
+            ("root", "2"): {"vdom": "root", "results": [{"name": "d"}, {"name": "e"}]},
+            ("root", "4"): {"vdom": "root", "results": []},
+        }
+
+        def api(params: dict[str, str], **_: Any) -> ResponseMock:
+            return ResponseMock(json=pages[(params["vdom"], params["start"])], status_code=200)
+
+        api_mock = Mock(side_effect=api)
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+        fortigate = FortiGate("dummy_hostname", "token")
+
+        # Act
+        result = list(fortigate.api_get_paged("/test/dummy/fake", page_size=2, prefetch=prefetch))
+
+        # Assert
+        assert result == [
+            ("root", {"name": "a"}),
+            ("root", {"name": "b"}),
+            ("vdom_1", {"name": "c"}),
+            ("root", {"name": "d"}),
+            ("root", {"name": "e"}),
+        ]
+        assert api_mock.call_count == 3
+        api_mock.assert_called_with(
+            method="get",
+            url="/test/dummy/fake",
+            params={"vdom": "root", "start": "4", "count": "2"},
+            timeout=None,
+        )
+
+    @staticmethod
+    def test_api_get_paged_close(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the FortiGate api_get_paged method stops requesting pages if it is closed early.
+        """
+
+        # Arrange
+        page = {"vdom": "root", "results": [{"name": "a"}, {"name": "b"}]}
+        api_mock = Mock(return_value=ResponseMock(json=page, status_code=200))
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+        fortigate = FortiGate("dummy_hostname", "token")
+
+        # Act
+        entries = fortigate.api_get_paged("/test/dummy/fake", page_size=2, prefetch=False)
+        first = next(entries)
+        entries.close()
+
+        # Assert
+        assert first == ("root", {"name": "a"})
+        assert api_mock.call_count == 1
+
+    @staticmethod
+    def test_api_get_paged_ignored(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the FortiGate api_get_paged method stops if the paging is ignored by the endpoint.
+        """
+
+        # Arrange
+        page = {"vdom": "root", "results": [{"name": "a"}, {"name": "b"}, {"name": "c"}]}
+        api_mock = Mock(return_value=ResponseMock(json=page, status_code=200))
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+        fortigate = FortiGate("dummy_hostname", "token")
+
+        # Act
+        result = list(fortigate.api_get_paged("/test/dummy/fake", page_size=2))
+
+        # Assert
+        assert result == [("root", {"name": "a"}), ("root", {"name": "b"}), ("root", {"name": "c"})]
+        assert api_mock.call_count == 1
+
+    @staticmethod
+    @pytest.mark.parametrize("prefetch", (True, False))
+    def test_api_get_paged_repeated(prefetch: bool, monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the FortiGate api_get_paged method stops if the endpoint repeats a full page.
+        """
+
+        # Arrange
+        page = {"vdom": "root", "results": [{"name": "a"}, {"name": "b"}]}
+        api_mock = Mock(return_value=ResponseMock(json=page, status_code=200))
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+        fortigate = FortiGate("dummy_hostname", "token")
+
+        # Act
+        result = list(fortigate.api_get_paged("/test/dummy/fake", page_size=2, prefetch=prefetch))
+
+        # Assert
+        assert result == [("root", {"name": "a"}), ("root", {"name": "b"})]
+        assert api_mock.call_count == 2
+
+    @staticmethod
+    def test_api_get_paged_prefetch_overload(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the overload reported while prefetching a page is handed over to the calling thread.
+        """
+
+        # Arrange
+        pages = {
+            "0": {"vdom": "root", "results": [{"name": "a"}, {"name": "b"}]},
+            "2": {"vdom": "root", "results": []},
+        }
+
+        def api(params: dict[str, str], **_: Any) -> ResponseMock:
+            if params["start"] == "2":
+                report_overload()
+
+            return ResponseMock(json=pages[params["start"]], status_code=200)
+
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", Mock(side_effect=api))
+        fortigate = FortiGate("dummy_hostname", "token")
+        clear_overload()
+
+        # Act
+        result = list(fortigate.api_get_paged("/test/dummy/fake", page_size=2))
+
+        # Assert
+        assert len(result) == 2
+        assert overload_reported()
+        clear_overload()
+
+    @staticmethod
+    def test_api_get_paged_invalid_page_size() -> None:
+        """
+        Test the FortiGate api_get_paged method with an invalid page size.
+        """
+
+        # Arrange
+        fortigate = FortiGate("dummy_hostname", "token")
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match="The page size has to be at least 1"):
+            next(fortigate.api_get_paged("/test/dummy/fake", page_size=0))
+
     @staticmethod
     def test_backup(monkeypatch: MonkeyPatch) -> None:
         """
@@ -91,6 +292,151 @@ class TestFortiGate:
             "get", "monitor/system/config/backup", params={"scope": "global"}, timeout=66
         )
 
+    @staticmethod
+    def test_backup_to_file(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+        """
+        Test the FortiGate backup_to_file method.
+        """
+
+        # Arrange
+        response = ResponseMock(chunks=[b"#con", b"fig-version=FGT\nconfig", b" end\n"])
+        api_mock = Mock(return_value=response)
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+        file = function_dir / "fgt.conf"
+
+        # Act
+        metadata = FortiGate("dummy_hostname", "").backup_to_file(file, timeout=66)
+
+        # Assert
+        assert file.read_text() == "#config-version=FGT\nconfig end\n"
+        assert metadata == {
+            "config_version": "#config-version=FGT",
+            "file": str(file),
+            "sha256": "66ccde5e48b895df4c2ab9a23e24c7b10d42b5ee0b2aa8c70442de12d9576b72",
+            "size": 31,
+        }
+        assert not list(function_dir.glob("*.part"))
+        response.close.assert_called_once()
+        api_mock.assert_called_with(
+            "get",
+            "monitor/system/config/backup",
+            params={"scope": "global"},
+            timeout=66,
+            stream=True,
+        )
+
+    @staticmethod
+    def test_backup_to_file_invalid(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+        """
+        Test the FortiGate backup_to_file method with an invalid configuration backup.
+        """
+
+        # Arrange
+        response = ResponseMock(chunks=[b'{"http_status": ', b"403}"])
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", Mock(return_value=response))
+        file = function_dir / "fgt.conf"
+
+        # Act & Assert
+        with pytest.raises(GeneralWarning, match=r"Backup failed with error '403' \(dummy\)"):
+            FortiGate("dummy", "").backup_to_file(file)
+
+        assert not list(function_dir.iterdir())
+        response.close.assert_called_once()
+
+    @staticmethod
+    def test_backup_to_file_interrupted(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+        """
+        Test the FortiGate backup_to_file method with an interrupted download.
+        """
+
+        # Arrange
+        def _chunks(**_: int) -> Any:
+            yield b"#config-version=FGT\n"
+            raise requests.exceptions.ChunkedEncodingError()
+
+        response = ResponseMock()
+        response.iter_content = Mock(side_effect=_chunks)
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", Mock(return_value=response))
+
+        # Act & Assert
+        with pytest.raises(GeneralWarning, match=r"Backup download interrupted \(dummy\)"):
+            FortiGate("dummy", "").backup_to_file(function_dir / "fgt.conf")
+
+        assert not list(function_dir.iterdir())
+
+    @staticmethod
+    def test_backup_async(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the FortiGate backup_async method.
+        """
+
+        # Arrange
+        api_mock = Mock(return_value=ResponseMock(text="Dummy Backup Data", status_code=200))
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+
+        # Act
+        data = asyncio.run(FortiGate("dummy_hostname", "").backup_async(timeout=66))
+
+        # Assert
+        assert data == "Dummy Backup Data"
+        api_mock.assert_called_with(
+            "get",
+            "monitor/system/config/backup",
+            headers=None,
+            params={"scope": "global"},
+            payload=None,
+            timeout=66,
+        )
+
+    @staticmethod
+    def test_get_config_checksum(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test get_config_checksum returns the checksum of the FortiGate itself.
+        """
+
+        # Arrange
+        response = {
+            "serial": "FGT2",
+            "results": [
+                {"serial_no": "FGT1", "checksum": {"all": "peer"}},
+                {"serial_no": "FGT2", "checksum": {"all": "own"}},
+            ],
+        }
+        api_mock = Mock(return_value=ResponseMock(json=response, status_code=200))
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+
+        # Act & Assert
+        assert FortiGate("dummy_hostname", "").get_config_checksum() == "own"
+        api_mock.assert_called_with("get", "monitor/system/ha-checksums")
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "response",
+        (
+            pytest.param({"serial": "FGT1", "results": []}, id="no results"),
+            pytest.param(
+                {"serial": "FGT1", "results": [{"serial_no": "FGT2", "checksum": {"all": "x"}}]},
+                id="other serial",
+            ),
+        ),
+    )
+    def test_get_config_checksum_missing(
+        response: dict[str, Any], monkeypatch: MonkeyPatch
+    ) -> None:
+        """
+        Test get_config_checksum if the FortiGate returns no checksum for itself.
+        """
+
+        # Arrange
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortigate.FortiGate.api",
+            Mock(return_value=ResponseMock(json=response, status_code=200)),
+        )
+
+        # Act & Assert
+        with pytest.raises(GeneralWarning, match="returned no config checksum"):
+            FortiGate("dummy_hostname", "").get_config_checksum()
+
     @staticmethod
     @pytest.mark.parametrize(
         "response, expected",
@@ -130,3 +476,32 @@ class TestFortiGate:
         with pytest.raises(GeneralWarning) as err:
             FortiGate("dummy_hostname", "").get_version()
         assert "HTTP/404 Resource Not Found" in str(err.value)
+
+    @staticmethod
+    def test_get_version_async(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test get version async.
+        """
+
+        # Arrange
+        api_mock = Mock(return_value=ResponseMock(json={"version": "v1.1.1"}, status_code=200))
+        monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+
+        # Act & Assert
+        assert asyncio.run(FortiGate("dummy_hostname", "").get_version_async()) == "v1.1.1"
+
+    @staticmethod
+    def test_get_version_async_api_http_error(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test get version async with http error.
+        """
+
+        # Arrange
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortinet.requests.Session.get",
+            Mock(return_value=ResponseMock(json={"dummy": "dummy"}, status_code=404)),
+        )
+
+        # Act & Assert
+        with pytest.raises(GeneralWarning, match="HTTP/404 Resource Not Found"):
+            asyncio.run(FortiGate("dummy_hostname", "").get_version_async())
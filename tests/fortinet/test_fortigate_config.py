@@ -2,12 +2,15 @@
 Test the FortiGate config class.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
+from unittest.mock import Mock
 
 import pytest
 
 from fotoobo.fortinet.fortigate_config import FortiGateConfig
+from fotoobo.helpers.files import file_to_zip
 
 
 @pytest.fixture
@@ -84,7 +87,6 @@ class TestFortiGateConfigGeneral:
         """
 
         # Arrange
-        FortiGateConfig._config_path = []  # only needed as long as _config_path is not thread-safe
 
         # Act
         with conf_file_empty.open(encoding="UTF-8") as forti_file:
@@ -93,6 +95,48 @@ class TestFortiGateConfigGeneral:
         # Assert
         assert not config
 
+    @staticmethod
+    def test_parse_to_dict_unclosed() -> None:
+        """
+        Test the _parse_to_dict method with sections which are not closed at the end of the file.
+        """
+
+        # Arrange
+        lines = [
+            "config leaf_1",
+            "set option_1 value_1",
+            "config leaf_2 leaf_3",
+            "edit 1",
+            "set a b",
+        ]
+
+        # Act
+        config = FortiGateConfig._parse_to_dict(lines)
+
+        # Assert
+        assert config == {
+            "leaf_1": {"option_1": "value_1", "leaf_2": {"leaf_3": {"1": {"a": "b"}}}}
+        }
+
+    @staticmethod
+    def test_parse_configuration_file_threads(conf_file_single: Path, conf_file_vdom: Path) -> None:
+        """
+        Test several configuration files may be parsed at the same time in different threads.
+        """
+
+        # Arrange
+        files = [conf_file_single, conf_file_vdom] * 8
+        expected = [FortiGateConfig.parse_configuration_file(file).__dict__ for file in files[:2]]
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            configs = list(executor.map(FortiGateConfig.parse_configuration_file, files))
+
+        # Assert
+        for index, config in enumerate(configs):
+            assert config.global_config == expected[index % 2]["global_config"]
+            assert config.vdom_config == expected[index % 2]["vdom_config"]
+
 
 class TestFortiGateConfigSingle:
     """
@@ -187,7 +231,6 @@ class TestFortiGateConfigSingle:
         """
 
         # Arrange
-        FortiGateConfig._config_path = []  # only needed as long as _config_path is not thread-safe
 
         # Act
         with conf_file_single.open(encoding="UTF-8") as forti_file:
@@ -253,7 +296,7 @@ class TestFortiGateConfigVDOM:
     Test the FortiGateConfig class with a dummy config which has VDOMs in it.
     """
 
-    # pylint: disable=protected-access, redefined-outer-name
+    # pylint: disable=protected-access, redefined-outer-name, too-many-public-methods
 
     @staticmethod
     def test_fortigate_config_class_instantiation() -> None:
@@ -354,7 +397,6 @@ class TestFortiGateConfigVDOM:
         """
 
         # Arrange
-        FortiGateConfig._config_path = []  # only needed as long as _config_path is not thread-safe
 
         # Act
         with conf_file_vdom.open(encoding="UTF-8") as forti_file:
@@ -475,3 +517,262 @@ class TestFortiGateConfigVDOM:
         assert config.get_configuration("vdom", "/root/leaf_1/option_1") == "value_1"
         assert config.get_configuration("vdom", "/vdom_n/leaf_n/option_n") == "value_n"
         assert config.get_configuration("vdom", "/vdom_z/leaf_z/option_z") == "value_z"
+        assert config.get_configuration("vdom", "/root/leaf_81/leaf_82/2") == {
+            "option_1": "value_1",
+            "id": 2,
+        }
+        assert config.get_configuration("vdom", "/root/leaf_81/leaf_82/2/option_1") == "value_1"
+        assert not config.get_configuration("vdom", "/root/leaf_81/leaf_82/3")
+        assert not config.get_configuration("vdom", "/root/leaf_1/option_1/value_1")
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "scope, path",
+        (
+            pytest.param("global", "/", id="global"),
+            pytest.param("global", "", id="global empty"),
+            pytest.param("global", "/system/global/option_1", id="global option"),
+            pytest.param("global", "/system/global//option_1/", id="global not normalized"),
+            pytest.param("global", "/system/not/option_1", id="global not"),
+            pytest.param("vdom", "/", id="vdom"),
+            pytest.param("vdom", "/root/leaf_1/option_1", id="vdom option"),
+            pytest.param("vdom", "/vdom_n/leaf_n/option_n", id="vdom other"),
+            pytest.param("vdom", "/root/not/option_1", id="vdom not"),
+            pytest.param("invalid", "/", id="invalid scope"),
+        ),
+    )
+    def test_enable_index(conf_file_vdom: Path, scope: str, path: str) -> None:
+        """
+        Test get_configuration returns the same with and without the path index.
+        """
+
+        # Arrange
+        expected = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        config = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+
+        # Act
+        config.enable_index()
+
+        # Assert
+        assert config.get_configuration(scope, path) == expected.get_configuration(scope, path)
+        assert config.get_configuration(scope, path) == expected.get_configuration(scope, path)
+
+    @staticmethod
+    def test_enable_index_memoized(conf_file_vdom: Path) -> None:
+        """
+        Test the lookups are memoized once the path index is enabled.
+        """
+
+        # Arrange
+        config = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        config.enable_index()
+        first = config.get_configuration("vdom", "/root/leaf_1")
+
+        # Act
+        config.vdom_config = {}
+        second = config.get_configuration("vdom", "/root/leaf_1")
+
+        # Assert
+        assert second is first
+        assert config.get_configuration("vdom", "/root/leaf_1/option_1") == "value_1"
+
+    @staticmethod
+    def test_enable_index_missing(conf_file_vdom: Path) -> None:
+        """
+        Test a memoized missing path gives a new empty dict on every lookup.
+        """
+
+        # Arrange
+        config = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        config.enable_index()
+        first = config.get_configuration("vdom", "/root/dummy")
+
+        # Act
+        first["dummy"] = "dummy"
+        second = config.get_configuration("vdom", "/root/dummy")
+
+        # Assert
+        assert second == {}
+        assert second is not first
+
+    @staticmethod
+    def test_enable_index_lazy(conf_file_vdom: Path) -> None:
+        """
+        Test the path index is only filled with the sections walked through by the lookups.
+        """
+
+        # Arrange
+        config = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+
+        # Act
+        config.enable_index()
+        config.get_configuration("vdom", "/root/leaf_1/option_1")
+
+        # Assert
+        assert set(config._index or {}) == {  # pylint: disable=protected-access
+            ("vdom", ("root",)),
+            ("vdom", ("root", "leaf_1")),
+        }
+
+    @staticmethod
+    def test_compact(conf_file_vdom: Path, function_dir: Path) -> None:
+        """
+        Test a compact configuration has the same content and saves plain json.
+        """
+
+        # Arrange
+        expected = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        config = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        config.enable_index()
+
+        # Act
+        config.compact()
+
+        # Assert
+        assert not isinstance(config.get_configuration("global", "/system/global"), dict)
+        assert config.global_config == expected.global_config
+        assert config.vdom_config == expected.vdom_config
+        assert config.get_configuration("vdom", "/root/leaf_1/option_1") == "value_1"
+        config.save_configuration_file(function_dir / "config.json")
+        loaded = FortiGateConfig.load_configuration_file(function_dir / "config.json")
+        assert loaded.global_config == expected.global_config
+        assert loaded.vdom_config == expected.vdom_config
+
+    @staticmethod
+    def test_parse_configuration_file_archive(conf_file_vdom: Path, function_dir: Path) -> None:
+        """
+        Test parsing a compressed configuration file.
+        """
+
+        # Arrange
+        expected = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        file_to_zip(conf_file_vdom, function_dir / "fortigate.conf.zip")
+
+        # Act
+        config = FortiGateConfig.parse_configuration_file(function_dir / "fortigate.conf.zip")
+
+        # Assert
+        assert config.global_config == expected.global_config
+        assert config.vdom_config == expected.vdom_config
+        assert config.info.__dict__ == expected.info.__dict__
+
+    @staticmethod
+    def test_diff() -> None:
+        """
+        Test the structural diff of two configurations.
+        """
+
+        # Arrange
+        old = FortiGateConfig(
+            {"system": {"global": {"hostname": "fgt", "option_1": "value_1"}}},
+            {
+                "root": {
+                    "policy": [{"id": 1, "action": "accept"}, {"id": 2, "action": "deny"}],
+                    "leaf_1": {"option_1": "value_1"},
+                },
+                "vdom_1": {"leaf_1": {"option_1": "value_1"}},
+            },
+        )
+        new = FortiGateConfig(
+            {"system": {"global": {"hostname": "fgt", "option_2": "value_2"}}},
+            {
+                "root": {
+                    "policy": [{"id": 2, "action": "accept"}, {"id": 3, "action": "deny"}],
+                    "leaf_1": ["value_1"],
+                },
+                "vdom_2": {"leaf_1": {"option_1": "value_1"}},
+            },
+        )
+
+        # Act
+        deltas = old.diff(new)
+
+        # Assert
+        assert deltas == [
+            {
+                "scope": "global",
+                "path": "/system/global/option_1",
+                "type": "removed",
+                "old": "value_1",
+            },
+            {
+                "scope": "global",
+                "path": "/system/global/option_2",
+                "type": "added",
+                "new": "value_2",
+            },
+            {
+                "scope": "vdom",
+                "path": "/root/policy/1",
+                "type": "removed",
+                "old": {"id": 1, "action": "accept"},
+            },
+            {
+                "scope": "vdom",
+                "path": "/root/policy/2/action",
+                "type": "changed",
+                "old": "deny",
+                "new": "accept",
+            },
+            {
+                "scope": "vdom",
+                "path": "/root/policy/3",
+                "type": "added",
+                "new": {"id": 3, "action": "deny"},
+            },
+            {
+                "scope": "vdom",
+                "path": "/root/leaf_1",
+                "type": "changed",
+                "old": {"option_1": "value_1"},
+                "new": ["value_1"],
+            },
+            {
+                "scope": "vdom",
+                "path": "/vdom_1",
+                "type": "removed",
+                "old": {"leaf_1": {"option_1": "value_1"}},
+            },
+            {
+                "scope": "vdom",
+                "path": "/vdom_2",
+                "type": "added",
+                "new": {"leaf_1": {"option_1": "value_1"}},
+            },
+        ]
+        for delta in deltas:
+            if "old" in delta:
+                assert old.get_configuration(delta["scope"], delta["path"]) == delta["old"]
+
+            if "new" in delta:
+                assert new.get_configuration(delta["scope"], delta["path"]) == delta["new"]
+
+        assert new.get_configuration("vdom", "/root/leaf_1/0") == "value_1"
+
+    @staticmethod
+    def test_diff_unchanged(conf_file_vdom: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """
+        Test the unchanged sections are skipped by their digest (also in a compact configuration).
+        """
+
+        # Arrange
+        old = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        new = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        new.compact()
+        new.vdom_config["vdom_z"] = {**new.vdom_config["vdom_z"], "leaf_x": {"option_x": "value_x"}}
+        diff_children = Mock(wraps=FortiGateConfig._diff_children)
+        monkeypatch.setattr(FortiGateConfig, "_diff_children", diff_children)
+
+        # Act
+        deltas = old.diff(new)
+
+        # Assert
+        assert deltas == [
+            {
+                "scope": "vdom",
+                "path": "/vdom_z/leaf_x",
+                "type": "added",
+                "new": {"option_x": "value_x"},
+            }
+        ]
+        assert diff_children.call_count == 2
@@ -0,0 +1,163 @@
+"""
+Test the FortiGateConfigCache class.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from unittest.mock import Mock
+
+from pytest import MonkeyPatch
+
+from fotoobo.fortinet.fortigate_config import FortiGateConfig
+from fotoobo.fortinet.fortigate_config_cache import FortiGateConfigCache
+
+
+class TestFortiGateConfigCache:
+    """
+    Test the FortiGateConfigCache class.
+    """
+
+    @staticmethod
+    def test_get(function_dir: Path, monkeypatch: MonkeyPatch) -> None:
+        """
+        Test a configuration file is only parsed once.
+        """
+
+        # Arrange
+        file = Path("tests/data/fortigate_config_vdom.conf")
+        expected = FortiGateConfig.parse_configuration_file(file)
+        parse_mock = Mock(wraps=FortiGateConfig.parse_configuration_file)
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortigate_config.FortiGateConfig.parse_configuration_file", parse_mock
+        )
+        cache = FortiGateConfigCache(function_dir / "cache")
+
+        # Act
+        first = cache.get(file)
+        second = FortiGateConfigCache(function_dir / "cache").get(file)
+
+        # Assert
+        parse_mock.assert_called_once_with(file)
+        assert len(list((function_dir / "cache").iterdir())) == 1
+        for config in (first, second):
+            assert config.global_config == expected.global_config
+            assert config.vdom_config == expected.vdom_config
+            assert config.info.__dict__ == expected.info.__dict__
+
+    @staticmethod
+    def test_get_changed(function_dir: Path) -> None:
+        """
+        Test a changed configuration file is parsed again.
+        """
+
+        # Arrange
+        file = function_dir / "fortigate.conf"
+        shutil.copy(Path("tests/data/fortigate_config_single.conf"), file)
+        cache = FortiGateConfigCache(function_dir / "cache")
+        cache.get(file)
+        file.write_text(file.read_text().replace("#buildno=8303", "#buildno=1234"))
+
+        # Act
+        config = cache.get(file)
+
+        # Assert
+        assert config.info.buildno == "1234"
+        assert len(list((function_dir / "cache").iterdir())) == 2
+
+    @staticmethod
+    def test_get_invalid_entry(function_dir: Path) -> None:
+        """
+        Test an invalid cache entry is replaced.
+        """
+
+        # Arrange
+        file = Path("tests/data/fortigate_config_single.conf")
+        cache = FortiGateConfigCache(function_dir / "cache")
+        cache.get(file)
+        entry = next((function_dir / "cache").iterdir())
+        entry.write_bytes(b"invalid")
+
+        # Act
+        config = cache.get(file)
+
+        # Assert
+        assert config.info.buildno == "8303"
+        assert entry.read_bytes() != b"invalid"
+
+    @staticmethod
+    def test_get_unreadable_entry(function_dir: Path) -> None:
+        """
+        Test a cache entry which cannot be read is a cache miss.
+        """
+
+        # Arrange
+        file = Path("tests/data/fortigate_config_single.conf")
+        cache = FortiGateConfigCache(function_dir / "cache")
+        cache.get(file)
+        entry = next((function_dir / "cache").iterdir())
+        entry.unlink()
+        entry.mkdir()
+
+        # Act
+        config = cache.get(file)
+
+        # Assert
+        assert config.info.buildno == "8303"
+
+    @staticmethod
+    def test_get_other_version(function_dir: Path, monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the cache entries of another fotoobo or Python version are not used.
+        """
+
+        # Arrange
+        file = Path("tests/data/fortigate_config_single.conf")
+        FortiGateConfigCache(function_dir / "cache").get(file)
+        monkeypatch.setattr("fotoobo.fortinet.fortigate_config_cache.CACHE_VERSION", "0.0.0-py3.0")
+        parse_mock = Mock(wraps=FortiGateConfig.parse_configuration_file)
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortigate_config.FortiGateConfig.parse_configuration_file", parse_mock
+        )
+
+        # Act
+        FortiGateConfigCache(function_dir / "cache").get(file)
+
+        # Assert
+        parse_mock.assert_called_once_with(file)
+        assert len(list((function_dir / "cache").iterdir())) == 2
+
+    @staticmethod
+    def test_evict(function_dir: Path) -> None:
+        """
+        Test the least recently used entries are evicted first.
+        """
+
+        # Arrange
+        cache = FortiGateConfigCache(function_dir / "cache")
+        for number in range(3):
+            entry = function_dir / "cache" / f"{number}.marshal"
+            entry.write_bytes(b"x" * 100)
+            os.utime(entry, (number, number))
+
+        cache.max_size = 150
+
+        # Act
+        removed = cache.evict()
+
+        # Assert
+        assert removed == 2
+        assert [entry.name for entry in (function_dir / "cache").iterdir()] == ["2.marshal"]
+
+    @staticmethod
+    def test_max_size(function_dir: Path, monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the maximum size is taken from the argument or else from the configuration.
+        """
+
+        # Arrange
+        monkeypatch.setattr("fotoobo.helpers.config.config.config_cache", {"max_size": 2})
+
+        # Act & Assert
+        assert FortiGateConfigCache(function_dir).max_size == 2 * 1024 * 1024
+        assert FortiGateConfigCache(function_dir, max_size=100).max_size == 100
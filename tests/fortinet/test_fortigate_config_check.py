@@ -91,6 +91,41 @@ class TestFortiGateConfigCheck:
         # Assert
         assert len(result.get_messages(config.info.hostname)) == 2
 
+    @staticmethod
+    def test_check_config_keeps_config(conf_file_vdom: Path, checks_file: Path) -> None:
+        """
+        Test the configuration check does not enable the path index of the configuration.
+        """
+
+        # Arrange
+        result = Result[Any]()
+        config = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        conf_check = FortiGateConfigCheck(config, load_yaml_file(checks_file), result)
+
+        # Act
+        conf_check.execute_checks()
+
+        # Assert
+        assert config._index is None  # pylint: disable=protected-access
+
+    @staticmethod
+    def test_check_config_vdom_compact(conf_file_vdom: Path, checks_file: Path) -> None:
+        """
+        Do a configuration check with a compact multiple VDOM FortiGate configuration.
+        """
+
+        # Arrange
+        result = Result[Any]()
+        config = FortiGateConfig.parse_configuration_file(conf_file_vdom)
+        config.compact()
+        conf_check = FortiGateConfigCheck(config, load_yaml_file(checks_file), result)
+
+        # Act
+        conf_check.execute_checks()
+
+        # Assert
+        assert len(result.get_messages(config.info.hostname)) == 2
+
     # start generic tests for config_check with invalid check definition
 
     @staticmethod
@@ -0,0 +1,134 @@
+"""
+Test the LazyFortiGateConfig class.
+"""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from pytest import MonkeyPatch
+
+from fotoobo.exceptions import GeneralWarning
+from fotoobo.fortinet.fortigate_config import FortiGateConfig
+from fotoobo.fortinet.fortigate_config_lazy import LazyFortiGateConfig
+
+
+class TestLazyFortiGateConfig:
+    """
+    Test the LazyFortiGateConfig class.
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "file",
+        (
+            pytest.param(Path("tests/data/fortigate_config_single.conf"), id="single"),
+            pytest.param(Path("tests/data/fortigate_config_vdom.conf"), id="vdom"),
+        ),
+    )
+    @pytest.mark.parametrize(
+        "scope, path",
+        (
+            pytest.param("global", "/", id="global"),
+            pytest.param("global", "/system/global", id="global system global"),
+            pytest.param("global", "/system/global/hostname", id="global hostname"),
+            pytest.param("global", "/system", id="global system"),
+            pytest.param("global", "/nonexisting", id="global nonexisting"),
+            pytest.param("vdom", "/", id="vdom"),
+            pytest.param("vdom", "/root", id="vdom root"),
+            pytest.param("vdom", "/root/firewall/address", id="vdom firewall address"),
+            pytest.param("vdom", "/*/system/settings", id="vdom wildcard"),
+            pytest.param("vdom", "/nonexisting/system", id="vdom nonexisting"),
+        ),
+    )
+    def test_get_configuration(file: Path, scope: str, path: str) -> None:
+        """
+        Test get_configuration returns the same as with a fully parsed configuration.
+        """
+
+        # Arrange
+        expected = FortiGateConfig.parse_configuration_file(file)
+
+        # Act
+        config = LazyFortiGateConfig(file)
+
+        # Assert
+        assert config.info.__dict__ == expected.info.__dict__
+        assert config.get_vdoms() == expected.get_vdoms()
+        assert config.get_configuration(scope, path) == expected.get_configuration(scope, path)
+
+    @staticmethod
+    def test_get_configuration_parses_needed_sections(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test only the sections needed for a path are parsed (and only once).
+        """
+
+        # Arrange
+        file = Path("tests/data/fortigate_config_vdom.conf")
+        config = LazyFortiGateConfig(file)
+        config.get_configuration("global", "/system/global")
+        parse_mock = Mock(wraps=config._parse_to_dict)  # pylint: disable=protected-access
+        monkeypatch.setattr(config, "_parse_to_dict", parse_mock)
+
+        # Act
+        config.get_configuration("global", "/system/global/timezone")
+
+        # Assert
+        assert "system" in config.global_config
+        assert list(config.global_config["system"]) == ["global"]
+        assert config.vdom_config == {vdom: {} for vdom in config.get_vdoms()}
+        parse_mock.assert_not_called()
+
+    @staticmethod
+    def test_save_configuration_file(function_dir: Path) -> None:
+        """
+        Test saving a lazy configuration saves the whole configuration.
+        """
+
+        # Arrange
+        file = Path("tests/data/fortigate_config_vdom.conf")
+        expected = FortiGateConfig.parse_configuration_file(file)
+
+        # Act
+        LazyFortiGateConfig(file).save_configuration_file(function_dir / "config.json")
+
+        # Assert
+        config = FortiGateConfig.load_configuration_file(function_dir / "config.json")
+        assert config.global_config == expected.global_config
+        assert config.vdom_config == expected.vdom_config
+
+    @staticmethod
+    def test_empty_file(function_dir: Path) -> None:
+        """
+        Test an empty configuration file.
+        """
+
+        # Arrange
+        file = function_dir / "empty.conf"
+        file.touch()
+
+        # Act & Assert
+        with pytest.raises(GeneralWarning, match=r"There is no info in"):
+            LazyFortiGateConfig(file)
+
+    @staticmethod
+    def test_enable_index() -> None:
+        """
+        Test enabling the path index does not parse the sections.
+        """
+
+        # Arrange
+        file = Path("tests/data/fortigate_config_vdom.conf")
+        expected = FortiGateConfig.parse_configuration_file(file)
+        config = LazyFortiGateConfig(file)
+
+        # Act
+        config.enable_index()
+
+        # Assert
+        assert list(config.global_config["system"]) == ["global"]
+        for _ in range(2):
+            assert config.get_configuration("vdom", "/root/leaf_1") == expected.get_configuration(
+                "vdom", "/root/leaf_1"
+            )
+            assert config.get_configuration("vdom", "/") == expected.get_configuration("vdom", "/")
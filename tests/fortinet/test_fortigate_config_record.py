@@ -0,0 +1,120 @@
+"""
+Test the FortiGateConfigRecord class.
+"""
+
+import pickle
+import sys
+from typing import Any
+
+import pytest
+
+from fotoobo.fortinet.fortigate_config_record import FortiGateConfigRecord
+
+
+class TestFortiGateConfigRecord:
+    """
+    Test the FortiGateConfigRecord class.
+    """
+
+    @staticmethod
+    def test_record() -> None:
+        """
+        Test a record behaves like a read-only dict.
+        """
+
+        # Arrange
+        config = {"name": "policy_1", "status": "enable", "id": 1}
+
+        # Act
+        record = FortiGateConfigRecord(config)
+
+        # Assert
+        assert record == config
+        assert config == record
+        assert record != {"name": "policy_1"}
+        assert record["status"] == "enable"
+        assert "name" in record
+        assert "action" not in record
+        assert record.get("action", "deny") == "deny"
+        assert list(record) == ["name", "status", "id"]
+        assert len(record) == 3
+        assert repr(record) == repr(config)
+        with pytest.raises(KeyError):
+            record["action"]  # pylint: disable=pointless-statement
+
+        with pytest.raises(TypeError):
+            record["status"] = "disable"  # type: ignore[index] # pylint: disable=unsupported-assignment-operation
+
+    @staticmethod
+    def test_record_shares_layout() -> None:
+        """
+        Test records with the same keys share their layout.
+        """
+
+        # Act
+        record_1 = FortiGateConfigRecord({"name": "policy_1", "status": "enable"})
+        record_2 = FortiGateConfigRecord({"name": "policy_2", "status": "disable"})
+
+        # Assert
+        assert record_1._layout is record_2._layout  # pylint: disable=protected-access
+
+    @staticmethod
+    def test_record_pickle() -> None:
+        """
+        Test a record may be pickled (e.g. to send it to another process).
+        """
+
+        # Arrange
+        record = FortiGateConfigRecord({"name": "policy_1", "status": "enable"})
+
+        # Act
+        unpickled = pickle.loads(pickle.dumps(record))
+
+        # Assert
+        assert isinstance(unpickled, FortiGateConfigRecord)
+        assert unpickled == record
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "config",
+        (
+            pytest.param({}, id="empty"),
+            pytest.param({"a": "b"}, id="settings"),
+            pytest.param({"a": {"b": "c", "d": "e"}, "f": "g"}, id="section"),
+            pytest.param({"a": [{"b": "c", "id": 1}, {"b": "d", "id": 2}]}, id="list"),
+            pytest.param({"a": {"b": {}}}, id="empty section"),
+        ),
+    )
+    def test_compact_expand(config: dict[str, Any]) -> None:
+        """
+        Test compacting and expanding a configuration.
+        """
+
+        # Act
+        compact = FortiGateConfigRecord.compact(config)
+        expanded = FortiGateConfigRecord.expand(compact)
+
+        # Assert
+        assert compact == config
+        assert expanded == config
+        assert FortiGateConfigRecord.expand(expanded) == config
+
+    @staticmethod
+    def test_compact() -> None:
+        """
+        Test only the sections with settings are converted into records.
+        """
+
+        # Arrange
+        config = {"a": {"b": "enable", "c": "x" * 40}, "d": [{"e": "f", "id": 1}], "g": {}}
+
+        # Act
+        compact = FortiGateConfigRecord.compact(config)
+
+        # Assert
+        assert isinstance(compact, dict)
+        assert isinstance(compact["a"], FortiGateConfigRecord)
+        assert isinstance(compact["d"][0], FortiGateConfigRecord)
+        assert isinstance(compact["g"], dict)
+        assert compact["a"]["b"] is sys.intern("enable")
+        assert isinstance(FortiGateConfigRecord.expand(compact)["a"], dict)
@@ -5,6 +5,7 @@ Test the FortiManager class.
 # pylint: disable=no-member, too-many-lines
 # mypy: disable-error-code=attr-defined
 
+import asyncio
 from typing import Any
 from unittest.mock import Mock
 
@@ -165,6 +166,41 @@ class TestFortiManager:
             assert fmg.api_get(url).json()["result"][0]["status"]["code"] == 0
             post_mock.assert_called_with(*expected_call[0], **expected_call[1])
 
+    @staticmethod
+    def test_api_get_async(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api_get_async method.
+        """
+
+        # Arrange
+        url: str = "/pm/config/global/obj/firewall/address/dummy"
+        post_mock = Mock(
+            return_value=ResponseMock(
+                json={"result": [{"status": {"code": 0, "message": "OK"}, "url": url}]},
+                status_code=200,
+            )
+        )
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.post", post_mock)
+        fmg = FortiManager("host", "", "")
+
+        # Act
+        response = asyncio.run(fmg.api_get_async(url, {"option": ["scope member"]}))
+
+        # Assert
+        assert response.json()["result"][0]["status"]["code"] == 0
+        post_mock.assert_called_with(
+            "https://host:443/jsonrpc",
+            headers=None,
+            json={
+                "method": "get",
+                "params": [{"url": url, "option": ["scope member"]}],
+                "session": "",
+            },
+            params=None,
+            timeout=3,
+            verify=True,
+        )
+
     @staticmethod
     def test_assign_all_objects(monkeypatch: MonkeyPatch) -> None:
         """
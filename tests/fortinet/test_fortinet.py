@@ -4,6 +4,10 @@ Test the Fortinet class.
 
 # mypy: disable-error-code=attr-defined
 
+import asyncio
+import contextlib
+import threading
+from typing import Any
 from unittest.mock import Mock
 
 import pytest
@@ -12,7 +16,12 @@ from pytest import MonkeyPatch
 from urllib3.exceptions import NewConnectionError, SSLError
 
 from fotoobo.exceptions import APIError, GeneralError
+from fotoobo.fortinet.adapter import FortinetAdapter
+from fotoobo.fortinet.circuit_breaker import CircuitBreaker
 from fotoobo.fortinet.fortinet import Fortinet
+from fotoobo.fortinet.rate_limiter import RateLimiter
+from fotoobo.helpers.fleet import run_async
+from fotoobo.helpers.result import Result
 from tests.helper import ResponseMock
 
 
@@ -34,6 +43,8 @@ class TestFortinet:
     Test the Fortinet class.
     """
 
+    # pylint: disable=too-many-public-methods
+
     @staticmethod
     def test_get_vendor() -> None:
         """
@@ -95,6 +106,49 @@ class TestFortinet:
             "url", headers=None, json=None, params=None, timeout=3, verify=True
         )
 
+    @staticmethod
+    def test_api_stream(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api with a streamed response which is closed before it is retried.
+        """
+
+        # Arrange
+        responses = [ResponseMock(status_code=503), ResponseMock(status_code=200)]
+        get_mock = Mock(side_effect=responses)
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.get", get_mock)
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.sleep", Mock())
+
+        # Act
+        response = FortinetTestClass("dummy", retry={"max_attempts": 2}).api(
+            "get", "url", stream=True
+        )
+
+        # Assert
+        assert response.status_code == 200
+        responses[0].close.assert_called_once()
+        get_mock.assert_called_with(
+            "url", headers=None, json=None, params=None, timeout=3, verify=True, stream=True
+        )
+
+    @staticmethod
+    def test_api_stream_error(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api closes a streamed response with an error status before it raises.
+        """
+
+        # Arrange
+        response = ResponseMock(status_code=404)
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortinet.requests.Session.get", Mock(return_value=response)
+        )
+
+        # Act
+        with pytest.raises(APIError):
+            FortinetTestClass("dummy").api("get", "url", stream=True)
+
+        # Assert
+        response.close.assert_called_once()
+
     @staticmethod
     def test_api_post(monkeypatch: MonkeyPatch) -> None:
         """
@@ -115,6 +169,399 @@ class TestFortinet:
             "url", headers=None, json=None, params=None, timeout=3, verify=True
         )
 
+    @staticmethod
+    def test_instantiation_invalid_retry() -> None:
+        """
+        Test the instantiation with an invalid retry configuration.
+        """
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match=r"Invalid retry configuration \(host\)"):
+            FortinetTestClass("host", retry={"dummy": 1})
+
+    @staticmethod
+    def test_api_retry_on_timeout(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api retries a request after a connection timeout.
+        """
+
+        # Arrange
+        get_mock = Mock(
+            side_effect=[
+                requests.exceptions.ConnectTimeout(),
+                requests.exceptions.ReadTimeout(),
+                ResponseMock(json={"version": "v1.1.1"}, status_code=200),
+            ]
+        )
+        sleep_mock = Mock()
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.get", get_mock)
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.sleep", sleep_mock)
+        fortinet = FortinetTestClass("dummy", retry={"max_attempts": 3})
+
+        # Act
+        response = fortinet.api("get", "url")
+
+        # Assert
+        assert response.status_code == 200
+        assert get_mock.call_count == 3
+        assert sleep_mock.call_count == 2
+        messages = fortinet.pop_retry_messages()
+        assert len(messages) == 2
+        assert messages[0].startswith("Retry 1/2 for 'GET url' in ")
+        assert messages[0].endswith("due to ConnectTimeout")
+        assert messages[1].endswith("due to ReadTimeout")
+        assert not fortinet.pop_retry_messages()
+
+    @staticmethod
+    def test_api_retry_exhausted(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api raises the usual error if all the attempts failed.
+        """
+
+        # Arrange
+        get_mock = Mock(side_effect=requests.exceptions.ConnectTimeout())
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.get", get_mock)
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.sleep", Mock())
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match=r"Connection timeout \(dummy\)"):
+            FortinetTestClass("dummy", retry={"max_attempts": 2}).api("get", "url")
+
+        assert get_mock.call_count == 2
+
+    @staticmethod
+    def test_api_retry_on_http_status(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api retries a request after HTTP/429 and honours the Retry-After header.
+        """
+
+        # Arrange
+        get_mock = Mock(
+            side_effect=[
+                ResponseMock(headers={"Retry-After": "2"}, status_code=429),
+                ResponseMock(json={"version": "v1.1.1"}, status_code=200),
+            ]
+        )
+        sleep_mock = Mock()
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.get", get_mock)
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.sleep", sleep_mock)
+        fortinet = FortinetTestClass("dummy", retry={"max_attempts": 3})
+
+        # Act
+        response = fortinet.api("get", "url")
+
+        # Assert
+        assert response.status_code == 200
+        sleep_mock.assert_called_once_with(2.0)
+        assert fortinet.pop_retry_messages() == ["Retry 1/2 for 'GET url' in 2.0s due to HTTP/429"]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "response, expected",
+        (
+            pytest.param(ResponseMock(status_code=200), False, id="HTTP/200"),
+            pytest.param(ResponseMock(status_code=404), False, id="HTTP/404"),
+            pytest.param(ResponseMock(status_code=429), True, id="HTTP/429"),
+            pytest.param(ResponseMock(status_code=503), True, id="HTTP/503"),
+            pytest.param(requests.exceptions.ReadTimeout(), True, id="ReadTimeout"),
+        ),
+    )
+    def test_api_report_overload(
+        response: ResponseMock | Exception, expected: bool, monkeypatch: MonkeyPatch
+    ) -> None:
+        """
+        Test api reports an overloaded device to the fleet executor.
+        """
+
+        # Arrange
+        report_mock = Mock()
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.report_overload", report_mock)
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortinet.requests.Session.get", Mock(side_effect=[response])
+        )
+
+        # Act
+        with contextlib.suppress(APIError, GeneralError):
+            FortinetTestClass("dummy").api("get", "url")
+
+        # Assert
+        assert report_mock.called is expected
+
+    @staticmethod
+    def test_api_no_retry_for_post(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api does not retry non idempotent requests.
+        """
+
+        # Arrange
+        post_mock = Mock(return_value=ResponseMock(status_code=503))
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.post", post_mock)
+
+        # Act & Assert
+        with pytest.raises(APIError):
+            FortinetTestClass("dummy", retry={"max_attempts": 3}).api("post", "url")
+
+        assert post_mock.call_count == 1
+
+    @staticmethod
+    def test_api_circuit_breaker(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api does not connect to a host anymore if its circuit is open.
+        """
+
+        # Arrange
+        CircuitBreaker.reset_all()
+        get_mock = Mock(side_effect=requests.exceptions.ConnectTimeout())
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.get", get_mock)
+        fortinet = FortinetTestClass("dummy", circuit_breaker={"threshold": 2})
+
+        # Act & Assert
+        for _ in range(2):
+            with pytest.raises(GeneralError, match=r"Connection timeout \(dummy\)"):
+                fortinet.api("get", "url")
+
+        with pytest.raises(GeneralError, match=r"Circuit open for \d+s \(dummy\)"):
+            FortinetTestClass("dummy", circuit_breaker={"threshold": 2}).api("get", "url")
+
+        assert get_mock.call_count == 2
+        CircuitBreaker.reset_all()
+
+    @staticmethod
+    def test_api_circuit_breaker_reachable(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api resets the circuit breaker if the host is reachable (even with an HTTP error).
+        """
+
+        # Arrange
+        CircuitBreaker.reset_all()
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortinet.requests.Session.get",
+            Mock(return_value=ResponseMock(status_code=404)),
+        )
+        fortinet = FortinetTestClass("dummy", circuit_breaker={"threshold": 2})
+        CircuitBreaker.get("dummy").record_failure()
+
+        # Act
+        with pytest.raises(APIError):
+            fortinet.api("get", "url")
+
+        # Assert
+        assert CircuitBreaker.get("dummy").failures == 0
+        CircuitBreaker.reset_all()
+
+    @staticmethod
+    def test_pool() -> None:
+        """
+        Test the connection pool settings and the shared adapters.
+        """
+
+        # Arrange
+        FortinetAdapter.reset_all()
+
+        # Act
+        private_1 = FortinetTestClass("dummy", pool={"maxsize": 20})
+        private_2 = FortinetTestClass("dummy", pool={"maxsize": 20})
+        shared_1 = FortinetTestClass("dummy", pool={"shared": True})
+        shared_2 = FortinetTestClass("dummy", pool={"shared": True})
+
+        # Assert
+        adapter = private_1.session.get_adapter("https://dummy/")
+        assert isinstance(adapter, FortinetAdapter)
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 20
+        assert adapter is not private_2.session.get_adapter("https://dummy/")
+        assert shared_1.session.get_adapter("https://dummy/") is shared_2.session.get_adapter(
+            "https://dummy/"
+        )
+        FortinetAdapter.reset_all()
+
+    @staticmethod
+    def test_pool_hostname_changed() -> None:
+        """
+        Test the shared adapter of the new host is used if the hostname changes.
+        """
+
+        # Arrange
+        FortinetAdapter.reset_all()
+        fortinet = FortinetTestClass("dummy", pool={"shared": True})
+        fortinet.hostname = "cluster"
+
+        # Act
+        fortinet._mount_adapter()  # pylint: disable=protected-access
+
+        # Assert
+        assert fortinet.session.get_adapter("https://cluster/") is FortinetAdapter.get(
+            "cluster", 443
+        )
+        FortinetAdapter.reset_all()
+
+    @staticmethod
+    def test_pool_invalid() -> None:
+        """
+        Test an invalid connection pool configuration.
+        """
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match=r"Invalid pool configuration \(dummy\)"):
+            FortinetTestClass("dummy", pool={"size": 20})
+
+    @staticmethod
+    def test_api_rate_limit(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api waits for the rate limiter shared by all the objects of the same host.
+        """
+
+        # Arrange
+        RateLimiter.reset_all()
+        sleep_mock = Mock()
+        monkeypatch.setattr("fotoobo.fortinet.rate_limiter.sleep", sleep_mock)
+        monkeypatch.setattr("fotoobo.fortinet.rate_limiter.monotonic", Mock(return_value=100.0))
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortinet.requests.Session.get",
+            Mock(return_value=ResponseMock(status_code=200)),
+        )
+
+        # Act
+        for _ in range(2):
+            FortinetTestClass("dummy", rate_limit={"rate": 1, "max_concurrent": 2}).api("get")
+
+        # Assert
+        sleep_mock.assert_called_once_with(1.0)
+        RateLimiter.reset_all()
+
+    @staticmethod
+    def test_api_rate_limit_stream(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api keeps the concurrency slot of a streamed response until it is closed.
+        """
+
+        # Arrange
+        RateLimiter.reset_all()
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortinet.requests.Session.get",
+            Mock(return_value=ResponseMock(status_code=200)),
+        )
+        fortinet = FortinetTestClass("dummy", rate_limit={"max_concurrent": 1})
+
+        # Act
+        response = fortinet.api("get", stream=True)
+
+        # Assert
+        semaphore = RateLimiter.get("dummy")._semaphore  # pylint: disable=protected-access
+        assert semaphore
+        assert not semaphore.acquire(blocking=False)
+        response.close()
+        assert semaphore.acquire(blocking=False)
+        RateLimiter.reset_all()
+
+    @staticmethod
+    def test_api_rate_limit_invalid() -> None:
+        """
+        Test api with an invalid rate limit configuration.
+        """
+
+        # Arrange
+        RateLimiter.reset_all()
+        fortinet = FortinetTestClass("dummy", rate_limit={"requests_per_second": 1})
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match=r"Invalid rate_limit configuration \(dummy\)"):
+            fortinet.api("get")
+
+    @staticmethod
+    def test_api_async(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api_async.
+        """
+
+        # Arrange
+        get_mock = Mock(return_value=ResponseMock(json={"version": "v1.1.1"}, status_code=200))
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.get", get_mock)
+
+        # Act
+        response = asyncio.run(FortinetTestClass("dummy").api_async("get", "url"))
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json() == {"version": "v1.1.1"}
+        get_mock.assert_called_with(
+            "url", headers=None, json=None, params=None, timeout=3, verify=True
+        )
+
+    @staticmethod
+    def test_api_async_in_flight(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test api_async has max_in_flight requests in flight within run_async.
+
+        The default executor of asyncio has at most 32 threads, so this only works with the
+        dedicated thread pool of run_async.
+        """
+
+        # Arrange
+        max_in_flight = 50
+        barrier = threading.Barrier(max_in_flight, timeout=10)
+        lock = threading.Lock()
+        in_flight: list[int] = [0, 0]  # current, maximum
+
+        def _get(*_: Any, **__: Any) -> ResponseMock:
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+
+            barrier.wait()
+            with lock:
+                in_flight[0] -= 1
+
+            return ResponseMock(json={}, status_code=200)
+
+        async def _func(name: str, fortinet: FortinetTestClass) -> tuple[str, int]:
+            response = await fortinet.api_async("get", "url")
+            return name, response.status_code
+
+        monkeypatch.setattr("fotoobo.fortinet.fortinet.requests.Session.get", _get)
+        devices = {f"fgt_{i}": FortinetTestClass(f"fgt_{i}") for i in range(4 * max_in_flight)}
+
+        # Act
+        result = asyncio.run(run_async(_func, devices, Result[int](), "test", max_in_flight))
+
+        # Assert
+        assert len(result.results) == 4 * max_in_flight
+        assert in_flight[1] == max_in_flight
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "side_effect, expected",
+        (
+            pytest.param(
+                requests.exceptions.ConnectTimeout(),
+                r"Connection timeout \(dummy\)",
+                id="connection timeout",
+            ),
+            pytest.param(
+                requests.exceptions.ReadTimeout(), r"Read timeout \(dummy\)", id="read timeout"
+            ),
+            pytest.param(
+                requests.exceptions.ConnectionError(),
+                r"Unknown connection error \(dummy\)",
+                id="connection error",
+            ),
+        ),
+    )
+    def test_api_async_errors(
+        side_effect: Exception, expected: str, monkeypatch: MonkeyPatch
+    ) -> None:
+        """
+        Test api_async raises the same exceptions as api.
+        """
+
+        # Arrange
+        monkeypatch.setattr(
+            "fotoobo.fortinet.fortinet.requests.Session.get", Mock(side_effect=side_effect)
+        )
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match=expected):
+            asyncio.run(FortinetTestClass("dummy").api_async("get", "url"))
+
     @staticmethod
     @pytest.mark.parametrize(
         "method", (pytest.param("get", id="get"), pytest.param("post", id="post"))
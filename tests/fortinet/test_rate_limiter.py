@@ -0,0 +1,178 @@
+"""
+Test the RateLimiter class.
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+from pytest import MonkeyPatch
+
+from fotoobo.fortinet.rate_limiter import RateLimiter
+from tests.helper import ResponseMock
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiters() -> None:
+    """
+    Forget all the rate limiters before every test.
+    """
+
+    RateLimiter.reset_all()
+
+
+class TestRateLimiter:
+    """
+    Test the RateLimiter class.
+    """
+
+    @staticmethod
+    def test_get() -> None:
+        """
+        Test get returns the same rate limiter for the same hostname.
+        """
+
+        # Act
+        limiter = RateLimiter.get("host", rate=5)
+
+        # Assert
+        assert RateLimiter.get("host") is limiter
+        assert RateLimiter.get("other_host") is not limiter
+        assert limiter.rate == 5
+        assert limiter.burst == 5
+
+    @staticmethod
+    def test_acquire_unlimited(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test acquire never waits without a rate.
+        """
+
+        # Arrange
+        sleep_mock = Mock()
+        monkeypatch.setattr("fotoobo.fortinet.rate_limiter.sleep", sleep_mock)
+        limiter = RateLimiter("host")
+
+        # Act
+        for _ in range(100):
+            limiter.acquire()
+
+        # Assert
+        sleep_mock.assert_not_called()
+
+    @staticmethod
+    def test_acquire(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test acquire waits for a token after the burst is used up.
+        """
+
+        # Arrange
+        sleep_mock = Mock()
+        monkeypatch.setattr("fotoobo.fortinet.rate_limiter.sleep", sleep_mock)
+        monkeypatch.setattr("fotoobo.fortinet.rate_limiter.monotonic", Mock(return_value=100.0))
+        limiter = RateLimiter("host", rate=2, burst=2)
+
+        # Act
+        waits = [limiter.acquire() for _ in range(4)]
+
+        # Assert
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+        assert sleep_mock.call_count == 2
+
+    @staticmethod
+    def test_acquire_refill(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the bucket is refilled over time but never above the burst size.
+        """
+
+        # Arrange
+        monotonic_mock = Mock(return_value=100.0)
+        monkeypatch.setattr("fotoobo.fortinet.rate_limiter.sleep", Mock())
+        monkeypatch.setattr("fotoobo.fortinet.rate_limiter.monotonic", monotonic_mock)
+        limiter = RateLimiter("host", rate=1, burst=3)
+        for _ in range(3):
+            limiter.acquire()
+
+        # Act
+        monotonic_mock.return_value = 1000.0
+        waits = [limiter.acquire() for _ in range(4)]
+
+        # Assert
+        assert waits == [0.0, 0.0, 0.0, 1.0]
+
+    @staticmethod
+    def test_max_concurrent() -> None:
+        """
+        Test the number of requests at the same time is limited.
+        """
+
+        # Arrange
+        limiter = RateLimiter("host", max_concurrent=2)
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+        barrier = threading.Event()
+
+        def _request() -> None:
+            nonlocal running, max_running
+            with limiter:
+                with lock:
+                    running += 1
+                    max_running = max(max_running, running)
+
+                barrier.wait(0.05)
+                with lock:
+                    running -= 1
+
+        # Act
+        threads = [threading.Thread(target=_request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert max_running == 2
+
+    @staticmethod
+    def test_context_manager_releases_on_error() -> None:
+        """
+        Test the concurrency slot is released if the request fails.
+        """
+
+        # Arrange
+        limiter = RateLimiter("host", max_concurrent=1)
+
+        # Act
+        with pytest.raises(ValueError):
+            with limiter:
+                raise ValueError()
+
+        # Assert
+        with limiter:
+            pass
+
+    @staticmethod
+    def test_hold() -> None:
+        """
+        Test the concurrency slot of a held response is released when the response is closed.
+        """
+
+        # Arrange
+        limiter = RateLimiter("host", max_concurrent=1)
+        semaphore = limiter._semaphore  # pylint: disable=protected-access
+        response = ResponseMock(status_code=200)
+        close_mock = response.close
+
+        # Act
+        with limiter:
+            limiter.hold(response)
+
+        # Assert
+        assert semaphore
+        assert not semaphore.acquire(blocking=False)
+        response.close()
+        response.close()
+        assert close_mock.call_count == 2
+        assert semaphore.acquire(blocking=False)
+        assert not semaphore.acquire(blocking=False)
@@ -0,0 +1,97 @@
+"""
+Test the FortinetResponse class.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+import requests
+from pytest import MonkeyPatch
+
+from fotoobo.fortinet.response import FortinetResponse
+
+
+def _response(content: bytes) -> FortinetResponse:
+    """
+    Create a FortinetResponse with the given content.
+    """
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content  # pylint: disable=protected-access
+
+    return FortinetResponse.from_response(response)
+
+
+class TestFortinetResponse:
+    """
+    Test the FortinetResponse class.
+    """
+
+    @staticmethod
+    def test_from_response() -> None:
+        """
+        Test the state of the original response is taken over.
+        """
+
+        # Act
+        response = _response(b"content")
+
+        # Assert
+        assert isinstance(response, FortinetResponse)
+        assert response.status_code == 200
+        assert response.text == "content"
+
+    @staticmethod
+    def test_json_decoded_once(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test the JSON body is only decoded once.
+        """
+
+        # Arrange
+        loads_mock = Mock(return_value={"key": "value"})
+        monkeypatch.setattr("fotoobo.fortinet.response.json_codec.loads", loads_mock)
+        response = _response(b'{"key": "value"}')
+
+        # Act
+        data = [response.json() for _ in range(3)]
+
+        # Assert
+        assert data == [{"key": "value"}] * 3
+        assert data[0] is data[2]
+        loads_mock.assert_called_once_with(b'{"key": "value"}')
+
+    @staticmethod
+    def test_json_with_kwargs() -> None:
+        """
+        Test the cache is not used if arguments for json.loads() are given.
+        """
+
+        # Arrange
+        response = _response(b'{"key": 1.5}')
+
+        # Act & Assert
+        assert response.json(parse_float=str) == {"key": "1.5"}
+        assert response.json() == {"key": 1.5}
+
+    @staticmethod
+    def test_json_other_encoding() -> None:
+        """
+        Test a body which is not UTF-8 is decoded by requests.
+        """
+
+        # Act
+        response = _response('{"key": "välue"}'.encode("UTF-16"))
+
+        # Assert
+        assert response.json() == {"key": "välue"}
+
+    @staticmethod
+    def test_json_invalid() -> None:
+        """
+        Test an invalid JSON body raises the requests exception.
+        """
+
+        # Act & Assert
+        with pytest.raises(requests.exceptions.JSONDecodeError):
+            _response(b"<html>").json()
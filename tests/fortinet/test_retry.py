@@ -0,0 +1,107 @@
+"""
+Test the RetryPolicy class.
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Any
+
+import pytest
+
+from fotoobo.fortinet.retry import RetryPolicy
+
+
+class TestRetryPolicy:
+    """
+    Test the RetryPolicy class.
+    """
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "method, expected",
+        (
+            pytest.param("get", 3, id="get"),
+            pytest.param("DELETE", 3, id="delete"),
+            pytest.param("post", 1, id="post"),
+            pytest.param("patch", 1, id="patch"),
+        ),
+    )
+    def test_get_attempts(method: str, expected: int) -> None:
+        """
+        Test get_attempts only retries idempotent methods.
+        """
+
+        # Act & Assert
+        assert RetryPolicy(max_attempts=3).get_attempts(method) == expected
+
+    @staticmethod
+    def test_get_attempts_default() -> None:
+        """
+        Test the default policy does not retry at all.
+        """
+
+        # Act & Assert
+        assert RetryPolicy().get_attempts("get") == 1
+
+    @staticmethod
+    def test_get_backoff() -> None:
+        """
+        Test get_backoff uses exponential backoff with full jitter.
+        """
+
+        # Arrange
+        policy = RetryPolicy(backoff_factor=1, backoff_max=5)
+
+        # Act & Assert
+        for _ in range(100):
+            assert 0 <= policy.get_backoff(1) <= 1
+            assert 0 <= policy.get_backoff(3) <= 4
+            assert 0 <= policy.get_backoff(10) <= 5
+
+    @staticmethod
+    def test_get_backoff_with_retry_after() -> None:
+        """
+        Test get_backoff honours the time given with Retry-After (limited by backoff_max).
+        """
+
+        # Arrange
+        policy = RetryPolicy(backoff_max=10)
+
+        # Act & Assert
+        assert policy.get_backoff(1, 4) == 4
+        assert policy.get_backoff(1, 60) == 10
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "headers, expected",
+        (
+            pytest.param({"Retry-After": "7"}, 7.0, id="seconds"),
+            pytest.param({"Retry-After": "-7"}, 0.0, id="negative seconds"),
+            pytest.param({"Retry-After": "invalid"}, None, id="invalid"),
+            pytest.param({}, None, id="no header"),
+            pytest.param([], None, id="no headers at all"),
+        ),
+    )
+    def test_get_retry_after(headers: Any, expected: float | None) -> None:
+        """
+        Test get_retry_after with seconds.
+        """
+
+        # Act & Assert
+        assert RetryPolicy.get_retry_after(headers) == expected
+
+    @staticmethod
+    def test_get_retry_after_http_date() -> None:
+        """
+        Test get_retry_after with an HTTP date.
+        """
+
+        # Arrange
+        retry_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), True)
+
+        # Act
+        retry_after = RetryPolicy.get_retry_after({"Retry-After": retry_date})
+
+        # Assert
+        assert retry_after is not None
+        assert 25 < retry_after <= 30
@@ -18,6 +18,7 @@ class ResponseMock:  # pylint: disable=too-many-instance-attributes
         Give the mock the response you expect.
 
         **kwargs:
+            chunks: (List, optional): The chunks of bytes returned by iter_content()
             content: (Any, optional): Content of the response
             headers: (List, optional): List of headers
             json (Any, optional): JSON response. Defaults to ""
@@ -26,7 +27,10 @@ class ResponseMock:  # pylint: disable=too-many-instance-attributes
             status_code (int, optional): HTTP status code. Defaults to 444 (No Response)
             text (str, optional): Text response. Defaults to ""
         """
+        self.chunks: list[bytes] = kwargs.get("chunks", [])
+        self.close = Mock()
         self.content = kwargs.get("content", "")
+        self.iter_content = Mock(side_effect=lambda **_: iter(self.chunks))
         self.headers = kwargs.get("headers", [])
         self.json = Mock(return_value=kwargs.get("json", None))
         self.ok = kwargs.get("ok", True)
@@ -0,0 +1,32 @@
+"""
+Test the concurrency helper.
+"""
+
+import threading
+
+from fotoobo.helpers.concurrency import clear_overload, overload_reported, report_overload
+
+
+def test_report_overload() -> None:
+    """
+    Test an overload is only reported in the thread it was reported in.
+    """
+
+    # Arrange
+    clear_overload()
+    reported_in_thread: list[bool] = []
+
+    def _other_thread() -> None:
+        reported_in_thread.append(overload_reported())
+
+    # Act
+    report_overload()
+    thread = threading.Thread(target=_other_thread)
+    thread.start()
+    thread.join()
+
+    # Assert
+    assert overload_reported()
+    assert reported_in_thread == [False]
+    clear_overload()
+    assert not overload_reported()
@@ -142,6 +142,38 @@ class TestConfig:
         with pytest.raises(GeneralError, match=expected):
             test_config.load_configuration(Path("tests/fotoobo.yaml"))
 
+    @staticmethod
+    def test_config_fleet(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test load fleet configuration which is not a dictionary.
+        """
+
+        # Arrange
+        test_config = Config()
+        monkeypatch.setattr(
+            "fotoobo.helpers.config.load_yaml_file", Mock(return_value={"fleet": [10]})
+        )
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match="Setting fleet has to be a dictionary"):
+            test_config.load_configuration(Path("tests/fotoobo.yaml"))
+
+    @staticmethod
+    def test_config_config_cache(monkeypatch: MonkeyPatch) -> None:
+        """
+        Test load config_cache configuration which is not a dictionary.
+        """
+
+        # Arrange
+        test_config = Config()
+        monkeypatch.setattr(
+            "fotoobo.helpers.config.load_yaml_file", Mock(return_value={"config_cache": [512]})
+        )
+
+        # Act & Assert
+        with pytest.raises(GeneralError, match="Setting config_cache has to be a dictionary"):
+            test_config.load_configuration(Path("tests/fotoobo.yaml"))
+
     @staticmethod
     @pytest.mark.parametrize(
         "env,yaml,expected",
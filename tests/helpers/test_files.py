@@ -4,21 +4,26 @@ Test_files helper module.
 
 # pylint: disable=redefined-outer-name
 
+import gzip
+import lzma
 import os
 from pathlib import Path
 from typing import Any
 from unittest.mock import Mock
+from zipfile import ZipFile
 
 import pytest
 from pytest import MonkeyPatch
 
-from fotoobo.exceptions import GeneralError
+from fotoobo.exceptions import GeneralError, GeneralWarning
 from fotoobo.helpers.files import (
     create_dir,
     file_to_ftp,
     file_to_zip,
+    FTPUploader,
     load_json_file,
     load_yaml_file,
+    open_text_file,
     save_json_file,
     save_txt_file,
     save_yaml_file,
@@ -111,6 +116,67 @@ def test_file_to_ftp(file: Path, mock: Mock, expected: int, monkeypatch: MonkeyP
     assert file_to_ftp(file, GenericDevice(username="", password="", directory="")) == expected
 
 
+def test_ftp_uploader(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test the FTPUploader uploads several files over the same connection.
+    """
+
+    # Arrange
+    ftp_mock = Mock()
+    ftp_mock.storbinary.return_value = "226 Transfer complete."
+    connect_mock = Mock(return_value=ftp_mock)
+    monkeypatch.setattr("fotoobo.helpers.files.FTP", connect_mock)
+    server = GenericDevice(
+        hostname="host", username="user", password="pw", directory="dir", protocol="ftp"
+    )
+
+    # Act
+    with FTPUploader(server) as uploader:
+        first = uploader.upload(Path("tests/data/fortigate_config_empty.conf"))
+        second = uploader.upload(Path("tests/data/fortigate_config_single.conf"))
+
+    # Assert
+    assert first == second == 0
+    connect_mock.assert_called_once_with("host", "user", "pw")
+    ftp_mock.cwd.assert_called_once_with("dir")
+    assert ftp_mock.storbinary.call_count == 2
+    ftp_mock.close.assert_called_once()
+
+
+def test_ftp_uploader_reconnect(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test the FTPUploader reconnects once if the server dropped the persistent connection.
+    """
+
+    # Arrange
+    lost_mock = Mock(storbinary=Mock(side_effect=EOFError()))
+    ftp_mock = Mock(storbinary=Mock(return_value="226 Transfer complete."))
+    monkeypatch.setattr("fotoobo.helpers.files.FTP_TLS", Mock(return_value=ftp_mock))
+    uploader = FTPUploader(GenericDevice(username="", password="", directory=""))
+    uploader._ftp = lost_mock  # pylint: disable=protected-access
+
+    # Act
+    return_code = uploader.upload(Path("tests/data/fortigate_config_empty.conf"))
+
+    # Assert
+    assert return_code == 0
+    lost_mock.close.assert_called_once()
+    ftp_mock.storbinary.assert_called_once()
+
+
+def test_ftp_uploader_unknown_protocol() -> None:
+    """
+    Test the FTPUploader with an unknown protocol.
+    """
+
+    # Arrange
+    server = GenericDevice(hostname="host", protocol="scp")
+
+    # Act & Assert
+    with pytest.raises(GeneralError, match='Unknown FTP protocol "scp"'):
+        FTPUploader(server)
+
+
 def test_file_to_zip(json_test_file: Path, function_dir: Path) -> None:
     """
     Test the file_to_zip function.
@@ -147,6 +213,64 @@ def test_file_to_zip_invalid_level(zip_level: int) -> None:
         file_to_zip(Path(""), Path(""), zip_level)
 
 
+@pytest.mark.parametrize(
+    "name",
+    (
+        pytest.param("test.txt", id="plain"),
+        pytest.param("test.txt.gz", id="gzip"),
+        pytest.param("test.txt.lzma", id="lzma"),
+        pytest.param("test.txt.xz", id="xz"),
+        pytest.param("test.txt.zip", id="zip"),
+    ),
+)
+def test_open_text_file(name: str, function_dir: Path) -> None:
+    """
+    Test the open_text_file function with plain and compressed files.
+    """
+
+    # Arrange
+    content = "line 1\nline 2 äöü\n"
+    file = function_dir / name
+    plain_file = function_dir / "plain.txt"
+    plain_file.write_text(content, encoding="UTF-8")
+    if file.suffix == ".gz":
+        file.write_bytes(gzip.compress(content.encode("UTF-8")))
+
+    elif file.suffix == ".lzma":
+        file.write_bytes(lzma.compress(content.encode("UTF-8"), format=lzma.FORMAT_ALONE))
+
+    elif file.suffix == ".xz":
+        file.write_bytes(lzma.compress(content.encode("UTF-8")))
+
+    elif file.suffix == ".zip":
+        file_to_zip(plain_file, file)
+
+    else:
+        file.write_text(content, encoding="UTF-8")
+
+    # Act
+    with open_text_file(file) as text_file:
+        lines = list(text_file)
+
+    # Assert
+    assert lines == ["line 1\n", "line 2 äöü\n"]
+
+
+def test_open_text_file_empty_zip(function_dir: Path) -> None:
+    """
+    Test the open_text_file function with a zip archive without a file.
+    """
+
+    # Arrange
+    file = function_dir / "empty.zip"
+    with ZipFile(file, "w"):
+        pass
+
+    # Act & Assert
+    with pytest.raises(GeneralWarning, match=r"There is no file in"):
+        open_text_file(file)
+
+
 # Start testing the json file_helper functions
 
 
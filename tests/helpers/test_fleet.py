@@ -0,0 +1,352 @@
+"""
+Test the fleet helper.
+"""
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from pytest import MonkeyPatch
+
+from fotoobo.helpers.concurrency import report_overload
+from fotoobo.helpers.config import config
+from fotoobo.helpers.fleet import (
+    AdaptiveConcurrency,
+    FleetExecutor,
+    FleetJournal,
+    run_async,
+)
+from fotoobo.helpers.result import Result
+
+
+def test_run_async() -> None:
+    """
+    Test run_async never has more than max_in_flight assets in flight.
+    """
+
+    # Arrange
+    in_flight: list[int] = [0, 0]  # current, maximum
+
+    async def _func(name: str, asset: Any) -> tuple[str, int]:
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return name, asset * 2
+
+    # Act
+    result = asyncio.run(
+        run_async(_func, {f"host_{i}": i for i in range(10)}, Result[int](), "test", 3)
+    )
+
+    # Assert
+    assert len(result.results) == 10
+    assert result.get_result("host_4") == 8
+    assert in_flight[1] == 3
+
+
+def test_fleet_executor() -> None:
+    """
+    Test the FleetExecutor never runs more than the given workers at the same time.
+    """
+
+    # Arrange
+    lock = threading.Lock()
+    in_flight: list[int] = [0, 0]  # current, maximum
+
+    def _func(name: str, asset: Any) -> tuple[str, int]:
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+
+        return name, asset * 2
+
+    # Act
+    result = FleetExecutor(workers=3).run(
+        _func, {f"host_{i}": i for i in range(10)}, Result[int](), "test"
+    )
+
+    # Assert
+    assert len(result.results) == 10
+    assert result.get_result("host_4") == 8
+    assert in_flight[1] == 3
+    assert set(result.durations) == set(result.results)
+    assert all(duration >= 0.01 for duration in result.durations.values())
+
+
+def test_fleet_executor_config(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test the FleetExecutor takes its settings from the configuration if not given.
+    """
+
+    # Arrange
+    monkeypatch.setattr(config, "fleet", {"workers": 42, "task_timeout": 5, "deadline": 60})
+
+    # Act
+    executor = FleetExecutor(task_timeout=10)
+
+    # Assert
+    assert executor.workers == 42
+    assert executor.task_timeout == 10
+    assert executor.deadline == 60
+    monkeypatch.setattr(config, "fleet", {})
+    assert FleetExecutor().workers == 10
+
+
+def test_fleet_executor_push() -> None:
+    """
+    Test the FleetExecutor hands over the results to the push function.
+    """
+
+    # Arrange
+    pushed: dict[str, int] = {}
+
+    # Act
+    result = FleetExecutor().run(
+        lambda name, asset: (name, asset), {"host_1": 1}, Result[int](), "test", pushed.__setitem__
+    )
+
+    # Assert
+    assert pushed == {"host_1": 1}
+    assert not result.results
+
+
+def test_fleet_executor_task_timeout() -> None:
+    """
+    Test the FleetExecutor reports the assets which take longer than the task timeout.
+    """
+
+    # Arrange
+    release = threading.Event()
+
+    def _func(name: str, asset: float) -> tuple[str, float]:
+        if asset:
+            release.wait(asset)
+
+        return name, asset
+
+    # Act
+    result = FleetExecutor(workers=2, task_timeout=0.05).run(
+        _func, {"fast": 0, "slow": 5}, Result[float](), "test"
+    )
+    release.set()
+
+    # Assert
+    assert result.all_results() == {"fast": 0}
+    assert result.messages["slow"] == [
+        {"message": "'slow' timed out after 0.05s", "level": "error"}
+    ]
+
+
+def test_fleet_executor_deadline() -> None:
+    """
+    Test the FleetExecutor skips the assets which did not finish before the deadline.
+    """
+
+    # Arrange
+    release = threading.Event()
+
+    def _func(name: str, asset: Any) -> tuple[str, Any]:
+        release.wait(5)
+        return name, asset
+
+    # Act
+    result = FleetExecutor(workers=1, deadline=0.05).run(
+        _func, {"host_1": 1, "host_2": 2}, Result[int](), "test"
+    )
+    release.set()
+
+    # Assert
+    assert not result.results
+    assert result.messages["host_2"] == [
+        {"message": "'host_2' skipped as the deadline of 0.05s passed", "level": "error"}
+    ]
+
+
+def test_fleet_executor_interrupt(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test the FleetExecutor cancels the assets not started yet on Ctrl-C.
+    """
+
+    # Arrange
+    release = threading.Event()
+    started: list[str] = []
+
+    def _func(name: str, asset: Any) -> tuple[str, Any]:
+        started.append(name)
+        release.wait(5)
+        return name, asset
+
+    monkeypatch.setattr(
+        "fotoobo.helpers.fleet.concurrent.futures.wait", Mock(side_effect=KeyboardInterrupt())
+    )
+
+    # Act
+    with pytest.raises(KeyboardInterrupt):
+        FleetExecutor(workers=1).run(
+            _func, {f"host_{i}": i for i in range(10)}, Result[int](), "test"
+        )
+
+    release.set()
+    time.sleep(0.05)
+
+    # Assert
+    assert len(started) <= 1
+
+
+def test_adaptive_concurrency_increase() -> None:
+    """
+    Test the AdaptiveConcurrency grows by about one per round of tasks without an overload.
+    """
+
+    # Arrange
+    concurrency = AdaptiveConcurrency(initial=4, maximum=5)
+
+    # Act
+    for _ in range(4):
+        concurrency.release(concurrency.acquire(), overloaded=False)
+
+    # Assert
+    assert 4.9 < concurrency.limit < 5
+    for _ in range(10):
+        concurrency.release(concurrency.acquire(), overloaded=False)
+
+    assert concurrency.limit == 5
+
+
+def test_adaptive_concurrency_latency() -> None:
+    """
+    Test the AdaptiveConcurrency does not grow while the latency rises.
+    """
+
+    # Arrange
+    concurrency = AdaptiveConcurrency(initial=4, maximum=10)
+    concurrency.latency = 0.001
+
+    # Act
+    concurrency.release(concurrency.acquire() - 1, overloaded=False)
+
+    # Assert
+    assert concurrency.limit == 4
+
+
+def test_adaptive_concurrency_decrease() -> None:
+    """
+    Test the AdaptiveConcurrency decreases only once for the tasks in flight at the same time.
+    """
+
+    # Arrange
+    concurrency = AdaptiveConcurrency(initial=8, maximum=10, minimum=3)
+    starts = [concurrency.acquire() for _ in range(4)]
+
+    # Act
+    for start in starts:
+        concurrency.release(start, overloaded=True)
+
+    # Assert
+    assert concurrency.limit == 4
+    concurrency.release(concurrency.acquire(), overloaded=True)
+    assert concurrency.limit == 3
+
+
+def test_fleet_executor_adaptive() -> None:
+    """
+    Test the adaptive FleetExecutor reduces its concurrency on overloads.
+    """
+
+    # Arrange
+    def _func(name: str, asset: bool) -> tuple[str, bool]:
+        if asset:
+            report_overload()
+
+        return name, asset
+
+    executor = FleetExecutor(workers=8, max_workers=16)
+
+    # Act
+    result = executor.run(_func, {f"host_{i}": i == 0 for i in range(5)}, Result[bool](), "test")
+
+    # Assert
+    assert len(result.results) == 5
+    assert executor.concurrency is not None
+    assert executor.concurrency.limit < 8
+
+
+def test_fleet_executor_max_workers_lower(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test the FleetExecutor warns if max_workers is lower than workers.
+    """
+
+    # Arrange
+    log_mock = Mock()
+    monkeypatch.setattr("fotoobo.helpers.fleet.log", log_mock)
+
+    # Act
+    executor = FleetExecutor(workers=8, max_workers=4)
+
+    # Assert
+    assert executor.max_workers == 4
+    log_mock.warning.assert_called_once()
+    assert log_mock.warning.call_args.args[1:] == (4, 8, 4)
+
+
+def test_fleet_journal(function_dir: Path) -> None:
+    """
+    Test the FleetJournal records the assets done and resumes the last run.
+    """
+
+    # Arrange
+    file = function_dir / "journal.jsonl"
+    file.write_text('{"run_id": "old", "name": "host_0"}\n')
+    journal = FleetJournal(file, run_id="run_1")
+
+    # Act
+    journal.record("host_1")
+    journal.record("host_2")
+    with file.open("a", encoding="UTF-8") as journal_file:
+        journal_file.write('{"run_id": "run_1", "na')  # the process died while writing
+
+    # Assert
+    assert FleetJournal(file, resume=True).done == {"host_1", "host_2"}
+    assert FleetJournal(file, resume=True).run_id == "run_1"
+    assert not FleetJournal(file, resume=True, run_id="other").done
+    assert not FleetJournal(file).done
+    assert not file.read_text()
+
+
+def test_fleet_executor_journal(function_dir: Path) -> None:
+    """
+    Test the FleetExecutor skips the assets done and only records the assets without errors.
+    """
+
+    # Arrange
+    journal = FleetJournal(function_dir / "journal.jsonl", run_id="run_1")
+    journal.record("host_0")
+    result = Result[int]()
+
+    def _func(name: str, asset: int) -> tuple[str, int]:
+        if asset == 1:
+            result.push_message(name, "failed", level="error")
+
+        if asset == 2:
+            journal.defer(name)
+
+        return name, asset
+
+    # Act
+    FleetExecutor(journal=journal).run(_func, {f"host_{i}": i for i in range(4)}, result, "test")
+
+    # Assert
+    assert set(result.results) == {"host_1", "host_2", "host_3"}
+    assert result.messages["host_0"] == [
+        {"message": "Skipped 'host_0' as it is already done in run 'run_1'", "level": "info"}
+    ]
+    assert FleetJournal(journal.file, resume=True).done == {"host_0", "host_3"}
@@ -0,0 +1,112 @@
+"""
+Test the json_codec helper module.
+"""
+
+import json
+from typing import Any
+
+import pytest
+from pytest import MonkeyPatch
+
+from fotoobo.helpers import json_codec
+
+DATA: dict[Any, Any] = {
+    "key1": "value1\nvalue2",
+    "key2": [{"key3": 1.5, "key4": None}, [], {}, [True, False]],
+    "key5": {"key6": {"key7": [1, 2, 3]}},
+}
+
+
+@pytest.fixture(autouse=True, params=["orjson", "json"])
+def backend(request: pytest.FixtureRequest, monkeypatch: MonkeyPatch) -> str:
+    """
+    Run the test with the fast codec (if available) and with the standard library.
+    """
+
+    if request.param == "json":
+        monkeypatch.setattr("fotoobo.helpers.json_codec.orjson", None)
+
+    elif json_codec.BACKEND != "orjson":
+        pytest.skip("orjson is not installed")
+
+    return str(request.param)
+
+
+@pytest.mark.parametrize("indent", (2, 4))
+def test_dumps_indent(indent: int) -> None:
+    """
+    Test dumps with indentation gives the same output as the standard library.
+    """
+
+    # Act
+    encoded = json_codec.dumps(DATA, indent=indent)
+
+    # Assert
+    assert encoded == json.dumps(DATA, indent=indent)
+
+
+def test_dumps_compact() -> None:
+    """
+    Test dumps without indentation.
+    """
+
+    # Act
+    encoded = json_codec.dumps(DATA)
+
+    # Assert
+    assert "\n" not in encoded
+    assert json.loads(encoded) == DATA
+
+
+@pytest.mark.parametrize(
+    "indent, expected",
+    (
+        pytest.param(None, '{"key1":"välue\\n","1":[1.5,null,true],"key2":{}}', id="compact"),
+        pytest.param(
+            2,
+            '{\n  "key1": "välue\\n",\n  "1": [\n    1.5,\n    null,\n    true\n  ],\n'
+            '  "key2": {}\n}',
+            id="indent",
+        ),
+    ),
+)
+def test_dumps_format(indent: int | None, expected: str) -> None:
+    """
+    Test dumps gives exactly the same output with every backend.
+    """
+
+    # Act
+    encoded = json_codec.dumps({"key1": "välue\n", 1: [1.5, None, True], "key2": {}}, indent)
+
+    # Assert
+    assert encoded == expected
+
+
+def test_dumps_invalid() -> None:
+    """
+    Test dumps with data which is not JSON serializable.
+    """
+
+    # Act & Assert
+    with pytest.raises(TypeError):
+        json_codec.dumps({"key": object()})
+
+
+@pytest.mark.parametrize("data", (json.dumps(DATA), json.dumps(DATA).encode("UTF-8")))
+def test_loads(data: str | bytes) -> None:
+    """
+    Test loads with str and bytes.
+    """
+
+    # Act & Assert
+    assert json_codec.loads(data) == DATA
+
+
+def test_loads_invalid() -> None:
+    """
+    Test loads with invalid JSON.
+    """
+
+    # Act & Assert
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads("{invalid")
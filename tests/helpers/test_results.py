@@ -10,7 +10,7 @@ import pytest
 from pytest import MonkeyPatch
 
 from fotoobo.exceptions import GeneralWarning
-from fotoobo.helpers import cli_path
+from fotoobo.helpers import cli_path, json_codec
 from fotoobo.helpers.result import Result
 from fotoobo.inventory import GenericDevice
 
@@ -20,6 +20,8 @@ class TestResults:
     Test the results class.
     """
 
+    # pylint: disable=too-many-public-methods
+
     @staticmethod
     def test_init() -> None:
         """
@@ -107,6 +109,113 @@ class TestResults:
         assert isinstance(result.messages["test_host"], list)
         assert result.messages["test_host"][0] == {"message": message, "level": level or "info"}
 
+    @staticmethod
+    def test_sink_file(function_dir: Path) -> None:
+        """
+        Test every result and message is written to the JSON Lines file of the sink.
+        """
+
+        # Arrange
+        sink_file = function_dir / "result.jsonl"
+
+        # Act
+        with Result[list[int]](sink=sink_file) as result:
+            result.push_result("host_1", [1, 2])
+            result.push_message("host_2", "dummy message", level="error")
+            result.push_result("host_2", [], successful=False)
+
+        # Assert
+        lines = [json_codec.loads(line) for line in sink_file.read_text().splitlines()]
+        assert lines == [
+            {"type": "result", "key": "host_1", "data": [1, 2], "successful": True},
+            {"type": "message", "host": "host_2", "message": "dummy message", "level": "error"},
+            {"type": "result", "key": "host_2", "data": [], "successful": False},
+        ]
+
+    @staticmethod
+    def test_sink_callback() -> None:
+        """
+        Test only the latest results are kept in memory while all of them are handed to the sink.
+        """
+
+        # Arrange
+        sink = Mock()
+        result = Result[int](sink=sink, keep=2)
+
+        # Act
+        for number in range(5):
+            result.push_result(f"host_{number}", number)
+
+        # Assert
+        assert sink.call_count == 5
+        sink.assert_called_with({"type": "result", "key": "host_4", "data": 4, "successful": True})
+        assert result.all_results() == {"host_3": 3, "host_4": 4}
+        assert result.successful == ["host_3", "host_4"]
+
+    @staticmethod
+    def test_keep() -> None:
+        """
+        Test the messages, durations and result lists are trimmed to the latest hosts.
+        """
+
+        # Arrange
+        result = Result[int](keep=2)
+
+        # Act
+        for number in range(5):
+            result.push_message(f"host_{number}", "dummy message")
+            result.durations[f"host_{number}"] = number
+            result.push_result(f"host_{number}", number, successful=bool(number % 2))
+
+        result.push_message("host_9", "dummy message")
+
+        # Assert
+        assert result.all_results() == {"host_3": 3, "host_4": 4}
+        assert list(result.messages) == ["host_4", "host_9"]
+        assert list(result.durations) == ["host_3", "host_4"]
+        assert result.successful == ["host_1", "host_3"]
+        assert result.failed == ["host_2", "host_4"]
+
+    @staticmethod
+    def test_sink_file_not_serializable(function_dir: Path) -> None:
+        """
+        Test data which cannot be written to the sink is rejected before the Result is changed.
+        """
+
+        # Arrange
+        sink_file = function_dir / "result.jsonl"
+
+        # Act
+        with Result[object](sink=sink_file) as result:
+            with pytest.raises(TypeError):
+                result.push_result("host_1", object())
+
+            result.push_result("host_2", 2)
+
+        # Assert
+        assert result.all_results() == {"host_2": 2}
+        assert result.successful == ["host_2"]
+        assert len(sink_file.read_text().splitlines()) == 1
+
+    @staticmethod
+    def test_sink_callback_outside_lock() -> None:
+        """
+        Test the sink function may push to the Result itself (it is called outside of the lock).
+        """
+
+        # Arrange
+        def sink(record: dict[str, Any]) -> None:
+            if record["type"] == "result":
+                result.push_message(record["key"], "handed over")
+
+        result = Result[int](sink=sink)
+
+        # Act
+        result.push_result("host_1", 1)
+
+        # Assert
+        assert result.get_messages("host_1") == [{"message": "handed over", "level": "info"}]
+
     @staticmethod
     def test_get_messages() -> None:
         """
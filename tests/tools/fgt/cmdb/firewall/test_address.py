@@ -7,9 +7,11 @@ Test fgt cmdb firewall address.
 from pathlib import Path
 from unittest.mock import Mock
 
+import pytest
 from pytest import MonkeyPatch
 
 from fotoobo.tools.fgt.cmdb.firewall import get_cmdb_firewall_address
+from tests.helper import ResponseMock
 
 
 def test_get_cmdb_firewall_address(monkeypatch: MonkeyPatch) -> None:
@@ -50,8 +52,8 @@ def test_get_cmdb_firewall_address(monkeypatch: MonkeyPatch) -> None:
             "vdom": "vdom_1",
         }
     ]
-    api_get_mock = Mock(return_value=result_mock)
-    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api_get", api_get_mock)
+    api_mock = Mock(return_value=ResponseMock(json=result_mock, status_code=200))
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
     save_raw_mock = Mock(return_value=True)
     monkeypatch.setattr("fotoobo.helpers.result.Result.save_raw", save_raw_mock)
 
@@ -66,5 +68,44 @@ def test_get_cmdb_firewall_address(monkeypatch: MonkeyPatch) -> None:
     assert data[2]["content"] == "1.1.1.1/2.2.2.2"
     assert data[3]["content"] == "1.1.1.1 - 2.2.2.2"
     assert data[4]["content"] == ""
-    api_get_mock.assert_called_with(url="/cmdb/firewall/address/", vdom="")
+    api_mock.assert_called_with(
+        method="get",
+        url="/cmdb/firewall/address/",
+        params={
+            "vdom": "",
+            "format": "name|type|subnet|fqdn|country|start-ip|end-ip",
+            "start": "0",
+            "count": "1000",
+        },
+        timeout=None,
+    )
     save_raw_mock.assert_called_with(file=Path("test.json"), key="test_fgt_1")
+
+
+@pytest.mark.parametrize(
+    "fields, params",
+    (
+        pytest.param(["name"], {"vdom": "*", "format": "name"}, id="name only"),
+        pytest.param([], {"vdom": "*"}, id="all fields"),
+    ),
+)
+def test_get_cmdb_firewall_address_fields(
+    fields: list[str], params: dict[str, str], monkeypatch: MonkeyPatch
+) -> None:
+    """
+    Test the get cmdb firewall address method with other fields than the default fields.
+    """
+
+    # Arrange
+    result_mock = {"results": [{"name": "dummy_1"}], "vdom": "vdom_1"}
+    api_mock = Mock(return_value=ResponseMock(json=result_mock, status_code=200))
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
+
+    # Act
+    result = get_cmdb_firewall_address("test_fgt_1", "", "*", None, fields)
+
+    # Assert
+    assert result.get_result("test_fgt_1") == [
+        {"name": "dummy_1", "vdom": "vdom_1", "type": "", "content": ""}
+    ]
+    assert api_mock.call_args.kwargs["params"] == params | {"start": "0", "count": "1000"}
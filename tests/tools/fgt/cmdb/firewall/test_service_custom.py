@@ -10,6 +10,7 @@ from unittest.mock import Mock
 from pytest import MonkeyPatch
 
 from fotoobo.tools.fgt.cmdb.firewall import get_cmdb_firewall_service_custom
+from tests.helper import ResponseMock
 
 
 def test_get_cmdb_firewall_service_custom(monkeypatch: MonkeyPatch) -> None:
@@ -52,8 +53,8 @@ def test_get_cmdb_firewall_service_custom(monkeypatch: MonkeyPatch) -> None:
             "vdom": "vdom_1",
         }
     ]
-    api_get_mock = Mock(return_value=result_mock)
-    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api_get", api_get_mock)
+    api_mock = Mock(return_value=ResponseMock(json=result_mock, status_code=200))
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
     save_raw_mock = Mock(return_value=True)
     monkeypatch.setattr("fotoobo.helpers.result.Result.save_raw", save_raw_mock)
 
@@ -68,5 +69,15 @@ def test_get_cmdb_firewall_service_custom(monkeypatch: MonkeyPatch) -> None:
     assert data[2]["data_1"] == "8"
     assert data[3]["data_1"] == "89"
     assert data[4]["data_1"] == ""
-    api_get_mock.assert_called_with(url="/cmdb/firewall.service/custom/", vdom="")
+    api_mock.assert_called_with(
+        method="get",
+        url="/cmdb/firewall.service/custom/",
+        params={
+            "vdom": "",
+            "format": "name|protocol|tcp-portrange|udp-portrange|icmptype|icmpcode|protocol-number",
+            "start": "0",
+            "count": "1000",
+        },
+        timeout=None,
+    )
     save_raw_mock.assert_called_with(file=Path("test.json"), key="test_fgt_1")
@@ -10,6 +10,7 @@ from unittest.mock import Mock
 from pytest import MonkeyPatch
 
 from fotoobo.tools.fgt.cmdb.firewall import get_cmdb_firewall_service_group
+from tests.helper import ResponseMock
 
 
 def test_get_cmdb_firewall_addrgrp(monkeypatch: MonkeyPatch) -> None:
@@ -27,8 +28,8 @@ def test_get_cmdb_firewall_addrgrp(monkeypatch: MonkeyPatch) -> None:
             "vdom": "vdom_1",
         }
     ]
-    api_get_mock = Mock(return_value=result_mock)
-    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api_get", api_get_mock)
+    api_mock = Mock(return_value=ResponseMock(json=result_mock, status_code=200))
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api", api_mock)
     save_raw_mock = Mock(return_value=True)
     monkeypatch.setattr("fotoobo.helpers.result.Result.save_raw", save_raw_mock)
 
@@ -40,5 +41,10 @@ def test_get_cmdb_firewall_addrgrp(monkeypatch: MonkeyPatch) -> None:
     assert len(data) == 2
     assert data[0]["content"] == "member_1\nmember_2"
     assert data[1]["content"] == "member_3\nmember_4"
-    api_get_mock.assert_called_with(url="/cmdb/firewall/addrgrp/", vdom="")
+    api_mock.assert_called_with(
+        method="get",
+        url="/cmdb/firewall/addrgrp/",
+        params={"vdom": "", "format": "name|member", "start": "0", "count": "1000"},
+        timeout=None,
+    )
     save_raw_mock.assert_called_with(file=Path("test.json"), key="test_fgt_1")
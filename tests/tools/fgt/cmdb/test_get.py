@@ -0,0 +1,111 @@
+"""
+Test fgt cmdb get.
+"""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from pytest import MonkeyPatch
+
+from fotoobo.exceptions import APIError
+from fotoobo.fortinet.fortigate import FortiGate
+from fotoobo.helpers import json_codec
+from fotoobo.tools.fgt.cmdb.get import get_cmdb
+
+
+def _convert(vdom: str, entry: Any) -> dict[str, str]:
+    """
+    Convert a raw entry to its name and VDOM.
+    """
+    return {"name": entry["name"], "vdom": vdom}
+
+
+def test_get_cmdb_wildcard(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test get_cmdb with several FortiGates.
+    """
+
+    # Arrange
+    api_get_paged_mock = Mock(return_value=[("root", {"name": "dummy"})])
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api_get_paged", api_get_paged_mock)
+    save_raw_mock = Mock(return_value=True)
+    monkeypatch.setattr("fotoobo.helpers.result.Result.save_raw", save_raw_mock)
+
+    # Act
+    result = get_cmdb("test_fgt_*", "/cmdb/dummy/", "*", "test.json", _convert)
+
+    # Assert
+    assert result.all_results() == {
+        "test_fgt_1": [{"name": "dummy", "vdom": "root"}],
+        "test_fgt_2": [{"name": "dummy", "vdom": "root"}],
+        "test_fgt_4": [{"name": "dummy", "vdom": "root"}],
+    }
+    assert api_get_paged_mock.call_count == 3
+    save_raw_mock.assert_called_once_with(file=Path("test.json"), key=None)
+
+
+def test_get_cmdb_jsonl(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+    """
+    Test get_cmdb streams every FortiGate to a JSON lines file.
+    """
+
+    # Arrange
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.api_get_paged",
+        Mock(return_value=[("root", {"name": "dummy_1"}), ("vdom_1", {"name": "dummy_2"})]),
+    )
+    output_file = function_dir / "test.jsonl"
+
+    # Act
+    get_cmdb("test_fgt_*", "/cmdb/dummy/", "*", str(output_file), _convert)
+
+    # Assert
+    lines = [json_codec.loads(line) for line in output_file.read_text().splitlines()]
+    assert len(lines) == 6
+    assert sorted({line["key"] for line in lines}) == ["test_fgt_1", "test_fgt_2", "test_fgt_4"]
+    assert {
+        "type": "result",
+        "key": "test_fgt_1",
+        "data": {"vdom": "vdom_1", "data": {"name": "dummy_2"}},
+        "successful": True,
+    } in lines
+
+
+def test_get_cmdb_error(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test get_cmdb with a single FortiGate returning an error.
+    """
+
+    # Arrange
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.api_get_paged", Mock(side_effect=APIError("dummy"))
+    )
+
+    # Act & Assert
+    with pytest.raises(APIError, match=r"unknown"):
+        get_cmdb("test_fgt_1", "/cmdb/dummy/", "*", None, _convert)
+
+
+def test_get_cmdb_wildcard_error(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test get_cmdb with several FortiGates of which one returns an error.
+    """
+
+    # Arrange
+    def api_get_paged(self: FortiGate, **_: Any) -> list[tuple[str, Any]]:
+        if self.https_port == 111:
+            raise APIError("dummy")
+
+        return [("root", {"name": "dummy"})]
+
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.api_get_paged", api_get_paged)
+
+    # Act
+    result = get_cmdb("test_fgt_*", "/cmdb/dummy/", "*", None, _convert)
+
+    # Assert
+    assert result.get_result("test_fgt_1") == []
+    assert result.get_result("test_fgt_2") == [{"name": "dummy", "vdom": "root"}]
+    assert result.get_messages("test_fgt_1")[0]["message"] == "test_fgt_1 returned unknown"
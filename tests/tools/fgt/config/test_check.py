@@ -0,0 +1,59 @@
+"""
+Test fgt tools config check.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fotoobo.exceptions import GeneralWarning
+from fotoobo.tools.fgt.config import check, get
+
+
+def test_check_jobs(function_dir: Path) -> None:
+    """
+    Test the check utility gives the same result no matter how many processes are used.
+    """
+
+    # Arrange
+    for name in ("fortigate_config_single", "fortigate_config_vdom"):
+        shutil.copy(Path(f"tests/data/{name}.conf"), function_dir)
+
+    # Act
+    result = check(function_dir, Path("tests/data/fortigate_checks.yaml"))
+    result_jobs = check(function_dir, Path("tests/data/fortigate_checks.yaml"), jobs=2)
+
+    # Assert
+    assert result.get_messages("HOSTNAME UNKNOWN")
+    assert result_jobs.messages == result.messages
+
+
+@pytest.mark.parametrize(
+    "file", sorted(Path("tests/data").glob("*.conf")), ids=lambda file: file.name
+)
+def test_check_lazy(file: Path) -> None:
+    """
+    Test the check utility gives the same result with and without lazy loading for every test
+    configuration.
+    """
+
+    # Arrange
+    def _get(scope: str, lazy: bool) -> Any:
+        try:
+            return get(file, scope, lazy=lazy).all_results()
+
+        except GeneralWarning as warn:
+            return warn.message
+
+    bundles = Path("tests/data/fortigate_checks.yaml")
+
+    # Act
+    result = check(file, bundles)
+    result_lazy = check(file, bundles, lazy=True)
+
+    # Assert
+    assert result_lazy.messages == result.messages
+    for scope in ("global", "vdom"):
+        assert _get(scope, lazy=True) == _get(scope, lazy=False)
@@ -0,0 +1,88 @@
+"""
+Test fgt tools config diff.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from fotoobo.exceptions.exceptions import GeneralWarning
+from fotoobo.helpers.files import file_to_zip
+from fotoobo.tools.fgt.config import diff
+
+
+def test_diff(function_dir: Path) -> None:
+    """
+    Test the diff utility with two configuration files.
+    """
+
+    # Arrange
+    new = function_dir / "new.conf"
+    config = Path("tests/data/fortigate_config_vdom.conf").read_text(encoding="UTF-8")
+    new.write_text(config.replace("value_n", "value_x"), encoding="UTF-8")
+
+    # Act
+    result = diff(Path("tests/data/fortigate_config_vdom.conf"), new)
+
+    # Assert
+    assert result.get_result("new.conf") == [
+        {
+            "scope": "vdom",
+            "path": "/vdom_n/leaf_n/option_n",
+            "type": "changed",
+            "old": "value_n",
+            "new": "value_x",
+        }
+    ]
+
+
+@pytest.mark.parametrize("jobs", (pytest.param(1, id="1 job"), pytest.param(2, id="2 jobs")))
+def test_diff_dirs(jobs: int, function_dir: Path) -> None:
+    """
+    Test the diff utility with two directories of (compressed) backups.
+    """
+
+    # Arrange
+    config = Path("tests/data/fortigate_config_single.conf").read_text(encoding="UTF-8")
+    for day, value in (("old", "value_2"), ("new", "value_x")):
+        (function_dir / day).mkdir()
+        (function_dir / day / "fgt_1.conf").write_text(
+            config.replace("value_2", value), encoding="UTF-8"
+        )
+        file_to_zip(
+            function_dir / day / "fgt_1.conf",
+            function_dir / day / f"fgt_2-2024010{len(day)}-2300.conf.zip",
+        )
+
+    # An older backup of the same FortiGate which must not be compared
+    file_to_zip(
+        Path("tests/data/fortigate_config_vdom.conf"),
+        function_dir / "new" / "fgt_2-20240101-2300.conf.zip",
+    )
+
+    (function_dir / "new" / "fgt_3.conf").write_text(config, encoding="UTF-8")
+    output_file = function_dir / "diff.jsonl"
+
+    # Act
+    result = diff(function_dir / "old", function_dir / "new", output_file, jobs=jobs)
+
+    # Assert
+    lines = [json.loads(line) for line in output_file.read_text(encoding="UTF-8").splitlines()]
+    assert len(lines) == 2
+    assert {line["file"] for line in lines} == {"fgt_1.conf", "fgt_2.conf.zip"}
+    assert {line["host"] for line in lines} == {"HOSTNAME UNKNOWN"}
+    assert set(result.all_results()) == {"fgt_1.conf", "fgt_2.conf.zip"}
+    assert {line["type"] for line in lines} == {"changed"}
+    assert {line["new"] for line in lines} == {"value_x"}
+    assert result.get_messages("fgt_3.conf")[0]["level"] == "warning"
+
+
+def test_diff_no_files() -> None:
+    """
+    Test the diff utility without configuration files to compare.
+    """
+
+    # Act & Assert
+    with pytest.raises(GeneralWarning, match=r"There are no configuration files to compare"):
+        diff(Path("tests/data/fortigate_config_single.conf"), Path("tests/data"))
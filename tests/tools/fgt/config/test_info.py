@@ -2,11 +2,13 @@
 Test fgt tools config info.
 """
 
+import gzip
 from pathlib import Path
 
 import pytest
 
 from fotoobo.exceptions.exceptions import GeneralWarning
+from fotoobo.helpers.files import file_to_zip
 from fotoobo.tools.fgt.config import info
 
 
@@ -54,3 +56,56 @@ def test_info_no_files_in_dir() -> None:
     # Act & Assert
     with pytest.raises(GeneralWarning, match=r"There are no configuration files"):
         info(Path("tests/"))
+
+
+def test_info_jobs(function_dir: Path) -> None:
+    """
+    Test the info utility parses the files of a directory in several processes.
+    """
+
+    # Arrange
+    for number in range(4):
+        config = Path("tests/data/fortigate_config_single.conf").read_text(encoding="UTF-8")
+        config = config.replace("#buildno=8303", f"#buildno={number}")
+        (function_dir / f"fgt_{number}.conf").write_text(config, encoding="UTF-8")
+
+    # Act
+    infos = info(function_dir, jobs=2)
+
+    # Assert
+    assert infos.get_result("HOSTNAME UNKNOWN").buildno == "3"
+    assert infos.successful == ["HOSTNAME UNKNOWN"] * 4
+
+
+def test_info_cache_dir(function_dir: Path) -> None:
+    """
+    Test the info utility stores the parsed configurations in the cache directory.
+    """
+
+    # Act
+    info(Path("tests/data/fortigate_config_single.conf"), cache_dir=function_dir)
+    infos = info(Path("tests/data/fortigate_config_single.conf"), cache_dir=function_dir)
+
+    # Assert
+    assert infos.get_result("HOSTNAME UNKNOWN").buildno == "8303"
+    assert len(list(function_dir.glob("*.marshal"))) == 1
+
+
+def test_info_archives(function_dir: Path) -> None:
+    """
+    Test the info utility parses the compressed configuration files of a directory.
+    """
+
+    # Arrange
+    config = Path("tests/data/fortigate_config_single.conf").read_bytes()
+    (function_dir / "fgt_1.conf.gz").write_bytes(gzip.compress(config))
+    (function_dir / "fgt_2.conf").write_bytes(config.replace(b"#buildno=8303", b"#buildno=1"))
+    file_to_zip(function_dir / "fgt_2.conf", function_dir / "fgt_3.conf.zip")
+    (function_dir / "fgt_4.txt.gz").write_bytes(gzip.compress(config))
+
+    # Act
+    infos = info(function_dir)
+
+    # Assert
+    assert infos.successful == ["HOSTNAME UNKNOWN"] * 3
+    assert infos.get_result("HOSTNAME UNKNOWN").buildno == "1"
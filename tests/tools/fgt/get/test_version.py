@@ -2,14 +2,15 @@
 Test fgt tools get version.
 """
 
+import asyncio
 from typing import Any
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from pytest import MonkeyPatch
 
 from fotoobo.exceptions import GeneralError, GeneralWarning
-from fotoobo.tools.fgt.get import version
+from fotoobo.tools.fgt.get import version, version_async
 
 
 @pytest.mark.parametrize(
@@ -76,3 +77,52 @@ def test_version_no_fortigates(monkeypatch: MonkeyPatch) -> None:
     # Act & Assert
     with pytest.raises(GeneralWarning, match=r"no asset of type 'fortigate' .* was found.*"):
         version("")
+
+
+@pytest.mark.parametrize(
+    "side_effect, expected",
+    (
+        pytest.param(None, "1.1.1", id="version"),
+        pytest.param(GeneralError("dummy message"), "unknown due to dummy message", id="error"),
+    ),
+)
+def test_version_async(side_effect: Any, expected: str, monkeypatch: MonkeyPatch) -> None:
+    """
+    Test get version async.
+    """
+
+    # Arrange
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.get_version_async",
+        AsyncMock(return_value="1.1.1", side_effect=side_effect),
+    )
+
+    # Act
+    result = asyncio.run(version_async())
+
+    # Assert
+    assert len(result.results) == 3
+    assert result.get_result("test_fgt_2") == expected
+
+
+def test_version_with_retries(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test get version reports the retries as warning messages.
+    """
+
+    # Arrange
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.get_version", Mock(return_value="1.1.1")
+    )
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.pop_retry_messages",
+        Mock(return_value=["Retry 1/2 for 'GET url' in 0.1s due to ReadTimeout"]),
+    )
+
+    # Act
+    result = version("test_fgt_1")
+
+    # Assert
+    assert result.get_messages("test_fgt_1") == [
+        {"message": "Retry 1/2 for 'GET url' in 0.1s due to ReadTimeout", "level": "warning"}
+    ]
@@ -2,12 +2,13 @@
 Test fgt tools check hamaster.
 """
 
+import asyncio
 from unittest.mock import Mock
 
 import pytest
 from pytest import MonkeyPatch
 
-from fotoobo.tools.fgt.monitor import hamaster
+from fotoobo.tools.fgt.monitor import hamaster, hamaster_async
 from tests.helper import ResponseMock
 
 
@@ -111,3 +112,53 @@ def test_hamaster(monkeypatch: MonkeyPatch, ret_val: str, expected: str) -> None
     # Assert
     assert result.get_result("test_fgt_2") == expected
     assert result.get_result("dummy_2") == "not found in inventory"
+
+
+def test_hamaster_async(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test check hamaster async.
+    """
+
+    # Arrange
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortimanager.FortiManager.api",
+        Mock(
+            return_value=ResponseMock(
+                json={
+                    "result": [
+                        {
+                            "data": [
+                                {
+                                    "name": "test_fgt",
+                                    "ha_mode": 1,
+                                    "ha_slave": [
+                                        {"prio": 100, "name": "test_fgt_1"},
+                                        {"prio": 200, "name": "test_fgt_2"},
+                                    ],
+                                    "ip": "1.2.3.4",
+                                },
+                            ]
+                        }
+                    ]
+                },
+                status=200,
+            )
+        ),
+    )
+    monkeypatch.setattr(
+        "fotoobo.tools.fgt.monitor.FortiGate.api",
+        Mock(
+            return_value=ResponseMock(
+                json={
+                    "results": [{"is_root_master": 1, "serial_no": "FG11111111111111"}],
+                    "serial": "FG11111111111111",
+                }
+            )
+        ),
+    )
+
+    # Act
+    result = asyncio.run(hamaster_async("test_fmg"))
+
+    # Assert
+    assert result.get_result("test_fgt_2") == "ok"
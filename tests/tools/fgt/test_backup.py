@@ -2,13 +2,22 @@
 Test fgt tools backup.
 """
 
+import asyncio
+import json
+import threading
 from pathlib import Path
-from unittest.mock import Mock
+from typing import Any
+from unittest.mock import AsyncMock, Mock
 
+import pytest
 from pytest import MonkeyPatch
 
-from fotoobo.exceptions import APIError
-from fotoobo.tools.fgt import backup
+from fotoobo.exceptions import APIError, GeneralWarning
+from fotoobo.fortinet.fortigate import FortiGate
+from fotoobo.helpers.fleet import FleetJournal
+from fotoobo.helpers.result import Result
+from fotoobo.tools.fgt import backup, backup_async, backup_to_dir
+from fotoobo.tools.fgt.main import CHECKSUM_INDEX, JOURNAL, UploadPipeline
 
 
 def test_backup_all(monkeypatch: MonkeyPatch) -> None:
@@ -132,3 +141,266 @@ def test_backup_api_error(monkeypatch: MonkeyPatch) -> None:
     message = result.messages["test_fgt_2"][0]
     assert message["level"] == "error"
     assert "test_fgt_2 returned unknown" in message["message"]
+
+
+def test_backup_async(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test fgt backup_async with no 'hosts' so all FortiGates are backed up.
+    """
+
+    # Arrange
+    test_config = "#config-version\ntest"
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.backup_async", AsyncMock(return_value=test_config)
+    )
+
+    # Act
+    result = asyncio.run(backup_async())
+
+    # Assert
+    all_results = result.all_results()
+    assert len(all_results) == 3
+    assert all_results["test_fgt_1"] == test_config
+    assert result.messages["test_fgt_1"][0]["level"] == "info"
+    assert "succeeded" in result.messages["test_fgt_1"][0]["message"]
+
+
+def test_backup_async_api_error(monkeypatch: MonkeyPatch) -> None:
+    """
+    Test fgt backup_async with an API error.
+    """
+
+    # Arrange
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.backup_async",
+        AsyncMock(side_effect=APIError("dummy error")),
+    )
+
+    # Act
+    result = asyncio.run(backup_async("test_fgt_2"))
+
+    # Assert
+    assert not result.get_result("test_fgt_2")
+    assert result.messages["test_fgt_2"][0]["level"] == "error"
+    assert "test_fgt_2 returned unknown" in result.messages["test_fgt_2"][0]["message"]
+
+
+def test_backup_to_dir(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+    """
+    Test fgt backup_to_dir only keeps the metadata of the successful backups in the result.
+    """
+
+    # Arrange
+    def _backup_to_file(self: FortiGate, file: Path, timeout: int) -> dict[str, Any]:
+        if self.https_port == 222 and self.token:  # this is test_fgt_2
+            raise GeneralWarning("Backup failed with error '403' (dummy)")
+
+        file.write_text(f"#config-version\n{timeout}")
+
+        return {"file": str(file)}
+
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.backup_to_file", _backup_to_file)
+
+    # Act
+    result = backup_to_dir(function_dir, timeout=66)
+
+    # Assert
+    all_results = result.all_results()
+    assert set(all_results) == {"test_fgt_1", "test_fgt_4"}
+    assert all_results["test_fgt_1"] == {
+        "file": str(function_dir / "test_fgt_1.conf"),
+        "changed": True,
+    }
+    assert (function_dir / "test_fgt_1.conf").read_text() == "#config-version\n66"
+    assert result.messages["test_fgt_1"][0]["level"] == "info"
+    assert "succeeded" in result.messages["test_fgt_1"][0]["message"]
+    assert result.messages["test_fgt_2"][0] == {
+        "level": "error",
+        "message": "Backup failed with error '403' (dummy)",
+    }
+    assert not (function_dir / JOURNAL).exists()
+
+
+def test_backup_to_dir_incremental(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+    """
+    Test fgt backup_to_dir only downloads the backups with a changed config checksum.
+    """
+
+    # Arrange
+    def _get_config_checksum(self: FortiGate) -> str:
+        if not self.token:  # this is test_fgt_4
+            raise GeneralWarning("dummy returned no config checksum")
+
+        return f"checksum_{self.https_port}"
+
+    backup_mock = Mock(side_effect=lambda file, timeout: {"file": str(file), "sha256": "sha"})
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.backup_to_file", backup_mock)
+    monkeypatch.setattr(
+        "fotoobo.fortinet.fortigate.FortiGate.get_config_checksum", _get_config_checksum
+    )
+    (function_dir / "test_fgt_1.conf").write_text("#config-version")
+    (function_dir / CHECKSUM_INDEX).write_text(
+        '{"test_fgt_1": {"config_checksum": "checksum_111", "sha256": "old"},'
+        ' "test_fgt_2": {"config_checksum": "checksum_old", "sha256": "old"},'
+        ' "test_fgt_3": {"config_checksum": "checksum_3", "sha256": "old"}}'
+    )
+
+    # Act
+    result = backup_to_dir(function_dir, incremental=True)
+
+    # Assert
+    all_results = result.all_results()
+    assert all_results["test_fgt_1"]["changed"] is False
+    assert all_results["test_fgt_2"]["changed"] is True
+    assert all_results["test_fgt_4"]["changed"] is True
+    assert "backup skipped" in result.messages["test_fgt_1"][0]["message"]
+    assert backup_mock.call_count == 2
+    assert json.loads((function_dir / CHECKSUM_INDEX).read_text()) == {
+        "test_fgt_1": {"config_checksum": "checksum_111", "sha256": "old"},
+        "test_fgt_2": {"config_checksum": "checksum_222", "sha256": "sha"},
+        "test_fgt_3": {"config_checksum": "checksum_3", "sha256": "old"},
+    }
+
+
+def test_backup_to_dir_ftp(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+    """
+    Test fgt backup_to_dir compresses and uploads the backups to the ftp server.
+    """
+
+    # Arrange
+    def _backup_to_file(self: FortiGate, file: Path, timeout: int) -> dict[str, Any]:
+        file.write_text(f"#config-version\n{self.https_port}\n{timeout}")
+
+        return {"file": str(file)}
+
+    upload_mock = Mock(side_effect=lambda file: 0 if file.name.startswith("test_fgt_1-") else 550)
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.backup_to_file", _backup_to_file)
+    monkeypatch.setattr("fotoobo.tools.fgt.main.FTPUploader.upload", upload_mock)
+
+    # Act
+    result = backup_to_dir(
+        function_dir, ftp_server="test_ftp", journal_file=function_dir / "journal.jsonl"
+    )
+
+    # Assert
+    assert upload_mock.call_count == 3
+    assert result.messages["test_fgt_1"][-1] == {
+        "level": "info",
+        "message": "Uploaded config file for 'test_fgt_1' to 'test_ftp'",
+    }
+    assert result.messages["test_fgt_2"][-1] == {
+        "level": "error",
+        "message": "Uploading config file for 'test_fgt_2' to 'test_ftp' failed (550)",
+    }
+    assert not list(function_dir.glob("*.zip"))
+    assert FleetJournal(function_dir / "journal.jsonl", resume=True).done == {"test_fgt_1"}
+    assert not (function_dir / JOURNAL).exists()
+
+
+def test_backup_to_dir_ftp_unknown() -> None:
+    """
+    Test fgt backup_to_dir with an ftp server which is not in the inventory.
+    """
+
+    # Act & Assert
+    with pytest.raises(GeneralWarning, match="FTP server 'dummy' not found in inventory"):
+        backup_to_dir(Path("."), ftp_server="dummy")
+
+
+def test_backup_to_dir_resume(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+    """
+    Test fgt backup_to_dir skips the FortiGates already done when resuming a run.
+    """
+
+    # Arrange
+    backup_mock = Mock(side_effect=lambda file, timeout: {"file": str(file)})
+    monkeypatch.setattr("fotoobo.fortinet.fortigate.FortiGate.backup_to_file", backup_mock)
+    (function_dir / JOURNAL).write_text('{"run_id": "run_1", "name": "test_fgt_1"}\n')
+
+    # Act
+    result = backup_to_dir(function_dir, resume=True)
+
+    # Assert
+    assert set(result.all_results()) == {"test_fgt_2", "test_fgt_4"}
+    assert backup_mock.call_count == 2
+    assert "already done in run 'run_1'" in result.messages["test_fgt_1"][0]["message"]
+    assert len((function_dir / JOURNAL).read_text().splitlines()) == 3
+
+
+def test_backup_to_dir_resume_no_journal(function_dir: Path) -> None:
+    """
+    Test fgt backup_to_dir fails to resume a run without a journal.
+    """
+
+    # Act & Assert
+    with pytest.raises(GeneralWarning, match="There is no journal .* to resume"):
+        backup_to_dir(function_dir, resume=True)
+
+
+def test_upload_pipeline_errors(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+    """
+    Test the UploadPipeline goes on with the next backup after an unexpected error.
+    """
+
+    # Arrange
+    upload_mock = Mock(side_effect=RuntimeError("dummy"))
+    monkeypatch.setattr("fotoobo.tools.fgt.main.FTPUploader.upload", upload_mock)
+    result = Result[Any]()
+    config_file = function_dir / "test_fgt.conf"
+    config_file.write_text("#config-version")
+
+    # Act
+    with UploadPipeline(function_dir, "test_ftp", Mock(protocol="ftp"), result, 1, 1) as pipeline:
+        for number in range(10):
+            pipeline.put(f"test_fgt_{number}", config_file)
+
+    # Assert
+    assert upload_mock.call_count == 10
+    assert result.messages["test_fgt_9"] == [
+        {
+            "message": "Uploading config file for 'test_fgt_9' to 'test_ftp' failed (-1)",
+            "level": "error",
+        }
+    ]
+    assert not list(function_dir.glob("*.zip"))
+
+
+def test_upload_pipeline_cancel(monkeypatch: MonkeyPatch, function_dir: Path) -> None:
+    """
+    Test the UploadPipeline does not wait for a stalled ftp server if it is left with an exception.
+    """
+
+    # Arrange
+    uploading, stalled = threading.Event(), threading.Event()
+
+    def _upload(_: Path) -> int:
+        uploading.set()
+        stalled.wait(10)
+
+        return 0
+
+    upload_mock = Mock(side_effect=_upload)
+    monkeypatch.setattr("fotoobo.tools.fgt.main.FTPUploader.upload", upload_mock)
+    monkeypatch.setattr("fotoobo.tools.fgt.main.CANCEL_TIMEOUT", 0.1)
+    result = Result[Any]()
+    config_file = function_dir / "test_fgt.conf"
+    config_file.write_text("#config-version")
+
+    # Act
+    with pytest.raises(KeyboardInterrupt):
+        with UploadPipeline(function_dir, "test_ftp", Mock(protocol="ftp"), result, 1, 1) as pipe:
+            for number in range(5):
+                pipe.put(f"test_fgt_{number}", config_file)
+
+            uploading.wait(10)
+            raise KeyboardInterrupt
+
+    # Assert
+    stalled.set()
+    assert upload_mock.call_count == 1
+    assert result.messages["test_fgt_4"] == [
+        {
+            "message": "Uploading config file for 'test_fgt_4' to 'test_ftp' cancelled",
+            "level": "error",
+        }
+    ]